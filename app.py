@@ -5,10 +5,10 @@
 # =============================================================================
 
 import datetime as dt
+import hashlib
+import json
 import os
-from io import StringIO
 
-import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
@@ -28,7 +28,16 @@ from models import (
     generate_recommendation_paper2,
     generate_paper1_signal,
     classify_headline_sentiment,
+    SectorFactorIndex,
 )
+from indicators import CrossoverIndex, IndicatorState
+import price_store
+import market_data
+import universe
+import fundamentals_store
+import tracing
+from tracing import cache_miss, traced
+from fetch_pool import peer_metrics_row
 from components import (
     get_status_color,
     get_status_bg,
@@ -37,16 +46,20 @@ from components import (
     render_compact_card,
     render_hero_card,
     render_accent_card,
+    render_position_card,
     format_large_number,
     format_mcap,
 )
-from tabs import dashboard, analysis, overview, technical, fundamentals, news, backtest
+from tabs import dashboard, analysis, overview, technical, fundamentals, news, backtest, screener
 
 # =============================================================================
 # PAGE CONFIG
 # =============================================================================
 st.set_page_config(page_title="US Stock Analytics Dashboard", layout="wide")
 
+# Spans for this run; closed and recorded at the end of the script
+tracing.begin("page")
+
 # =============================================================================
 # CUSTOM CSS - Premium Light Theme with Source Sans Pro
 # =============================================================================
@@ -89,13 +102,13 @@ footer {visibility: hidden;}
     letter-spacing: 0.05em !important;
 }
 
-/* Tab styling */
-.stTabs [data-baseweb="tab-list"] {
+/* View bar: the view router's radio, styled as tabs */
+.st-key-active_view [role="radiogroup"] {
     gap: 8px;
     background-color: transparent !important;
     border-bottom: 1px solid #D0E8EA !important;
 }
-.stTabs [data-baseweb="tab"] {
+.st-key-active_view label {
     font-family: 'Source Sans Pro', Arial, sans-serif !important;
     font-size: 14px !important;
     font-weight: 500 !important;
@@ -103,11 +116,14 @@ footer {visibility: hidden;}
     background-color: transparent !important;
     border: none !important;
     padding: 12px 16px !important;
+    margin: 0 !important;
 }
-.stTabs [aria-selected="true"] {
+.st-key-active_view label > div:first-child {
+    display: none !important;
+}
+.st-key-active_view label:has(input:checked) {
     color: #0097A7 !important;
     border-bottom: 3px solid #0097A7 !important;
-    background-color: transparent !important;
 }
 
 /* Headers */
@@ -375,76 +391,44 @@ button[data-testid="stBaseButton-primary"]:hover {
 # =============================================================================
 # DATA LOADING FUNCTIONS (cached)
 # =============================================================================
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "")
 
 
+@traced("app.load_sp500_tickers", cached=True)
 @st.cache_data(ttl=86400)
+@cache_miss
 def load_sp500_tickers():
     """Fetch S&P 500 tickers from Wikipedia."""
-    try:
-        url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-        response = requests.get(url, headers=HEADERS)
-        tables = pd.read_html(StringIO(response.text))
-        df = tables[0][["Symbol", "Security", "GICS Sector", "GICS Sub-Industry"]].copy()
-        df.columns = ["ticker", "name", "sector", "industry"]
-        df["ticker"] = df["ticker"].str.replace(".", "-", regex=False)
-        df["is_sp500"] = True
-        return df
-    except Exception:
-        return pd.DataFrame(columns=["ticker", "name", "sector", "industry", "is_sp500"])
+    return universe.fetch_sp500_tickers()
 
 
+@traced("app.load_nasdaq100_tickers", cached=True)
 @st.cache_data(ttl=86400)
+@cache_miss
 def load_nasdaq100_tickers():
     """Fetch NASDAQ-100 tickers from Wikipedia."""
-    try:
-        url = "https://en.wikipedia.org/wiki/Nasdaq-100"
-        response = requests.get(url, headers=HEADERS)
-        tables = pd.read_html(StringIO(response.text))
-
-        for table in tables:
-            str_cols = [str(c).lower() for c in table.columns]
-            if any("ticker" in c or "symbol" in c for c in str_cols):
-                ticker_col = None
-                name_col = None
-                for col in table.columns:
-                    col_lower = str(col).lower()
-                    if "ticker" in col_lower or "symbol" in col_lower:
-                        ticker_col = col
-                    if "company" in col_lower or "security" in col_lower:
-                        name_col = col
-
-                if ticker_col:
-                    df = pd.DataFrame()
-                    df["ticker"] = table[ticker_col].astype(str).str.replace(".", "-", regex=False)
-                    df["name"] = table[name_col] if name_col else df["ticker"]
-                    df["sector"] = "Technology"
-                    df["industry"] = "Technology"
-                    df["is_sp500"] = False
-                    return df
-
-        return pd.DataFrame(columns=["ticker", "name", "sector", "industry", "is_sp500"])
-    except Exception:
-        return pd.DataFrame(columns=["ticker", "name", "sector", "industry", "is_sp500"])
+    return universe.fetch_nasdaq100_tickers()
 
 
+@traced("app.load_all_us_stocks", cached=True)
 @st.cache_data(ttl=86400)
+@cache_miss
 def load_all_us_stocks():
     """Load combined list of S&P 500 and NASDAQ-100 stocks."""
-    sp500 = load_sp500_tickers()
-    nasdaq = load_nasdaq100_tickers()
-    combined = pd.concat([sp500, nasdaq], ignore_index=True)
-    combined = combined.drop_duplicates(subset=["ticker"], keep="first")
-    return combined.sort_values("ticker").reset_index(drop=True)
+    return universe.combine_universes(load_sp500_tickers(), load_nasdaq100_tickers())
 
 
+@traced("app.load_history", cached=True)
 @st.cache_data(ttl=3600)
+@cache_miss
 def load_history(ticker, period="max", interval="1d"):
-    """Load historical price data."""
+    """Load historical price data (full daily history comes from the local price store)."""
     try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(period=period, interval=interval, auto_adjust=False)
+        if period == "max" and interval == "1d":
+            data = price_store.get_store().refresh(ticker)
+        else:
+            data = yf.Ticker(ticker).history(period=period, interval=interval, auto_adjust=False)
+            tracing.add_bytes(data.memory_usage(deep=True).sum())
         if data.empty:
             st.warning(f"No data returned for {ticker}")
             return data
@@ -462,34 +446,38 @@ def load_history(ticker, period="max", interval="1d"):
         return pd.DataFrame()
 
 
+@traced("app.load_fundamentals", cached=True)
 @st.cache_data(ttl=3600)
+@cache_miss
 def load_fundamentals(ticker):
-    """Load fundamental data from yfinance."""
-    info = yf.Ticker(ticker).get_info()
-    return info or {}
+    """Load fundamental data from yfinance (via the shared on-disk snapshot store)."""
+    return fundamentals_store.get_store().get(ticker)
 
 
+@traced("app.load_industry_market_caps", cached=True)
 @st.cache_data(ttl=3600)
+@cache_miss
 def load_industry_market_caps(tickers):
     """Fetch market caps for a list of tickers."""
     result = {}
-    for ticker in tickers:
-        try:
-            info = yf.Ticker(ticker).get_info()
-            market_cap = info.get("marketCap")
-            if market_cap and market_cap > 0:
-                result[ticker] = market_cap
-        except Exception:
+    for ticker, info in zip(tickers, fundamentals_store.get_store().get_many(tickers)):
+        if not info:
             continue
+        market_cap = info.get("marketCap")
+        if market_cap and market_cap > 0:
+            result[ticker] = market_cap
     return result
 
 
+@traced("app.load_company_logo", cached=True)
 @st.cache_data(ttl=86400)
+@cache_miss
 def load_company_logo(ticker):
     """Fetch company logo URL from Finnhub profile endpoint."""
     try:
         url = f"https://finnhub.io/api/v1/stock/profile2?symbol={ticker}&token={FINNHUB_API_KEY}"
         response = requests.get(url, timeout=10)
+        tracing.add_bytes(len(response.content))
         if response.status_code == 200:
             return response.json().get("logo", "")
         return ""
@@ -497,7 +485,9 @@ def load_company_logo(ticker):
         return ""
 
 
+@traced("app.load_finnhub_news", cached=True)
 @st.cache_data(ttl=1800)
+@cache_miss
 def load_finnhub_news(ticker):
     """Fetch company news from Finnhub API."""
     try:
@@ -506,6 +496,7 @@ def load_finnhub_news(ticker):
         to_date = today.strftime("%Y-%m-%d")
         url = f"https://finnhub.io/api/v1/company-news?symbol={ticker}&from={from_date}&to={to_date}&token={FINNHUB_API_KEY}"
         response = requests.get(url, timeout=10)
+        tracing.add_bytes(len(response.content))
         if response.status_code == 200:
             return response.json()
         return []
@@ -513,7 +504,9 @@ def load_finnhub_news(ticker):
         return []
 
 
+@traced("app.load_financial_statements", cached=True)
 @st.cache_data(ttl=3600)
+@cache_miss
 def load_financial_statements(ticker):
     """Load historical financial statements for charts."""
     try:
@@ -536,6 +529,11 @@ def load_financial_statements(ticker):
         quarterly_cashflow = stock.quarterly_cashflow
         if quarterly_cashflow is not None and not quarterly_cashflow.empty:
             quarterly_cashflow = quarterly_cashflow.T.sort_index()
+        tracing.add_bytes(sum(
+            frame.memory_usage(deep=True).sum()
+            for frame in (income_stmt, balance_sheet, cashflow, quarterly_income, quarterly_balance, quarterly_cashflow)
+            if frame is not None
+        ))
         return {
             "income_stmt": income_stmt,
             "balance_sheet": balance_sheet,
@@ -551,113 +549,248 @@ def load_financial_statements(ticker):
         }
 
 
+@traced("app.load_sector_peers_metrics", cached=True)
 @st.cache_data(ttl=3600)
+@cache_miss
 def load_sector_peers_metrics(tickers: tuple):
     """Load metrics for sector peers comparison."""
-    rows = []
-    for symbol in list(tickers):
-        info = load_fundamentals(symbol)
-        rows.append({
-            "ticker": symbol,
-            "pe": info.get("trailingPE"),
-            "peg": info.get("pegRatio"),
-            "roe": info.get("returnOnEquity"),
-            "net_margin": info.get("profitMargins"),
-            "rev_growth": info.get("revenueGrowth"),
-            "de": info.get("debtToEquity"),
-            "beta": info.get("beta"),
-            "priceToBook": info.get("priceToBook"),
-            "marketCap": info.get("marketCap"),
-        })
+    tickers = list(tickers)
+    infos = fundamentals_store.get_store().get_many(tickers)
+    rows = [peer_metrics_row(symbol, info or {}) for symbol, info in zip(tickers, infos)]
     return pd.DataFrame(rows)
 
 
+@traced("app.load_sector_factor_index", cached=True)
+@st.cache_resource(ttl=3600)
+@cache_miss
+def load_sector_factor_index(tickers: tuple):
+    """Percentile index over the peer metrics of tickers, built once per peer set."""
+    return SectorFactorIndex.from_peers(load_sector_peers_metrics(tickers))
+
+
+@traced("app.load_market_data", cached=True)
 @st.cache_data(ttl=3600)
+@cache_miss
 def load_market_data():
-    """Load S&P 500 and VIX data for market regime detection."""
-    sp500 = yf.Ticker("^GSPC").history(period="2y", interval="1d", auto_adjust=False)
-    vix = yf.Ticker("^VIX").history(period="2y", interval="1d", auto_adjust=False)
-    return sp500, vix
-
-
-def compute_indicators(df):
-    """Compute technical indicators for price data."""
-    df = df.copy()
-    df["SMA20"] = df["Close"].rolling(window=20).mean()
-    df["SMA50"] = df["Close"].rolling(window=50).mean()
-    df["SMA200"] = df["Close"].rolling(window=200).mean()
-    rolling_20 = df["Close"].rolling(window=20)
-    df["BB_MID"] = rolling_20.mean()
-    df["BB_UPPER"] = df["BB_MID"] + 2 * rolling_20.std()
-    df["BB_LOWER"] = df["BB_MID"] - 2 * rolling_20.std()
-
-    delta = df["Close"].diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
-    rs = avg_gain / avg_loss
-    df["RSI"] = 100 - (100 / (1 + rs))
-
-    ema12 = df["Close"].ewm(span=12, adjust=False).mean()
-    ema26 = df["Close"].ewm(span=26, adjust=False).mean()
-    df["MACD"] = ema12 - ema26
-    df["MACD_SIGNAL"] = df["MACD"].ewm(span=9, adjust=False).mean()
-    df["MACD_HIST"] = df["MACD"] - df["MACD_SIGNAL"]
-
-    high_low = df["High"] - df["Low"]
-    high_close = (df["High"] - df["Close"].shift()).abs()
-    low_close = (df["Low"] - df["Close"].shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    df["ATR"] = tr.rolling(window=14).mean()
-
-    ma60 = df["Close"].rolling(window=60).mean()
-    std60 = df["Close"].rolling(window=60).std()
-    df["Z_SCORE_60"] = (df["Close"] - ma60) / std60
-
-    # EMA indicators (Paper 1)
-    df["EMA20"] = df["Close"].ewm(span=20, adjust=False).mean()
-    df["EMA50"] = df["Close"].ewm(span=50, adjust=False).mean()
-
-    # EMA Cross Signal: +1 golden cross, -1 death cross, 0 otherwise
-    ema_cross = pd.Series(0, index=df.index)
-    if len(df) > 1:
-        ema20 = df["EMA20"].values
-        ema50 = df["EMA50"].values
-        for i in range(1, len(df)):
-            if pd.notna(ema20[i]) and pd.notna(ema50[i]) and pd.notna(ema20[i-1]) and pd.notna(ema50[i-1]):
-                if ema20[i-1] <= ema50[i-1] and ema20[i] > ema50[i]:
-                    ema_cross.iloc[i] = 1  # Golden cross
-                elif ema20[i-1] >= ema50[i-1] and ema20[i] < ema50[i]:
-                    ema_cross.iloc[i] = -1  # Death cross
-    df["EMA_Cross_Signal"] = ema_cross
-
-    # Volume indicators
-    if "Volume" in df.columns:
-        df["Volume_SMA20"] = df["Volume"].rolling(window=20).mean()
-        df["Volume_SMA50"] = df["Volume"].rolling(window=50).mean()
-        df["Rel_Volume"] = df["Volume"] / df["Volume_SMA20"]
-        # Volume slope: linear regression slope of Volume_SMA20 over last 10 days
-        vol_sma = df["Volume_SMA20"]
-        slope = vol_sma.rolling(window=10).apply(
-            lambda x: np.polyfit(range(len(x)), x, 1)[0] if len(x) == 10 and x.notna().all() else 0,
-            raw=False,
-        )
-        df["Volume_Slope"] = slope
-
-        # ATV (Average Trading Volume) indicators (Paper 1)
-        df["ATV_20"] = df["Volume"].rolling(window=20).mean()
-        atv_sma = df["ATV_20"]
-        atv_slope = atv_sma.rolling(window=10).apply(
-            lambda x: np.polyfit(range(len(x)), x, 1)[0] if len(x) == 10 and x.notna().all() else 0,
-            raw=False,
-        )
-        df["ATV_Slope"] = atv_slope
+    """Load two years of S&P 500 and VIX data for market regime detection (shared on-disk store)."""
+    start = pd.Timestamp.today().normalize() - pd.DateOffset(years=2)
+    return market_data.load_market_data(start=start)
+
+
+@traced("app.load_market_regime", cached=True)
+@st.cache_data(ttl=3600)
+@cache_miss
+def load_market_regime():
+    """(regime, color, metrics) for today, from the same cached market data."""
+    sp500_market, vix_market = load_market_data()
+    return detect_market_regime(sp500_market, vix_market)
+
+
+# =============================================================================
+# PIPELINE STAGES (memoized per session)
+# =============================================================================
+# prices -> indicators -> scores -> recommendation -> views. Each stage keeps
+# its last result in session state together with the inputs it was computed
+# from, so a rerun triggered by a sidebar widget only recomputes the stages
+# that widget feeds: the risk profile re-scores fundamentals. Position edits
+# do not rerun the script at all (see render_position).
+
+def memo_stage(name, key, compute):
+    """compute() for key, or this session's last result for the stage if its key matches."""
+    stages = st.session_state.setdefault("pipeline_stages", {})
+    with tracing.span(f"stage.{name}", cache="hit") as record:
+        cached = stages.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        if record is not None:
+            record["cache"] = "miss"
+        value = compute()
+        stages[name] = (key, value)
+        return value
+
+
+def frame_key(df):
+    """Content hash of a DataFrame (cached loaders hand back a fresh copy every run)."""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()
+
+
+def info_key(info):
+    """Content hash of a fundamentals info dict."""
+    return hashlib.sha256(json.dumps(info, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def indicator_stage(ticker, price_data):
+    """
+    Indicator frame and its crossover index.
+
+    When a price refresh only appended bars to the history the session's
+    IndicatorState was built from, just the new bars are computed.
+    """
+    previous = st.session_state.get("indicator_state")
+    if previous is not None and previous[0] == ticker and previous[1].extends(price_data):
+        state = previous[1]
+        state.update(price_data.iloc[len(state):])
+    else:
+        state = IndicatorState(price_data)
+        st.session_state["indicator_state"] = (ticker, state)
+    price_data = state.frame
+    return price_data, CrossoverIndex(price_data)
+
+
+def technical_stage(price_data):
+    """(tech_score, tech_details, volume_score, volume_details, rsi_value)."""
+    tech_score, tech_details = calculate_technical_score(price_data)
+    # Volume score (needed for Paper 1)
+    volume_score, volume_details = calculate_volume_score(price_data)
+    # RSI value for RSI gate
+    rsi_value = price_data["RSI"].iloc[-1] if "RSI" in price_data.columns else 50
+    return tech_score, tech_details, volume_score, volume_details, rsi_value
+
+
+def rl_stage(ticker, data_key, price_data, force_retrain):
+    """
+    PPO prediction for the latest bar and whether a model is still on its way.
+
+    Never trains inline: serves the cached policy (if any) and queues training
+    on a miss or a forced retrain. The prediction is memoized only while no
+    training job for the ticker is queued or running, so the model a job
+    finishes is picked up by the rerun the training status panel triggers.
+
+    Returns:
+        (prediction or None, waiting_for_model)
+    """
+    import rl_agent
+    import training_jobs
+
+    manager = training_jobs.get_manager()
+    job = manager.status(ticker)
+    training = job is not None and job["status"] in training_jobs.ACTIVE_STATUSES
+
+    stages = st.session_state.setdefault("pipeline_stages", {})
+    cached = stages.get("rl")
+    if cached is not None and cached[0] == data_key and not (force_retrain or training):
+        return cached[1], False
+    model = rl_agent.load_cached_policy(price_data, ticker=ticker)
+    if model is None or force_retrain:
+        manager.submit(ticker, price_data, force_retrain=force_retrain)
+        training = True
+    prediction = rl_agent.predict_action(model, price_data) if model is not None else None
+    if training:
+        stages.pop("rl", None)
+    else:
+        stages["rl"] = (data_key, prediction)
+    return prediction, training
+
+
+# =============================================================================
+# BACKGROUND RL TRAINING STATUS
+# =============================================================================
+TRAINING_POLL_SECONDS = 3
+
+
+def render_training_status(ticker, waiting_for_model):
+    """
+    Sidebar panel for background PPO training jobs.
+
+    Polls while jobs are active and triggers one full rerun when the selected
+    ticker's model finishes, so the RL prediction replaces the rule-only result.
+    """
+    import training_jobs
+
+    manager = training_jobs.get_manager()
+
+    def panel():
+        job = manager.status(ticker)
+        if job is not None and job["status"] in training_jobs.ACTIVE_STATUSES:
+            st.info(f"Training PPO agent for {ticker} in the background ({job['status']}). "
+                    "Showing the rule-based Paper 1 signal meanwhile.")
+        elif job is not None and job["status"] == training_jobs.FAILED:
+            st.warning(f"RL training for {ticker} failed: {job['error']}")
+        elif job is not None and job["status"] == training_jobs.DONE and waiting_for_model:
+            if st.session_state.get("rl_job_picked_up") != job["job_id"]:
+                st.session_state["rl_job_picked_up"] = job["job_id"]
+                st.rerun()
+
+        jobs = manager.jobs()
+        if jobs:
+            with st.expander(f"Training jobs ({sum(j['status'] in training_jobs.ACTIVE_STATUSES for j in jobs)} active)"):
+                table = pd.DataFrame(jobs)[["ticker", "status", "submitted_at", "finished_at", "error"]]
+                for col in ("submitted_at", "finished_at"):
+                    table[col] = pd.to_datetime(table[col], unit="s").dt.strftime("%H:%M:%S")
+                st.dataframe(table, hide_index=True, use_container_width=True)
+
+    st.fragment(run_every=TRAINING_POLL_SECONDS if manager.has_active() else None)(panel)()
+
+
+# =============================================================================
+# POSITION TRACKER
+# =============================================================================
+
+def render_position(current_price):
+    """
+    Sidebar position widgets and P&L card, run as a fragment.
+
+    Nothing else on the page depends on the position, so toggling "I own this
+    stock" or editing the cost basis reruns only this card.
+    """
+    def card():
+        if st.toggle("I own this stock", value=False):
+            cost_basis = st.number_input("Avg cost per share ($)", min_value=0.01, value=100.0, step=0.01)
+            st.markdown(render_position_card(cost_basis, current_price), unsafe_allow_html=True)
+
+    st.fragment(card)()
+
 
-    # Monthly return (22-trading-day price change)
-    df["Monthly_Return"] = df["Close"].pct_change(periods=22)
+# =============================================================================
+# PERFORMANCE TRACES
+# =============================================================================
+# Finished traces kept per session for the sidebar panel and its export
+TRACE_HISTORY = 20
 
-    return df
+# Optional JSON-lines file every finished trace is appended to
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+
+
+def record_trace(trace):
+    """Keep a finished trace in the session history (and TRACE_FILE, if set)."""
+    if trace is None:
+        return
+    history = st.session_state.setdefault("perf_traces", [])
+    history.append(trace)
+    del history[:-TRACE_HISTORY]
+    if TRACE_FILE:
+        try:
+            tracing.append_jsonl(TRACE_FILE, trace)
+        except OSError:
+            pass
+
+
+def render_performance_panel():
+    """Stage table of the last full page run plus a JSONL export of recent traces."""
+    history = st.session_state.get("perf_traces", [])
+    pages = [t for t in history if t.label == "page"]
+    if not pages:
+        st.caption("No traces recorded yet.")
+        return
+    trace = pages[-1]
+    rows = tracing.summarize(trace)
+    hits = sum(r["hits"] for r in rows)
+    misses = sum(r["misses"] for r in rows)
+    fetched = sum(s["bytes"] for s in trace.spans if s["depth"] == 0)
+    st.caption(
+        f"Last run: {trace.ms:,.0f} ms · cache {hits} hit / {misses} miss · "
+        f"{fetched / 1e6:,.2f} MB fetched"
+    )
+    table = pd.DataFrame(rows)
+    table["total_ms"] = table["total_ms"].round(1)
+    table["self_ms"] = table["self_ms"].round(1)
+    st.dataframe(table, hide_index=True, use_container_width=True)
+    st.download_button(
+        "Export traces (JSONL)",
+        data=tracing.to_jsonl(history),
+        file_name="traces.jsonl",
+        mime="application/x-ndjson",
+    )
 
 
 # =============================================================================
@@ -743,9 +876,17 @@ with st.sidebar:
             if rl_agent.is_available():
                 st.divider()
                 st.header("RL Agent")
-                if st.button("Retrain RL Agent", help="Retrain PPO model on current stock data (~10-30s)"):
+                if st.button("Retrain RL Agent", help="Retrain PPO model on current stock data in the background"):
                     st.session_state["force_retrain_rl"] = True
                 st.caption("PPO agent acts as meta-decision layer on rule-based signals.")
+                watchlist = st.text_input("Pretrain watchlist", placeholder="AAPL, MSFT, NVDA",
+                                          help="Train PPO models for these tickers in the background")
+                if st.button("Pretrain", disabled=not watchlist.strip()):
+                    import training_jobs
+                    tickers = [t.strip().upper() for t in watchlist.replace(";", ",").split(",") if t.strip()]
+                    training_jobs.get_manager().submit_many(tickers)
+                    st.toast(f"Queued RL training for {len(tickers)} ticker(s)")
+                rl_status_container = st.container()
             else:
                 st.divider()
                 st.warning("⚠️ RL Agent unavailable — install `stable-baselines3` and `gymnasium` for full Paper 1 analysis.")
@@ -756,30 +897,34 @@ with st.sidebar:
     # Position tracker
     st.divider()
     st.header("My Position")
-    owns_stock = st.toggle("I own this stock", value=False)
-    cost_basis = None
-    if owns_stock:
-        cost_basis = st.number_input("Avg cost per share ($)", min_value=0.01, value=100.0, step=0.01)
+    position_container = st.container()
 
     st.divider()
     # Clear cache button
     if st.button("Refresh Data", help="Clear cached data and reload fresh data"):
+        fundamentals_store.get_store().invalidate([selected])
         st.cache_data.clear()
         st.rerun()
 
+    show_perf_panel = st.toggle("Performance panel", value=False, key="perf_panel",
+                                help="Per-stage timings, cache hits and bytes fetched for the last runs")
+    perf_container = st.container()
+
 # Load data for selected stock
 with st.spinner("Loading data..."):
     price_data = load_history(selected)
     info = load_fundamentals(selected)
-    financials = load_financial_statements(selected)
 
 if price_data.empty:
     st.error("No price data available for this ticker. Try another selection.")
     st.stop()
 
-price_data = compute_indicators(price_data)
+data_key = (selected, frame_key(price_data))
+price_data, crossovers = memo_stage("indicators", data_key, lambda: indicator_stage(selected, price_data))
 
 last_row = price_data.iloc[-1]
+with position_container:
+    render_position(float(last_row["Close"]))
 prev_row = price_data.iloc[-2] if len(price_data) > 1 else last_row
 change_pct = (last_row["Close"] - prev_row["Close"]) / prev_row["Close"] * 100
 
@@ -788,37 +933,38 @@ industry = info.get("industry", "N/A")
 
 # Load market data for regime detection
 with st.spinner("Analyzing market conditions..."):
-    sp500_market, vix_market = load_market_data()
-    market_regime, regime_color, regime_metrics = detect_market_regime(sp500_market, vix_market)
+    market_regime, regime_color, regime_metrics = load_market_regime()
 
     # Calculate scores
-    tech_score, tech_details = calculate_technical_score(price_data)
-
-    # Volume score (needed for Paper 1)
-    volume_score, volume_details = calculate_volume_score(price_data)
-
-    # RSI value for RSI gate
-    rsi_value = price_data["RSI"].iloc[-1] if "RSI" in price_data.columns else 50
+    tech_score, tech_details, volume_score, volume_details, rsi_value = memo_stage(
+        "technical", data_key, lambda: technical_stage(price_data)
+    )
 
     # Load peer metrics for Paper 2 strategies
     peer_metrics = None
+    peer_tickers = ()
     fund_stock_sector = all_stocks_df[all_stocks_df["ticker"] == selected]["sector"].values
     if len(fund_stock_sector) > 0:
         current_sector = fund_stock_sector[0]
         sector_peers = all_stocks_df[all_stocks_df["sector"] == current_sector]["ticker"].tolist()
         sector_peers = [t for t in sector_peers if t != selected][:15]
         if sector_peers:
-            peer_metrics = load_sector_peers_metrics(tuple(sector_peers + [selected]))
+            peer_tickers = tuple(sector_peers + [selected])
+            peer_metrics = load_sector_factor_index(peer_tickers)
 
     # Paper 2 fundamental score (with price_data for momentum factor)
-    fund_score_p2, fund_details_p2 = calculate_fundamental_score_paper2(
-        info, peer_metrics=peer_metrics, risk_profile=risk_profile, price_data=price_data
+    fund_key = (data_key, info_key(info), peer_tickers, risk_profile)
+    fund_score_p2, fund_details_p2 = memo_stage(
+        "fundamental", fund_key,
+        lambda: calculate_fundamental_score_paper2(
+            info, peer_metrics=peer_metrics, risk_profile=risk_profile, price_data=price_data
+        ),
     )
 
     # Paper 1 signal details (always init, conditionally compute)
     paper1_details = None
     if selected_strategy == "Volume+RSI" and len(price_data) >= 50:
-        _, paper1_details = generate_paper1_signal(price_data)
+        paper1_details = memo_stage("paper1", data_key, lambda: generate_paper1_signal(price_data)[1])
 
     # RL Agent (Paper 1) - always init rl_prediction here to override sidebar init
     rl_prediction = None
@@ -827,40 +973,40 @@ with st.spinner("Analyzing market conditions..."):
             import rl_agent
             if rl_agent.is_available():
                 force_retrain = st.session_state.pop("force_retrain_rl", False)
-                with st.spinner("Loading RL agent..." if not force_retrain else "Training RL agent..."):
-                    model = rl_agent.get_ppo_agent(price_data, ticker=selected, force_retrain=force_retrain)
-                    if model is not None:
-                        rl_prediction = rl_agent.predict_action(model, price_data)
+                rl_prediction, waiting_for_model = rl_stage(selected, data_key, price_data, force_retrain)
+                with rl_status_container:
+                    render_training_status(selected, waiting_for_model=waiting_for_model)
         except ImportError:
             pass
 
 # =============================================================================
-# Dashboard recommendation (long-term horizon) + news + logo (shared by Dashboard & News tabs)
+# VIEWS - Only the selected view is built on each run
 # =============================================================================
-company_logo_url = load_company_logo(selected)
+# st.tabs executes every tab body on every rerun, so any click rebuilt all
+# figures and could start peer fetches for views nobody was looking at. The
+# router renders the selected view only, and runs it as a fragment so the
+# view's own widgets rerun just that view.
+
+def render_dashboard_view():
+    # Dashboard recommendation (long-term horizon) + news + logo
+    company_logo_url = load_company_logo(selected)
+
+    def recommend():
+        if selected_strategy == "Volume+RSI":
+            return generate_recommendation_paper1(
+                tech_score, fund_score_p2, volume_score, rsi_value,
+                market_regime, selected, info, time_horizon="long",
+                price_data=price_data, rl_prediction=rl_prediction,
+            )
+        return generate_recommendation_paper2(
+            tech_score, fund_score_p2, market_regime, selected, info,
+            risk_profile="moderate", time_horizon="long",
+        )
 
-if selected_strategy == "Volume+RSI":
-    dashboard_recommendation = generate_recommendation_paper1(
-        tech_score, fund_score_p2, volume_score, rsi_value,
-        market_regime, selected, info, time_horizon="long",
-        price_data=price_data, rl_prediction=rl_prediction,
-    )
-else:
-    dashboard_recommendation = generate_recommendation_paper2(
-        tech_score, fund_score_p2, market_regime, selected, info,
-        risk_profile="moderate", time_horizon="long",
+    dashboard_recommendation = memo_stage(
+        "recommendation", (fund_key, selected_strategy, market_regime, rl_prediction), recommend
     )
 
-news_items = load_finnhub_news(selected)
-
-# =============================================================================
-# TABS - Render using modular tab files
-# =============================================================================
-dashboard_tab, analysis_tab, overview_tab, technical_tab, fundamentals_tab, news_tab, backtest_tab = st.tabs(
-    ["Dashboard", "Analysis", "Overview", "Technical", "Fundamentals", "News & Sentiment", "Backtest"]
-)
-
-with dashboard_tab:
     dashboard.render(
         selected=selected,
         price_data=price_data,
@@ -878,13 +1024,14 @@ with dashboard_tab:
         recommendation_data=dashboard_recommendation,
         rsi_value=rsi_value,
         selected_strategy=selected_strategy,
-        news_items=news_items,
-        cost_basis=cost_basis,
+        news_items=load_finnhub_news(selected),
         paper1_details=paper1_details,
         logo_url=company_logo_url,
+        crossovers=crossovers,
     )
 
-with analysis_tab:
+
+def render_analysis_view():
     analysis.render(
         selected=selected,
         price_data=price_data,
@@ -903,10 +1050,10 @@ with analysis_tab:
         fund_details_p2=fund_details_p2,
         paper1_details=paper1_details,
         rl_prediction=rl_prediction,
-        cost_basis=cost_basis,
     )
 
-with overview_tab:
+
+def render_overview_view():
     overview.render(
         selected=selected,
         price_data=price_data,
@@ -919,10 +1066,11 @@ with overview_tab:
         change_pct=change_pct,
         sp500_set=sp500_set,
         load_industry_market_caps=load_industry_market_caps,
-        load_sector_peers_metrics=load_sector_peers_metrics,
+        load_sector_factor_index=load_sector_factor_index,
     )
 
-with technical_tab:
+
+def render_technical_view():
     technical.render(
         selected=selected,
         price_data=price_data,
@@ -933,27 +1081,32 @@ with technical_tab:
         selected_strategy=selected_strategy,
         volume_score=volume_score,
         volume_details=volume_details,
+        crossovers=crossovers,
     )
 
-with fundamentals_tab:
+
+def render_fundamentals_view():
     fundamentals.render(
         selected=selected,
         info=info,
-        financials=financials,
+        financials=load_financial_statements(selected),
         all_stocks_df=all_stocks_df,
         filtered_df=filtered_df,
         price_data=price_data,
         load_sector_peers_metrics=load_sector_peers_metrics,
+        load_sector_factor_index=load_sector_factor_index,
         selected_strategy=selected_strategy,
         fund_score_p2=fund_score_p2,
         fund_details_p2=fund_details_p2,
         risk_profile=risk_profile,
     )
 
-with news_tab:
-    news.render(news_items=news_items)
 
-with backtest_tab:
+def render_news_view():
+    news.render(news_items=load_finnhub_news(selected))
+
+
+def render_backtest_view():
     backtest.render(
         selected=selected,
         price_data=price_data,
@@ -962,3 +1115,46 @@ with backtest_tab:
         peer_metrics=peer_metrics,
     )
 
+
+def render_screener_view():
+    screener.render(
+        all_stocks_df=all_stocks_df,
+        market_regime=market_regime,
+        risk_profile=risk_profile,
+    )
+
+
+VIEWS = {
+    "Dashboard": render_dashboard_view,
+    "Analysis": render_analysis_view,
+    "Overview": render_overview_view,
+    "Technical": render_technical_view,
+    "Fundamentals": render_fundamentals_view,
+    "News & Sentiment": render_news_view,
+    "Backtest": render_backtest_view,
+    "Screener": render_screener_view,
+}
+
+
+def run_view():
+    """Build the selected view; a fragment-only rerun records its own trace."""
+    own_trace = tracing.current_trace() is None
+    if own_trace:
+        tracing.begin(f"fragment:{active_view}")
+    with tracing.span(f"view.{active_view}"):
+        VIEWS[active_view]()
+    if own_trace:
+        record_trace(tracing.end())
+
+
+active_view = st.radio("View", list(VIEWS), horizontal=True, key="active_view", label_visibility="collapsed")
+st.fragment(run_view)()
+
+
+# =============================================================================
+# PERFORMANCE PANEL
+# =============================================================================
+record_trace(tracing.end())
+if show_perf_panel:
+    with perf_container:
+        render_performance_panel()
@@ -4,28 +4,41 @@ Backtesting Engine
 ==================
 Importable simulation engine with Sharpe/Sortino/accuracy metrics.
 Also runnable as CLI: python backtest.py AAPL --months 24
+Batch mode:          python backtest.py --universe sp500 --workers 8 --output results.csv
 
 Usage as module:
     from backtest import simulate_strategy, calculate_backtest_metrics
 """
 
 import argparse
+import csv
+import hashlib
 import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 
 from models import (
     calculate_technical_score,
+    calculate_technical_score_series,
     calculate_volume_score,
     calculate_fundamental_score_paper2,
-    detect_market_regime,
+    calculate_fundamental_score_paper2_series,
     generate_recommendation_paper1,
     generate_recommendation_paper2,
     generate_paper1_signal,
+    generate_paper1_signals,
+    SectorFactorIndex,
+    lookup_regimes,
 )
+from indicators import compute_indicators
+from price_store import load_prices
+from fetch_pool import peer_metrics_row
+import fundamentals_store
+import market_data
+import universe
 
 # RL agent - graceful import
 try:
@@ -37,87 +50,6 @@ except (ImportError, OSError):
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 
-# =============================================================================
-# INDICATORS (mirrors app.py compute_indicators)
-# =============================================================================
-
-def compute_indicators(df):
-    """Compute technical indicators (mirrors app.py compute_indicators)."""
-    df = df.copy()
-    df["SMA20"] = df["Close"].rolling(window=20).mean()
-    df["SMA50"] = df["Close"].rolling(window=50).mean()
-    df["SMA200"] = df["Close"].rolling(window=200).mean()
-    rolling_20 = df["Close"].rolling(window=20)
-    df["BB_MID"] = rolling_20.mean()
-    df["BB_UPPER"] = df["BB_MID"] + 2 * rolling_20.std()
-    df["BB_LOWER"] = df["BB_MID"] - 2 * rolling_20.std()
-
-    delta = df["Close"].diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
-    rs = avg_gain / avg_loss
-    df["RSI"] = 100 - (100 / (1 + rs))
-
-    ema12 = df["Close"].ewm(span=12, adjust=False).mean()
-    ema26 = df["Close"].ewm(span=26, adjust=False).mean()
-    df["MACD"] = ema12 - ema26
-    df["MACD_SIGNAL"] = df["MACD"].ewm(span=9, adjust=False).mean()
-    df["MACD_HIST"] = df["MACD"] - df["MACD_SIGNAL"]
-
-    high_low = df["High"] - df["Low"]
-    high_close = (df["High"] - df["Close"].shift()).abs()
-    low_close = (df["Low"] - df["Close"].shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    df["ATR"] = tr.rolling(window=14).mean()
-
-    ma60 = df["Close"].rolling(window=60).mean()
-    std60 = df["Close"].rolling(window=60).std()
-    df["Z_SCORE_60"] = (df["Close"] - ma60) / std60
-
-    # EMA indicators (Paper 1)
-    df["EMA20"] = df["Close"].ewm(span=20, adjust=False).mean()
-    df["EMA50"] = df["Close"].ewm(span=50, adjust=False).mean()
-
-    ema_cross = pd.Series(0, index=df.index)
-    if len(df) > 1:
-        ema20 = df["EMA20"].values
-        ema50 = df["EMA50"].values
-        for i in range(1, len(df)):
-            if pd.notna(ema20[i]) and pd.notna(ema50[i]) and pd.notna(ema20[i-1]) and pd.notna(ema50[i-1]):
-                if ema20[i-1] <= ema50[i-1] and ema20[i] > ema50[i]:
-                    ema_cross.iloc[i] = 1
-                elif ema20[i-1] >= ema50[i-1] and ema20[i] < ema50[i]:
-                    ema_cross.iloc[i] = -1
-    df["EMA_Cross_Signal"] = ema_cross
-
-    # Volume indicators
-    if "Volume" in df.columns:
-        df["Volume_SMA20"] = df["Volume"].rolling(window=20).mean()
-        df["Volume_SMA50"] = df["Volume"].rolling(window=50).mean()
-        df["Rel_Volume"] = df["Volume"] / df["Volume_SMA20"]
-        vol_sma = df["Volume_SMA20"]
-        slope = vol_sma.rolling(window=10).apply(
-            lambda x: np.polyfit(range(len(x)), x, 1)[0] if len(x) == 10 and x.notna().all() else 0,
-            raw=False,
-        )
-        df["Volume_Slope"] = slope
-
-        df["ATV_20"] = df["Volume"].rolling(window=20).mean()
-        atv_sma = df["ATV_20"]
-        atv_slope = atv_sma.rolling(window=10).apply(
-            lambda x: np.polyfit(range(len(x)), x, 1)[0] if len(x) == 10 and x.notna().all() else 0,
-            raw=False,
-        )
-        df["ATV_Slope"] = atv_slope
-
-    # Monthly return
-    df["Monthly_Return"] = df["Close"].pct_change(periods=22)
-
-    return df
-
-
 # =============================================================================
 # SIMULATION ENGINE
 # =============================================================================
@@ -128,7 +60,9 @@ def simulate_strategy(df, strategy_fn, initial_capital=10000):
 
     Args:
         df: DataFrame with indicators computed
-        strategy_fn: fn(df, idx) -> "BUY" | "SELL" | "HOLD"
+        strategy_fn: fn(df, idx) -> "BUY" | "SELL" | "HOLD", or a precomputed
+            signal vector with one entry per row of df. Functions carrying a
+            ``batch`` attribute (fn(df) -> signal vector) are evaluated once.
         initial_capital: Starting capital
 
     Returns:
@@ -146,11 +80,20 @@ def simulate_strategy(df, strategy_fn, initial_capital=10000):
     # Start after enough data for indicators (200 days)
     start_idx = min(200, len(df) - 1)
 
+    signal_vector = None
+    if not callable(strategy_fn):
+        signal_vector = list(strategy_fn)
+    elif getattr(strategy_fn, "batch", None) is not None:
+        signal_vector = list(strategy_fn.batch(df))
+
+    closes = df["Close"].to_numpy()
+    dates = df["Date"].tolist() if "Date" in df.columns else None
+
     for idx in range(start_idx, len(df)):
-        price = df["Close"].iloc[idx]
-        date = df["Date"].iloc[idx] if "Date" in df.columns else idx
+        price = closes[idx]
+        date = dates[idx] if dates is not None else idx
 
-        signal = strategy_fn(df, idx)
+        signal = signal_vector[idx] if signal_vector is not None else strategy_fn(df, idx)
         signals.append((date, signal))
 
         if signal == "BUY" and position == 0:
@@ -282,11 +225,52 @@ def _make_paper1_strategy(info, market_regime):
             return "HOLD"
         signal, _ = generate_paper1_signal(historical, row_idx=-1)
         return signal
+
+    def batch_fn(df):
+        signals, _ = generate_paper1_signals(df)
+        return signals
+
+    strategy_fn.batch = batch_fn
+    strategy_fn.params = {}
     return strategy_fn
 
 
+def _regimes_for(market_regime, df):
+    """
+    Regime label for every row of df.
+
+    market_regime is a single label or a date-indexed regime Series (see
+    load_regime_series); a Series is looked up by df["Date"], falling back to
+    its latest label when df has no dates.
+    """
+    if isinstance(market_regime, str):
+        return np.full(len(df), market_regime, dtype=object)
+    if "Date" not in df.columns:
+        latest = market_regime.iloc[-1] if len(market_regime) else "Unknown"
+        return np.full(len(df), latest, dtype=object)
+    return lookup_regimes(market_regime, df["Date"])
+
+
+# info fields the Paper 2 factor scores read (see models.paper2_factor_scores)
+PAPER2_INFO_FIELDS = (
+    "returnOnEquity", "beta", "marketCap", "priceToBook", "bookValue", "sharesOutstanding", "revenueGrowth",
+)
+
+
+def _regime_fingerprint(market_regime):
+    """The regime label, or a hash of a date-indexed regime Series."""
+    if isinstance(market_regime, str):
+        return market_regime
+    digest = hashlib.sha256(pd.DatetimeIndex(market_regime.index).as_unit("ns").asi8.tobytes())
+    digest.update("\n".join(map(str, market_regime.tolist())).encode())
+    return digest.hexdigest()
+
+
 def _make_paper2_strategy(info, market_regime, peer_metrics=None):
-    """Strategy 3: Paper 2 — Factor scoring."""
+    """Strategy 3: Paper 2 — Factor scoring, weighted by the regime in force on each day."""
+    # Sorted peer arrays are built once, not on every bar
+    peer_metrics = SectorFactorIndex.from_peers(peer_metrics)
+
     def strategy_fn(df, idx):
         historical = df.iloc[:idx + 1]
         if len(historical) < 200:
@@ -295,13 +279,60 @@ def _make_paper2_strategy(info, market_regime, peer_metrics=None):
         fund_score_p2, _ = calculate_fundamental_score_paper2(
             info, peer_metrics=peer_metrics, risk_profile="moderate", price_data=historical
         )
+        regime = _regimes_for(market_regime, df.iloc[idx:idx + 1])[0]
         rec = generate_recommendation_paper2(
-            tech_score, fund_score_p2, market_regime, "BACKTEST", info
+            tech_score, fund_score_p2, regime, "BACKTEST", info
         )
         return rec["recommendation"]
+
+    def batch_fn(df):
+        tech_scores = calculate_technical_score_series(df)["total"]
+        fund_scores, _ = calculate_fundamental_score_paper2_series(
+            info, peer_metrics=peer_metrics, risk_profile="moderate", price_data=df
+        )
+        regimes = _regimes_for(market_regime, df)
+        signals = np.full(len(df), "HOLD", dtype=object)
+        for idx in range(199, len(df)):
+            rec = generate_recommendation_paper2(
+                int(tech_scores[idx]), float(fund_scores[idx]), regimes[idx], "BACKTEST", info
+            )
+            signals[idx] = rec["recommendation"]
+        return signals
+
+    strategy_fn.batch = batch_fn
+    strategy_fn.params = {
+        "info": {field: info.get(field) for field in PAPER2_INFO_FIELDS},
+        "peers": peer_metrics.fingerprint() if peer_metrics is not None else None,
+        "regime": _regime_fingerprint(market_regime),
+        "risk_profile": "moderate",
+    }
     return strategy_fn
 
 
+RL_SIGNAL_MAP = {0: "BUY", 1: "SELL", 2: "HOLD"}
+
+
+def _combine_rl_signal(rule_signal, rl_signal):
+    """Resolve the rule-based signal against the PPO agent's signal."""
+    # If both agree, act with confidence
+    if rule_signal == rl_signal:
+        return rule_signal
+
+    # If rule says HOLD but RL says BUY/SELL, trust RL
+    if rule_signal == "HOLD" and rl_signal in ("BUY", "SELL"):
+        return rl_signal
+
+    # If rule says BUY/SELL but RL disagrees, trust RL (it learned from data)
+    if rule_signal != "HOLD" and rl_signal != rule_signal:
+        return rl_signal
+
+    return "HOLD"
+
+
+# Name of the RL-confirmed strategy in get_strategy_functions()
+RL_STRATEGY = "Paper 1 + RL Agent"
+
+
 def _make_paper1_rl_strategy(info, market_regime, ppo_model):
     """Strategy 5: Paper 1 + RL Agent — rule-based signal confirmed/overridden by PPO."""
     def strategy_fn(df, idx):
@@ -312,112 +343,143 @@ def _make_paper1_rl_strategy(info, market_regime, ppo_model):
         # Get rule-based signal
         rule_signal, _ = generate_paper1_signal(historical, row_idx=-1)
 
-        # Get RL agent prediction
+        # Get RL agent prediction (0=buy, 1=sell, 2=hold)
         rl_action = rl_agent.predict_action(ppo_model, historical, row_idx=-1)
-        # rl_action: 0=buy, 1=sell, 2=hold
-        rl_signal_map = {0: "BUY", 1: "SELL", 2: "HOLD"}
-        rl_signal = rl_signal_map.get(rl_action, "HOLD")
-
-        # If both agree, act with confidence
-        if rule_signal == rl_signal:
-            return rule_signal
-
-        # If rule says HOLD but RL says BUY/SELL, trust RL
-        if rule_signal == "HOLD" and rl_signal in ("BUY", "SELL"):
-            return rl_signal
-
-        # If rule says BUY/SELL but RL disagrees, trust RL (it learned from data)
-        if rule_signal != "HOLD" and rl_signal != rule_signal:
-            return rl_signal
-
-        return "HOLD"
+        rl_signal = RL_SIGNAL_MAP.get(rl_action, "HOLD")
+
+        return _combine_rl_signal(rule_signal, rl_signal)
+
+    def batch_fn(df):
+        rule_signals, _ = generate_paper1_signals(df)
+        # One batched forward pass instead of one model.predict per day
+        rl_actions = rl_agent.predict_actions(ppo_model, df)
+        signals = np.full(len(df), "HOLD", dtype=object)
+        for idx in range(49, len(df)):
+            rl_action = int(rl_actions[idx]) if rl_actions is not None and rl_actions[idx] >= 0 else None
+            signals[idx] = _combine_rl_signal(rule_signals[idx], RL_SIGNAL_MAP.get(rl_action, "HOLD"))
+        return signals
+
+    strategy_fn.batch = batch_fn
+    # Only exported policies can be fingerprinted; results of other models are not stored
+    fingerprint = getattr(ppo_model, "fingerprint", None)
+    strategy_fn.params = {"policy": fingerprint()} if fingerprint is not None else None
     return strategy_fn
 
 
-def get_strategy_functions(info, market_regime, peer_metrics=None, backtest_df=None, ticker="UNKNOWN"):
-    """Return dict of all strategy functions (includes RL if available)."""
+def get_strategy_functions(info, market_regime, peer_metrics=None, backtest_df=None, ticker="UNKNOWN",
+                           include_rl=True):
+    """
+    Return dict of all strategy functions (includes RL if available).
+
+    market_regime is a single label or a date-indexed regime Series from
+    load_regime_series(). Each function carries a ``params`` dict of the
+    inputs besides the price frame that its signals depend on (None when they
+    cannot be fingerprinted), which keys its results in backtest_store.
+    include_rl=False leaves out the RL strategy (see get_rl_strategy).
+    """
     strategies = {
         "Paper 1: EMA+ATV+RSI": _make_paper1_strategy(info, market_regime),
         "Paper 2: Factor Weights": _make_paper2_strategy(info, market_regime, peer_metrics),
     }
 
-    # Add RL-enhanced strategy if available
-    if RL_AVAILABLE and backtest_df is not None and len(backtest_df) >= 100:
-        print("  Training RL agent...", end=" ", flush=True)
-        ppo_model = rl_agent.get_ppo_agent(backtest_df, ticker=ticker)
-        if ppo_model is not None:
-            strategies["Paper 1 + RL Agent"] = _make_paper1_rl_strategy(info, market_regime, ppo_model)
-            print("done.")
-        else:
-            print("failed (not enough data).")
-    elif not RL_AVAILABLE:
-        print("  RL agent: skipped (stable-baselines3 not installed)")
+    if include_rl:
+        rl_strategy = get_rl_strategy(info, market_regime, backtest_df, ticker=ticker)
+        if rl_strategy is not None:
+            strategies[RL_STRATEGY] = rl_strategy
 
     return strategies
 
 
+def get_rl_strategy(info, market_regime, backtest_df, ticker="UNKNOWN", train=True):
+    """
+    Paper 1 + RL Agent strategy function, or None if RL is unavailable.
+
+    With train=False only a policy already in the model registry is used, so
+    callers can check for stored results before paying for a training run.
+    """
+    if not RL_AVAILABLE:
+        print("  RL agent: skipped (stable-baselines3 not installed)")
+        return None
+    if backtest_df is None or len(backtest_df) < 100:
+        return None
+    if not train:
+        ppo_model = rl_agent.load_cached_policy(backtest_df, ticker=ticker)
+        return _make_paper1_rl_strategy(info, market_regime, ppo_model) if ppo_model is not None else None
+
+    print("  Training RL agent...", end=" ", flush=True)
+    ppo_model = rl_agent.get_policy(backtest_df, ticker=ticker)
+    if ppo_model is None:
+        print("failed (not enough data).")
+        return None
+    print("done.")
+    return _make_paper1_rl_strategy(info, market_regime, ppo_model)
+
+
 # =============================================================================
 # HELPER: Load market data
 # =============================================================================
 
-def load_market_data():
-    """Load S&P 500 and VIX data."""
-    sp500 = yf.Ticker("^GSPC").history(period="2y", interval="1d", auto_adjust=False)
-    vix = yf.Ticker("^VIX").history(period="2y", interval="1d", auto_adjust=False)
-    return sp500, vix
+# Calendar days per lookback month; prepare_backtest_data takes 22 bars a month
+DAYS_PER_MONTH = 32
+
+
+def _window_start(lookback_months):
+    return pd.Timestamp.today().normalize() - pd.Timedelta(days=lookback_months * DAYS_PER_MONTH)
+
+
+def load_regime_series(lookback_months=24):
+    """Date-indexed market regime labels covering a backtest window."""
+    return market_data.load_regime_series(start=_window_start(lookback_months))
+
+
+def _latest_regime(market_regime):
+    if isinstance(market_regime, str):
+        return market_regime
+    return market_regime.iloc[-1] if len(market_regime) else "Unknown"
+
+
+_sp500_table = None
+
+
+def _load_sp500_table():
+    """S&P 500 constituents (downloaded once per process, or handed in by the batch runner)."""
+    global _sp500_table
+    if _sp500_table is None:
+        _sp500_table = universe.fetch_sp500_tickers()
+    return _sp500_table
+
+
+def _sector_peers(ticker, sector, limit=10):
+    """First `limit` S&P 500 tickers in sector, excluding ticker."""
+    sp500_df = _load_sp500_table()
+    peers = sp500_df[sp500_df["sector"] == sector]["ticker"].tolist()
+    return [p for p in peers if p != ticker][:limit]
 
 
 def load_peer_metrics(ticker):
-    """Load peer metrics for percentile scoring."""
+    """Load the sector peers of ticker as a SectorFactorIndex for percentile scoring."""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.get_info()
+        info = fundamentals_store.get_store().get(ticker)
         sector = info.get("sector", "")
         if not sector:
             return None
 
-        sp500_url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-        tables = pd.read_html(sp500_url)
-        sp500_df = tables[0]
-        sp500_df.columns = [c.replace(" ", "_") for c in sp500_df.columns]
-
-        sector_col = None
-        for c in sp500_df.columns:
-            if "sector" in c.lower():
-                sector_col = c
-                break
-        if not sector_col:
-            return None
-
-        peers = sp500_df[sp500_df[sector_col] == sector]["Symbol"].tolist()
-        peers = [p.replace(".", "-") for p in peers if p.replace(".", "-") != ticker][:10]
+        peers = _sector_peers(ticker, sector)
 
         if len(peers) < 3:
             return None
 
-        rows = []
-        for p in peers + [ticker]:
-            try:
-                p_info = yf.Ticker(p).get_info()
-                rows.append({
-                    "ticker": p,
-                    "pe": p_info.get("trailingPE"),
-                    "peg": p_info.get("pegRatio"),
-                    "roe": p_info.get("returnOnEquity"),
-                    "net_margin": p_info.get("profitMargins"),
-                    "rev_growth": p_info.get("revenueGrowth"),
-                    "de": p_info.get("debtToEquity"),
-                    "beta": p_info.get("beta"),
-                    "priceToBook": p_info.get("priceToBook"),
-                    "marketCap": p_info.get("marketCap"),
-                })
-            except Exception:
-                continue
+        symbols = peers + [ticker]
+        rows = [
+            peer_metrics_row(p, p_info)
+            for p, p_info in zip(symbols, fundamentals_store.get_store().get_many(symbols))
+            if p_info is not None
+        ]
 
         if len(rows) < 3:
             return None
 
-        return pd.DataFrame(rows)
+        return SectorFactorIndex(pd.DataFrame(rows))
     except Exception:
         return None
 
@@ -426,26 +488,18 @@ def load_peer_metrics(ticker):
 # CLI ENTRY POINT
 # =============================================================================
 
-def run_backtest_cli(ticker, lookback_months=24):
-    """Run backtest for a single ticker (CLI mode)."""
-    print(f"\n{'='*70}")
-    print(f"  BACKTESTING: {ticker}")
-    print(f"{'='*70}")
+def prepare_backtest_data(ticker, lookback_months=24):
+    """
+    Load prices, fundamentals and peers for one ticker and slice the backtest window.
 
-    stock = yf.Ticker(ticker)
-    df = stock.history(period="max", interval="1d", auto_adjust=False)
+    Returns:
+        (backtest_df, info, peer_metrics), or None if there is not enough history
+    """
+    df = load_prices(ticker)
     if df.empty or len(df) < 500:
-        print(f"  ERROR: Insufficient data for {ticker} ({len(df)} days). Need 500+.")
         return None
 
-    df = df.rename_axis("Date").reset_index()
-    info = stock.get_info()
-
-    print("Loading market data...")
-    sp500, vix = load_market_data()
-    market_regime, _, _ = detect_market_regime(sp500, vix)
-
-    print("Loading peer metrics...")
+    info = fundamentals_store.get_store().get(ticker)
     peer_metrics = load_peer_metrics(ticker)
 
     df = compute_indicators(df)
@@ -458,6 +512,26 @@ def run_backtest_cli(ticker, lookback_months=24):
     if "Date" not in backtest_df.columns and "Date" in df.columns:
         backtest_df["Date"] = df["Date"].iloc[start_idx:].values
 
+    return backtest_df, info, peer_metrics
+
+
+def run_backtest_cli(ticker, lookback_months=24, market_regime=None):
+    """Run backtest for a single ticker (CLI mode)."""
+    print(f"\n{'='*70}")
+    print(f"  BACKTESTING: {ticker}")
+    print(f"{'='*70}")
+
+    if market_regime is None:
+        print("Loading market data...")
+        market_regime = load_regime_series(lookback_months)
+
+    print("Loading prices and peer metrics...")
+    prepared = prepare_backtest_data(ticker, lookback_months)
+    if prepared is None:
+        print(f"  ERROR: Insufficient data for {ticker}. Need 500+ days.")
+        return None
+    backtest_df, info, peer_metrics = prepared
+
     strategies = get_strategy_functions(info, market_regime, peer_metrics, backtest_df=backtest_df, ticker=ticker)
 
     print(f"  Period: {backtest_df['Date'].iloc[0]} to {backtest_df['Date'].iloc[-1]}")
@@ -478,15 +552,152 @@ def run_backtest_cli(ticker, lookback_months=24):
     return True
 
 
+# =============================================================================
+# BATCH RUNNER (process pool)
+# =============================================================================
+
+BATCH_COLUMNS = [
+    "ticker", "strategy", "start", "end", "days",
+    "total_return", "annual_return", "sharpe_ratio", "sortino_ratio", "max_drawdown",
+    "trade_count", "accuracy", "win_count", "loss_count", "error",
+]
+
+
+def _init_batch_worker(sp500_table):
+    """Process-pool initializer: reuse the parent's S&P 500 table instead of re-downloading it."""
+    global _sp500_table
+    _sp500_table = sp500_table
+    warnings.filterwarnings("ignore")
+
+
+def backtest_ticker(ticker, lookback_months, market_regime, include_rl=True):
+    """
+    Backtest every strategy on one ticker and return one result row per strategy.
+
+    Never raises: failures come back as a single row with the error filled in.
+    """
+    try:
+        prepared = prepare_backtest_data(ticker, lookback_months)
+        if prepared is None:
+            return [{"ticker": ticker, "error": "insufficient data (need 500+ days)"}]
+        backtest_df, info, peer_metrics = prepared
+
+        strategies = get_strategy_functions(
+            info, market_regime, peer_metrics,
+            backtest_df=backtest_df if include_rl else None, ticker=ticker,
+        )
+        rows = []
+        for name, fn in strategies.items():
+            equity_curve, trades, _ = simulate_strategy(backtest_df, fn)
+            metrics = calculate_backtest_metrics(equity_curve, trades)
+            rows.append({
+                "ticker": ticker,
+                "strategy": name,
+                "start": backtest_df["Date"].iloc[0],
+                "end": backtest_df["Date"].iloc[-1],
+                "days": len(backtest_df),
+                **metrics,
+            })
+        return rows
+    except Exception as e:
+        return [{"ticker": ticker, "error": f"{type(e).__name__}: {e}"}]
+
+
+def _prefetch_fundamentals(tickers):
+    """Fetch every ticker's and sector peer's info into the shared store once, up front."""
+    store = fundamentals_store.get_store()
+    symbols = list(dict.fromkeys(tickers))
+    sp500_df = _load_sp500_table()
+    if not sp500_df.empty:
+        # load_peer_metrics uses at most the first 11 names of each sector
+        for _, group in sp500_df.groupby("sector"):
+            symbols += group["ticker"].head(11).tolist()
+    store.get_many(list(dict.fromkeys(symbols)))
+
+
+def run_batch(tickers, lookback_months=24, workers=1, output="backtest_results.csv", include_rl=True):
+    """
+    Backtest many tickers across a process pool, streaming rows to a CSV file.
+
+    Shared inputs (S&P/VIX regime, S&P 500 table, fundamentals) are fetched
+    once in the parent; each row is written as soon as its ticker finishes.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    print(f"Batch backtest: {len(tickers)} tickers, {workers} worker(s) -> {output}")
+
+    print("Loading market data...")
+    market_regime = load_regime_series(lookback_months)
+    print(f"  Current regime: {_latest_regime(market_regime)}")
+
+    print("Prefetching fundamentals...")
+    _prefetch_fundamentals(tickers)
+
+    done = 0
+    with open(output, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=BATCH_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+
+        def write_rows(ticker, rows):
+            nonlocal done
+            writer.writerows(rows)
+            fh.flush()
+            done += 1
+            status = rows[0].get("error") or f"{len(rows)} strategies"
+            print(f"  [{done}/{len(tickers)}] {ticker}: {status}")
+
+        if workers <= 1:
+            for ticker in tickers:
+                write_rows(ticker, backtest_ticker(ticker, lookback_months, market_regime, include_rl))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_batch_worker, initargs=(_load_sp500_table(),),
+            ) as pool:
+                futures = {
+                    pool.submit(backtest_ticker, ticker, lookback_months, market_regime, include_rl): ticker
+                    for ticker in tickers
+                }
+                for future in as_completed(futures):
+                    ticker = futures[future]
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        rows = [{"ticker": ticker, "error": f"{type(e).__name__}: {e}"}]
+                    write_rows(ticker, rows)
+
+    return output
+
+
 def main():
     parser = argparse.ArgumentParser(description="Backtest scoring strategies on historical stock data")
-    parser.add_argument("tickers", nargs="+", help="Ticker symbols to backtest (e.g., AAPL MSFT)")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols to backtest (e.g., AAPL MSFT)")
     parser.add_argument("--months", type=int, default=24, help="Months of lookback (default: 24)")
+    parser.add_argument("--universe", choices=["sp500", "nasdaq100", "all"],
+                        help="Backtest a whole index universe (batch mode)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for batch mode (default: 1)")
+    parser.add_argument("--output", help="Results CSV for batch mode (default: backtest_results.csv)")
+    parser.add_argument("--no-rl", action="store_true", help="Skip the RL agent strategy (no PPO training)")
     args = parser.parse_args()
 
-    for ticker in args.tickers:
-        ticker = ticker.upper()
-        run_backtest_cli(ticker, lookback_months=args.months)
+    tickers = [t.upper() for t in args.tickers]
+    if args.universe:
+        tickers += universe.fetch_universe(args.universe)["ticker"].tolist()
+    if not tickers:
+        parser.error("give ticker symbols or --universe")
+
+    if args.universe or args.output or args.workers > 1:
+        run_batch(
+            tickers, lookback_months=args.months, workers=max(1, args.workers),
+            output=args.output or "backtest_results.csv", include_rl=not args.no_rl,
+        )
+        print("\nBacktest complete.")
+        return
+
+    print("Loading market data...")
+    market_regime = load_regime_series(args.months)
+    print(f"  Current regime: {_latest_regime(market_regime)}")
+
+    for ticker in tickers:
+        run_backtest_cli(ticker, lookback_months=args.months, market_regime=market_regime)
 
     print(f"\nBacktest complete.")
 
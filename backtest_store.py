@@ -0,0 +1,247 @@
+# =============================================================================
+# BACKTEST_STORE.PY - Persisted backtest results keyed by their inputs
+# =============================================================================
+# One <key>.npz per strategy run holding the equity curve, signals and trades
+# as compact arrays, plus a <key>.json sidecar with the metrics and what the
+# run was computed from. Keys combine the ticker, the backtest period, a hash
+# of the indicator frame and a hash of the strategy name and parameters, so a
+# rerun on unchanged inputs is a file read, and runs from earlier days stay
+# listed for comparison until the oldest are evicted.
+# =============================================================================
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from price_store import DATA_DIR
+
+RESULTS_DIR = os.path.join(DATA_DIR, "backtests")
+
+MAX_RESULTS = 2000
+
+# Length of each hash component in a result key
+_HASH_CHARS = 12
+
+
+def data_digest(df):
+    """Hash of the dates and every numeric column of a backtest frame."""
+    digest = hashlib.sha256()
+    if "Date" in df.columns:
+        digest.update(pd.DatetimeIndex(pd.to_datetime(df["Date"], utc=True)).as_unit("ns").asi8.tobytes())
+    for column in sorted(df.columns.drop("Date", errors="ignore"), key=str):
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+        digest.update(str(column).encode())
+        # One NaN bit pattern, whichever operation produced it
+        digest.update(np.where(np.isnan(values), np.nan, values).tobytes())
+    return digest.hexdigest()
+
+
+def params_digest(strategy, params):
+    """Hash of a strategy name and its JSON-serialisable parameters."""
+    raw = json.dumps({"strategy": strategy, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _encode_dates(dates):
+    """(int64 array, kind) for a list of Timestamps or row positions."""
+    if dates and isinstance(dates[0], pd.Timestamp):
+        index = pd.DatetimeIndex(dates)
+        tz = str(index.tz) if index.tz is not None else ""
+        return (index.tz_convert("UTC") if tz else index).as_unit("ns").asi8, tz
+    return np.asarray(dates, dtype=np.int64), "position"
+
+
+def _decode_dates(values, kind):
+    if kind == "position":
+        return values.tolist()
+    index = pd.to_datetime(values, utc=True)
+    return (index.tz_convert(kind) if kind else index.tz_localize(None)).tolist()
+
+
+def pack_result(equity_curve, trades, signals):
+    """
+    Compact arrays for one simulate_strategy() result.
+
+    The equity curve and the signals share one date per simulated bar; trades
+    point into those dates by position and signals are stored as codes into
+    a label vocabulary.
+    """
+    dates = [d for d, _ in equity_curve]
+    encoded, kind = _encode_dates(dates)
+    labels, codes = np.unique(np.array([s for _, s in signals], dtype=str), return_inverse=True)
+    position = {d: i for i, d in enumerate(dates)}
+    sells = [t for t in trades if t["action"] == "SELL"]
+    return {
+        "dates": encoded,
+        "date_kind": np.array(kind),
+        "equity": np.array([v for _, v in equity_curve], dtype=np.float64),
+        "signal_labels": labels,
+        "signal_codes": codes.astype(np.int16),
+        "trade_pos": np.array([position[t["date"]] for t in trades], dtype=np.int64),
+        "trade_sell": np.array([t["action"] == "SELL" for t in trades], dtype=bool),
+        "trade_price": np.array([t["price"] for t in trades], dtype=np.float64),
+        "trade_shares": np.array([t["shares"] for t in trades], dtype=np.int64),
+        "sell_pnl": np.array([t["pnl"] for t in sells], dtype=np.float64),
+        "sell_return_pct": np.array([t["return_pct"] for t in sells], dtype=np.float64),
+    }
+
+
+def unpack_result(arrays):
+    """Inverse of pack_result: (equity_curve, trades, signals) in simulate_strategy() shape."""
+    dates = _decode_dates(arrays["dates"], str(arrays["date_kind"]))
+    equity_curve = list(zip(dates, arrays["equity"].tolist()))
+    labels = arrays["signal_labels"].tolist()
+    signals = [(d, labels[c]) for d, c in zip(dates, arrays["signal_codes"].tolist())]
+
+    trades = []
+    sell = 0
+    for pos, is_sell, price, shares in zip(arrays["trade_pos"].tolist(), arrays["trade_sell"].tolist(),
+                                           arrays["trade_price"], arrays["trade_shares"].tolist()):
+        trade = {"date": dates[pos], "action": "SELL" if is_sell else "BUY", "price": price, "shares": shares}
+        if is_sell:
+            trade["pnl"] = arrays["sell_pnl"][sell]
+            trade["return_pct"] = arrays["sell_return_pct"][sell]
+            sell += 1
+        trades.append(trade)
+    return equity_curve, trades, signals
+
+
+class BacktestStore:
+    """
+    On-disk backtest results with JSON metadata and oldest-first eviction.
+
+    A result is the dict the Backtest tab works with: equity_curve, trades,
+    signals and metrics, plus the sidecar metadata under "meta".
+    """
+
+    def __init__(self, root=RESULTS_DIR, max_results=MAX_RESULTS):
+        self.root = root
+        self.max_results = max_results
+
+    def key(self, ticker, period, data_hash, strategy, params):
+        return "_".join([
+            ticker.upper(), period, data_hash[:_HASH_CHARS], params_digest(strategy, params)[:_HASH_CHARS],
+        ])
+
+    def result_path(self, key):
+        return os.path.join(self.root, f"{key}.npz")
+
+    def meta_path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, ticker, period, data_hash, strategy, params):
+        """Stored result for these inputs, or None."""
+        return self._load(self.key(ticker, period, data_hash, strategy, params))
+
+    def put(self, ticker, period, data_hash, strategy, params, equity_curve, trades, signals, metrics):
+        """
+        Store one strategy run and evict the oldest results over the cap.
+
+        Returns:
+            The stored result dict
+        """
+        os.makedirs(self.root, exist_ok=True)
+        key = self.key(ticker, period, data_hash, strategy, params)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez_compressed(fh, **pack_result(equity_curve, trades, signals))
+            os.replace(tmp_path, self.result_path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        meta = {
+            "key": key,
+            "ticker": ticker.upper(),
+            "period": period,
+            "data_hash": data_hash,
+            "strategy": strategy,
+            "params": params,
+            "data_start": str(equity_curve[0][0]) if equity_curve else None,
+            "data_end": str(equity_curve[-1][0]) if equity_curve else None,
+            "created_at": time.time(),
+            "metrics": metrics,
+        }
+        self._write_meta(key, meta)
+        self.evict()
+        return {"equity_curve": equity_curve, "trades": trades, "signals": signals,
+                "metrics": metrics, "meta": meta}
+
+    def latest(self, ticker, period, data_hash):
+        """{strategy: result} of the newest stored run of each strategy on this data."""
+        pattern = f"{ticker.upper()}_{period}_{data_hash[:_HASH_CHARS]}_*.json"
+        newest = {}
+        for meta in self._metas(pattern):
+            current = newest.get(meta["strategy"])
+            if current is None or meta["created_at"] > current["created_at"]:
+                newest[meta["strategy"]] = meta
+        results = {}
+        for strategy, meta in newest.items():
+            result = self._load(meta["key"])
+            if result is not None:
+                results[strategy] = result
+        return results
+
+    def runs(self, ticker=None):
+        """Metadata (with metrics) of every stored run, optionally for one ticker, newest first."""
+        pattern = f"{ticker.upper()}_*.json" if ticker else "*.json"
+        return sorted(self._metas(pattern), key=lambda m: m.get("created_at", 0), reverse=True)
+
+    def remove(self, key):
+        for path in (self.result_path(key), self.meta_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self):
+        """Drop the oldest results until at most max_results remain."""
+        if len(glob.glob(os.path.join(self.root, "*.json"))) <= self.max_results:
+            return
+        metas = self.runs()
+        for meta in metas[self.max_results:]:
+            self.remove(meta["key"])
+
+    def _load(self, key):
+        try:
+            with open(self.meta_path(key)) as fh:
+                meta = json.load(fh)
+            with np.load(self.result_path(key), allow_pickle=False) as data:
+                equity_curve, trades, signals = unpack_result(data)
+        except (OSError, KeyError, ValueError):
+            return None
+        return {"equity_curve": equity_curve, "trades": trades, "signals": signals,
+                "metrics": meta["metrics"], "meta": meta}
+
+    def _metas(self, pattern):
+        found = []
+        for path in glob.glob(os.path.join(self.root, pattern)):
+            try:
+                with open(path) as fh:
+                    found.append(json.load(fh))
+            except (OSError, ValueError):
+                continue
+        return found
+
+    def _write_meta(self, key, meta):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(meta, fh, indent=2, default=str)
+        os.replace(tmp_path, self.meta_path(key))
+
+
+_default_store = None
+
+
+def get_store():
+    """Shared BacktestStore under data_cache/backtests."""
+    global _default_store
+    if _default_store is None:
+        _default_store = BacktestStore()
+    return _default_store
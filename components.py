@@ -280,3 +280,15 @@ def render_accent_card(label, value, tooltip="", status="neutral", border_color=
     </div>
     """
 
+
+def render_position_card(cost_basis, current_price):
+    """Render the position P&L card for a holding bought at cost_basis."""
+    pnl_pct = (current_price - cost_basis) / cost_basis * 100
+    pnl_dollar = current_price - cost_basis
+    pnl_label = "Profit" if pnl_pct >= 0 else "Loss"
+    return f"""
+    <div style="background:{'rgba(16,185,129,0.08)' if pnl_pct >= 0 else 'rgba(239,68,68,0.08)'}; border-left:4px solid {'#10B981' if pnl_pct >= 0 else '#EF4444'}; padding:12px 16px; border-radius:6px; margin:8px 0;">
+        <span style="font-weight:600;">My Position:</span> Bought at <b>${cost_basis:.2f}</b> → Now <b>${current_price:.2f}</b> —
+        <span style="color:{'#10B981' if pnl_pct >= 0 else '#EF4444'}; font-weight:700;">{pnl_label}: {pnl_pct:+.1f}% (${pnl_dollar:+.2f}/share)</span>
+    </div>
+    """
@@ -0,0 +1,106 @@
+# =============================================================================
+# DOWNSAMPLE.PY - Largest-Triangle-Three-Buckets thinning for long chart series
+# =============================================================================
+# A full-width chart cannot show more than about one point per pixel, yet the
+# "Max" timeframe sends every daily bar since listing to the browser, once per
+# trace. LTTB keeps the first and last bar and, from each bucket in between,
+# the bar that spans the largest triangle with its neighbours, so peaks,
+# troughs and trend turns survive while the payload shrinks to the chart
+# width. Rows the caller must keep (e.g. crossover bars) and the edges of NaN
+# runs (indicator warm-up) are always kept.
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+
+# Plot-area width in pixels assumed for full-width charts
+CHART_WIDTH_PX = 1000
+
+# Bar width as a share of the spacing between bars (Plotly's default bargap is 0.2)
+BAR_FILL = 0.8
+
+
+def lttb_indices(values, n_out):
+    """
+    Row positions chosen by LTTB over evenly spaced values.
+
+    NaN values are filled from their neighbours for the selection only.
+
+    Args:
+        values: 1-D array-like of y values
+        n_out: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted np.ndarray of row positions; every row when n_out >= len(values)
+    """
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = pd.Series(np.asarray(values, dtype=np.float64)).replace([np.inf, -np.inf], np.nan).ffill().bfill()
+    y = y.fillna(0.0).to_numpy()
+
+    # Bucket i covers rows bounds[i]:bounds[i + 1]; rows 0 and n-1 are kept as is
+    every = (n - 2) / (n_out - 2)
+    bounds = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    x = np.arange(n, dtype=np.float64)
+    sums = np.add.reduceat(y[:n - 1], bounds[:-1])
+    counts = np.diff(bounds)
+    # Centroid of the bucket after each bucket (the last point for the final bucket)
+    next_x = np.append(((bounds[1:-1] + bounds[2:] - 1) / 2), n - 1)
+    next_y = np.append(sums[1:] / counts[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        area = np.abs(
+            (x[anchor] - next_x[i]) * (y[lo:hi] - y[anchor])
+            - (x[anchor] - x[lo:hi]) * (next_y[i] - y[anchor])
+        )
+        anchor = lo + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+
+def chart_rows(df, column, max_points=CHART_WIDTH_PX, keep_dates=()):
+    """
+    Rows of a chart frame to plot: all of them, or an LTTB selection on column.
+
+    Args:
+        df: Chart frame (one row per bar, with a Date column)
+        column: Column whose shape drives the selection (e.g. "Close")
+        max_points: Point budget, normally the chart width in pixels
+        keep_dates: Dates whose rows are always kept (e.g. crossover bars)
+
+    Returns:
+        df itself when it fits the budget, else the selected rows in order
+    """
+    if len(df) <= max_points or column not in df.columns:
+        return df
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+    rows = [lttb_indices(values, max_points)]
+
+    # Keep both sides of every NaN/value boundary so line gaps start and end where they did
+    missing = np.isnan(values)
+    edges = np.flatnonzero(missing[1:] != missing[:-1])
+    rows.extend([edges, edges + 1])
+    if len(keep_dates) and "Date" in df.columns:
+        rows.append(np.flatnonzero(np.isin(df["Date"].values, np.asarray(keep_dates, dtype=df["Date"].values.dtype))))
+    return df.iloc[np.unique(np.concatenate(rows))]
+
+
+def bar_widths(plot_df, full_len):
+    """
+    Bar widths in milliseconds for a thinned date axis, or None if nothing was dropped.
+
+    Plotly sizes date-axis bars by the smallest gap between bars, so thinned
+    bars would otherwise be one day wide and leave the chart mostly empty.
+    """
+    if len(plot_df) >= full_len or len(plot_df) < 2:
+        return None
+    ns = pd.DatetimeIndex(pd.to_datetime(plot_df["Date"].values)).as_unit("ns").asi8
+    gaps = np.diff(ns) / 1e6
+    return (np.append(gaps, gaps[-1]) * BAR_FILL).tolist()
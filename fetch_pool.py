@@ -0,0 +1,112 @@
+# =============================================================================
+# FETCH_POOL.PY - Bounded concurrent fetching for per-ticker network calls
+# =============================================================================
+# A shared thread pool with per-host concurrency limits, retry with exponential
+# backoff and per-key failure isolation. Results always come back in the order
+# the keys were given, so a cold sector view costs roughly one round trip.
+# =============================================================================
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+MAX_WORKERS = 16
+
+# Simultaneous requests allowed per upstream host, shared by every caller
+HOST_LIMITS = {
+    "yahoo": 8,
+    "finnhub": 4,
+}
+DEFAULT_HOST_LIMIT = 4
+
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.5
+
+# Peer comparison columns and the yfinance info keys they come from
+PEER_METRIC_FIELDS = {
+    "pe": "trailingPE",
+    "peg": "pegRatio",
+    "roe": "returnOnEquity",
+    "net_margin": "profitMargins",
+    "rev_growth": "revenueGrowth",
+    "de": "debtToEquity",
+    "beta": "beta",
+    "priceToBook": "priceToBook",
+    "marketCap": "marketCap",
+}
+
+_host_semaphores = {}
+_host_lock = threading.Lock()
+
+
+def _host_semaphore(host):
+    with _host_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+        return _host_semaphores[host]
+
+
+def _call_with_retry(fetch_fn, key, host, retries, backoff):
+    semaphore = _host_semaphore(host)
+    for attempt in range(retries + 1):
+        try:
+            with semaphore:
+                return fetch_fn(key)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+
+
+def fetch_many(keys, fetch_fn, host="yahoo", max_workers=MAX_WORKERS,
+               retries=DEFAULT_RETRIES, backoff=BACKOFF_BASE):
+    """
+    Call fetch_fn(key) for every key concurrently.
+
+    Args:
+        keys: Iterable of keys (e.g. tickers)
+        fetch_fn: fn(key) -> result; may raise
+        host: Host name used for the shared concurrency limit (see HOST_LIMITS)
+        max_workers: Upper bound on pool threads for this call
+        retries: Extra attempts per key after a failure
+        backoff: Base delay in seconds, doubled on every retry
+
+    Returns:
+        list of results in key order; None where every attempt failed
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+
+    def run(key):
+        with tracing.count_bytes() as fetched:
+            try:
+                result = _call_with_retry(fetch_fn, key, host, retries, backoff)
+            except Exception:
+                result = None
+        return result, fetched[0]
+
+    workers = max(1, min(max_workers, len(keys)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(run, keys))
+    # Traces are per thread: credit the workers' bytes to the caller's spans
+    tracing.add_bytes(sum(n for _, n in outcomes))
+    return [result for result, _ in outcomes]
+
+
+def fetch_info(ticker):
+    """yfinance get_info() for one ticker ({} when Yahoo returns nothing)."""
+    import yfinance as yf
+
+    return yf.Ticker(ticker).get_info() or {}
+
+
+def peer_metrics_row(ticker, info):
+    """Build a peer-comparison row from a yfinance info dict."""
+    row = {"ticker": ticker}
+    for column, key in PEER_METRIC_FIELDS.items():
+        row[column] = info.get(key)
+    return row
@@ -0,0 +1,151 @@
+# =============================================================================
+# FUNDAMENTALS_STORE.PY - On-disk yfinance info snapshots shared across processes
+# =============================================================================
+# SQLite table keyed by ticker holding the get_info() dict and when it was
+# fetched. The Streamlit app, the backtest tab and the CLI all read through it,
+# so a peer's info is downloaded once per freshness window, not once per
+# ticker, session or process.
+# =============================================================================
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import tracing
+from fetch_pool import fetch_info, fetch_many
+from price_store import DATA_DIR
+
+DB_PATH = os.path.join(DATA_DIR, "fundamentals.sqlite")
+
+# Seconds a snapshot stays fresh; None keeps snapshots forever
+DEFAULT_MAX_AGE = 12 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    info TEXT NOT NULL
+)
+"""
+
+
+class FundamentalsStore:
+    """
+    Ticker -> info snapshot cache with a freshness policy.
+
+    The fetcher is any callable fetcher(ticker) -> info dict; it defaults to
+    yfinance get_info(). Misses are fetched concurrently through fetch_pool.
+    """
+
+    def __init__(self, path=DB_PATH, fetcher=None, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.fetcher = fetcher or fetch_info
+        self.max_age = max_age
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _is_fresh(self, fetched_at, max_age):
+        return max_age is None or time.time() - fetched_at < max_age
+
+    def read_many(self, tickers):
+        """Stored snapshots as {ticker: (fetched_at, info)} without fetching."""
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        found = {}
+        with self._connect() as conn:
+            # Chunk to stay under SQLite's bound-parameter limit
+            for start in range(0, len(tickers), 500):
+                chunk = tickers[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT ticker, fetched_at, info FROM fundamentals WHERE ticker IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for ticker, fetched_at, info in rows:
+                    found[ticker] = (fetched_at, json.loads(info))
+        return found
+
+    def put_many(self, infos, fetched_at=None):
+        """Store {ticker: info} snapshots."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [(t, fetched_at, json.dumps(info, default=str)) for t, info in infos.items()]
+        if not rows:
+            return
+        tracing.add_bytes(sum(len(row[2]) for row in rows))
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO fundamentals (ticker, fetched_at, info) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def invalidate(self, tickers=None):
+        """Drop snapshots for tickers (all snapshots when tickers is None)."""
+        with self._connect() as conn:
+            if tickers is None:
+                conn.execute("DELETE FROM fundamentals")
+            else:
+                conn.executemany("DELETE FROM fundamentals WHERE ticker = ?", [(t,) for t in tickers])
+
+    def get_many(self, tickers, max_age=None):
+        """
+        Info dicts for tickers, fetching only missing or stale snapshots.
+
+        Args:
+            tickers: Iterable of ticker symbols
+            max_age: Override the store's freshness window for this call
+
+        Returns:
+            list of info dicts in ticker order; a stale snapshot is returned if a
+            refetch fails, None if the ticker was never fetched successfully
+        """
+        tickers = list(tickers)
+        max_age = self.max_age if max_age is None else max_age
+        stored = self.read_many(tickers)
+
+        missing = [t for t in dict.fromkeys(tickers)
+                   if t not in stored or not self._is_fresh(stored[t][0], max_age)]
+        fetched = {}
+        if missing:
+            for ticker, info in zip(missing, fetch_many(missing, self.fetcher, host="yahoo")):
+                if info:
+                    fetched[ticker] = info
+            self.put_many(fetched)
+
+        results = []
+        for ticker in tickers:
+            if ticker in fetched:
+                results.append(fetched[ticker])
+            elif ticker in stored:
+                results.append(stored[ticker][1])
+            else:
+                results.append(None)
+        return results
+
+    def get(self, ticker, max_age=None):
+        """Info dict for one ticker ({} if it could not be fetched)."""
+        return self.get_many([ticker], max_age=max_age)[0] or {}
+
+
+_default_store = None
+
+
+def get_store():
+    """Shared FundamentalsStore backed by yfinance."""
+    global _default_store
+    if _default_store is None:
+        _default_store = FundamentalsStore()
+    return _default_store
@@ -0,0 +1,485 @@
+# =============================================================================
+# INDICATORS.PY - Technical indicator engine shared by the app and backtester
+# =============================================================================
+# Every indicator is computed with whole-column array operations; there are no
+# per-row Python loops, so multi-decade period="max" histories stay cheap.
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from tracing import traced
+
+SLOPE_WINDOW = 10
+
+
+def rolling_slope(values, window=SLOPE_WINDOW):
+    """
+    Rolling least-squares slope of values against x = 0..window-1.
+
+    Closed form of np.polyfit(range(window), x, 1)[0]: with x and y centred on
+    their means, slope = sum(x_c * y_c) / sum(x_c ** 2). Centring y on each
+    window's mean keeps the rounding error relative to the window's range
+    rather than its level (volume averages sit around 1e7), so a flat window
+    is exactly 0 where polyfit returns noise of either sign. Windows that
+    contain NaN (including the warm-up) yield NaN, as rolling().apply() does.
+    A 2-D input (bars x tickers) is handled column by column.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    out = np.full(y.shape, np.nan)
+    if len(y) < window:
+        return out
+    x = np.arange(window, dtype=np.float64)
+    x -= x.mean()
+    weights = x / np.dot(x, x)
+    windows = sliding_window_view(y, window, axis=0)
+    out[window - 1:] = (windows - windows.mean(axis=-1, keepdims=True)) @ weights
+    return out
+
+
+def ema_cross_signal(ema_fast, ema_slow):
+    """
+    Crossover events between two EMA columns: +1 golden cross, -1 death cross, 0 otherwise.
+
+    A bar only counts when both EMAs are present on it and on the previous bar.
+    A 2-D input (bars x tickers) is handled column by column.
+    """
+    fast = np.asarray(ema_fast, dtype=np.float64)
+    slow = np.asarray(ema_slow, dtype=np.float64)
+    signal = np.zeros(fast.shape, dtype=np.int64)
+    if len(fast) < 2:
+        return signal
+
+    prev_fast, prev_slow = fast[:-1], slow[:-1]
+    cur_fast, cur_slow = fast[1:], slow[1:]
+    valid = ~(np.isnan(prev_fast) | np.isnan(prev_slow) | np.isnan(cur_fast) | np.isnan(cur_slow))
+
+    golden = valid & (prev_fast <= prev_slow) & (cur_fast > cur_slow)
+    death = valid & (prev_fast >= prev_slow) & (cur_fast < cur_slow)
+    signal[1:][golden] = 1
+    signal[1:][death] = -1
+    return signal
+
+
+@traced()
+def compute_indicators(df):
+    """Compute technical indicators for price data."""
+    df = df.copy()
+    df["SMA20"] = df["Close"].rolling(window=20).mean()
+    df["SMA50"] = df["Close"].rolling(window=50).mean()
+    df["SMA200"] = df["Close"].rolling(window=200).mean()
+    rolling_20 = df["Close"].rolling(window=20)
+    df["BB_MID"] = rolling_20.mean()
+    std_20 = rolling_20.std()
+    df["BB_UPPER"] = df["BB_MID"] + 2 * std_20
+    df["BB_LOWER"] = df["BB_MID"] - 2 * std_20
+
+    delta = df["Close"].diff()
+    gain = delta.where(delta > 0, 0.0)
+    loss = -delta.where(delta < 0, 0.0)
+    avg_gain = gain.rolling(window=14).mean()
+    avg_loss = loss.rolling(window=14).mean()
+    rs = avg_gain / avg_loss
+    df["RSI"] = 100 - (100 / (1 + rs))
+
+    ema12 = df["Close"].ewm(span=12, adjust=False).mean()
+    ema26 = df["Close"].ewm(span=26, adjust=False).mean()
+    df["MACD"] = ema12 - ema26
+    df["MACD_SIGNAL"] = df["MACD"].ewm(span=9, adjust=False).mean()
+    df["MACD_HIST"] = df["MACD"] - df["MACD_SIGNAL"]
+
+    high_low = df["High"] - df["Low"]
+    high_close = (df["High"] - df["Close"].shift()).abs()
+    low_close = (df["Low"] - df["Close"].shift()).abs()
+    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    df["ATR"] = tr.rolling(window=14).mean()
+
+    ma60 = df["Close"].rolling(window=60).mean()
+    std60 = df["Close"].rolling(window=60).std()
+    df["Z_SCORE_60"] = (df["Close"] - ma60) / std60
+
+    # EMA indicators (Paper 1)
+    df["EMA20"] = df["Close"].ewm(span=20, adjust=False).mean()
+    df["EMA50"] = df["Close"].ewm(span=50, adjust=False).mean()
+
+    # EMA Cross Signal: +1 golden cross, -1 death cross, 0 otherwise
+    df["EMA_Cross_Signal"] = ema_cross_signal(df["EMA20"], df["EMA50"])
+
+    # Volume indicators
+    if "Volume" in df.columns:
+        df["Volume_SMA20"] = df["Volume"].rolling(window=20).mean()
+        df["Volume_SMA50"] = df["Volume"].rolling(window=50).mean()
+        df["Rel_Volume"] = df["Volume"] / df["Volume_SMA20"]
+        # Volume slope: linear regression slope of Volume_SMA20 over last 10 days
+        df["Volume_Slope"] = rolling_slope(df["Volume_SMA20"])
+
+        # ATV (Average Trading Volume) indicators (Paper 1)
+        df["ATV_20"] = df["Volume"].rolling(window=20).mean()
+        df["ATV_Slope"] = rolling_slope(df["ATV_20"])
+
+    # Monthly return (22-trading-day price change)
+    df["Monthly_Return"] = df["Close"].pct_change(periods=22)
+
+    return df
+
+
+# =============================================================================
+# CROSSOVER EVENTS
+# =============================================================================
+
+# Moving-average pairs tracked by CrossoverIndex: name -> (fast column, slow column)
+CROSSOVER_PAIRS = {
+    "sma": ("SMA50", "SMA200"),
+    "ema": ("EMA20", "EMA50"),
+}
+
+
+def _as_datetime64(value):
+    """numpy datetime64 of a date-like value (tz-aware values in UTC, like Series.values)."""
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.to_datetime64()
+
+
+class CrossoverIndex:
+    """
+    Golden and death crosses of every CROSSOVER_PAIRS pair over an indicator frame.
+
+    Built once from compute_indicators() output with the same sign-change rule
+    as ema_cross_signal. The events table has one row per cross (pair, kind,
+    row, Date, price, level), where level is the fast average on the crossing
+    bar. Events are kept sorted by date per (pair, kind), so between() slices a
+    chart's date range with a binary search instead of rescanning the history.
+    """
+
+    def __init__(self, df):
+        dates = df["Date"].values
+        close = df["Close"].to_numpy(dtype=np.float64)
+        frames = []
+        for pair, (fast, slow) in CROSSOVER_PAIRS.items():
+            if fast not in df.columns or slow not in df.columns:
+                continue
+            signal = ema_cross_signal(df[fast], df[slow])
+            rows = np.flatnonzero(signal)
+            frames.append(pd.DataFrame({
+                "pair": pair,
+                "kind": np.where(signal[rows] > 0, "golden", "death"),
+                "row": rows,
+                "Date": dates[rows],
+                "price": close[rows],
+                "level": df[fast].to_numpy(dtype=np.float64)[rows],
+            }))
+        columns = ["pair", "kind", "row", "Date", "price", "level"]
+        self.events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        self._groups = {}
+        for (pair, kind), group in self.events.groupby(["pair", "kind"], sort=False):
+            self._groups[(pair, kind)] = (
+                group["Date"].to_numpy(),
+                group["price"].to_numpy(),
+                group["level"].to_numpy(),
+            )
+
+    def __len__(self):
+        return len(self.events)
+
+    def between(self, pair, start=None, end=None):
+        """
+        Crosses of one pair dated within [start, end] (either bound may be None).
+
+        Args:
+            pair: Key of CROSSOVER_PAIRS, e.g. "sma" or "ema"
+            start, end: Date bounds
+
+        Returns:
+            (golden, death) lists of (date, price, level) tuples, oldest first
+        """
+        found = []
+        for kind in ("golden", "death"):
+            group = self._groups.get((pair, kind))
+            if group is None:
+                found.append([])
+                continue
+            dates, prices, levels = group
+            lo = 0 if start is None else np.searchsorted(dates, _as_datetime64(start), side="left")
+            hi = len(dates) if end is None else np.searchsorted(dates, _as_datetime64(end), side="right")
+            found.append(list(zip(dates[lo:hi], prices[lo:hi], levels[lo:hi])))
+        return found[0], found[1]
+
+    def in_frame(self, pair, chart_df):
+        """Crosses of one pair within the date span of chart_df (a tail of the indexed frame)."""
+        if chart_df.empty:
+            return [], []
+        return self.between(pair, chart_df["Date"].iloc[0], chart_df["Date"].iloc[-1])
+
+
+# =============================================================================
+# PANEL (MANY TICKERS AT ONCE)
+# =============================================================================
+
+def compute_panel_indicators(close, volume=None):
+    """
+    Screener indicators for many tickers in one pass.
+
+    Args:
+        close: DataFrame of closes, bars x tickers. Each column is one ticker's
+               most recent history aligned on its last bar and left-padded with
+               NaN, so every column is computed exactly as compute_indicators
+               would on that ticker alone.
+        volume: DataFrame of volumes with the same shape, or None
+
+    Returns:
+        dict of column name -> DataFrame (bars x tickers) for SMA50, SMA200, RSI,
+        MACD, MACD_SIGNAL, MACD_HIST, EMA20, EMA50, EMA_Cross_Signal,
+        Monthly_Return and, with volume, Rel_Volume, Volume_Slope and ATV_Slope
+    """
+    panel = {}
+    panel["SMA50"] = close.rolling(window=50).mean()
+    panel["SMA200"] = close.rolling(window=200).mean()
+
+    # Padding bars must not count as zero gains/losses in the first RSI window
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0.0).where(close.notna())
+    loss = (-delta.where(delta < 0, 0.0)).where(close.notna())
+    rs = gain.rolling(window=14).mean() / loss.rolling(window=14).mean()
+    panel["RSI"] = 100 - (100 / (1 + rs))
+
+    ema12 = close.ewm(span=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, adjust=False).mean()
+    panel["MACD"] = ema12 - ema26
+    panel["MACD_SIGNAL"] = panel["MACD"].ewm(span=9, adjust=False).mean()
+    panel["MACD_HIST"] = panel["MACD"] - panel["MACD_SIGNAL"]
+
+    panel["EMA20"] = close.ewm(span=20, adjust=False).mean()
+    panel["EMA50"] = close.ewm(span=50, adjust=False).mean()
+    panel["EMA_Cross_Signal"] = pd.DataFrame(
+        ema_cross_signal(panel["EMA20"], panel["EMA50"]), index=close.index, columns=close.columns
+    )
+
+    if volume is not None:
+        volume_sma20 = volume.rolling(window=20).mean()
+        panel["Rel_Volume"] = volume / volume_sma20
+        slope = rolling_slope(volume_sma20)
+        panel["Volume_Slope"] = pd.DataFrame(slope, index=close.index, columns=close.columns)
+        # ATV_20 is the same 20-bar volume mean
+        panel["ATV_Slope"] = panel["Volume_Slope"]
+
+    panel["Monthly_Return"] = close / close.shift(22) - 1
+    return panel
+
+
+# =============================================================================
+# INCREMENTAL UPDATES
+# =============================================================================
+
+# Bars between a close and the close Monthly_Return compares it with
+MONTH_BARS = 22
+
+_EMA_SPANS = {"ema12": 12, "ema26": 26, "ema20": 20, "ema50": 50}
+
+
+def _ewm_continue(last_value, values, span):
+    """Continue an adjust=False EWM from its last value over new observations."""
+    seeded = pd.Series(np.concatenate([[last_value], np.asarray(values, dtype=np.float64)]))
+    return seeded.ewm(span=span, adjust=False).mean().to_numpy()[1:]
+
+
+class _RollingWindow:
+    """
+    Last `window` observations of one series with their running sum and NaN count.
+
+    push() yields the same values as rolling(window).mean() / .std() on the
+    whole series (NaN until the window is full or while it holds a NaN).
+    """
+
+    def __init__(self, window, history=()):
+        values = np.asarray(history, dtype=np.float64)
+        self.window = window
+        self.values = values[-window:].copy()
+        self.total = float(np.nansum(self.values))
+        self.nans = int(np.isnan(self.values).sum())
+        self.seen = len(values)
+
+    def push(self, new, std=False):
+        """
+        Add observations; returns the window mean at each (and the sample std if std).
+        """
+        new = np.asarray(new, dtype=np.float64)
+        k, w, m = len(new), self.window, len(self.values)
+        full = np.concatenate([self.values, new])
+        missing = np.isnan(full)
+        clean = np.where(missing, 0.0, full)
+
+        # Position in full of the observation each new one pushes out of the window
+        leaving = np.arange(m, m + k) - w
+        has_leaving = leaving >= 0
+        leaving = np.maximum(leaving, 0)
+        sums = self.total + np.cumsum(clean[m:] - np.where(has_leaving, clean[leaving], 0.0))
+        nans = self.nans + np.cumsum(missing[m:].astype(np.int64) - (has_leaving & missing[leaving]))
+        complete = (self.seen + np.arange(1, k + 1) >= w) & (nans == 0)
+        mean = np.where(complete, sums / w, np.nan)
+
+        deviation = None
+        if std:
+            deviation = np.full(k, np.nan)
+            starts = np.arange(m, m + k) - w + 1
+            if complete.any():
+                windows = sliding_window_view(full, w)
+                deviation[complete] = windows[starts[complete]].std(axis=1, ddof=1)
+
+        self.values = full[-w:]
+        self.total = float(sums[-1])
+        self.nans = int(nans[-1])
+        self.seen += k
+        return (mean, deviation) if std else mean
+
+
+class IndicatorState:
+    """
+    Append-only indicator state for a single ticker.
+
+    Holds what the next bar's indicators depend on: the running sums and
+    window buffers of the SMA, Bollinger, RSI gain/loss, ATR, Z-score and
+    volume averages, the last value of every EMA, the last closes and the
+    recent ATV averages for the slope. update() therefore extends the
+    indicator frame in O(new rows) instead of re-running compute_indicators
+    over the full history, and stores the new rows as a chunk rather than
+    copying the frame. Results match a full recompute up to floating-point
+    rounding.
+
+    Usage:
+        state = IndicatorState(history)    # full compute once
+        rows = state.update(new_bars)      # indicator rows for new_bars only
+        state.frame                        # full indicator frame so far
+    """
+
+    def __init__(self, df):
+        frame = compute_indicators(df)
+        self._chunks = [frame]
+        self._length = len(frame)
+        self._range_index = isinstance(frame.index, pd.RangeIndex)
+        self._raw_columns = list(df.columns)
+        self._first_raw = df.iloc[:1].copy()
+        self._last_raw = df.iloc[-1:].copy()
+
+        close = df["Close"].to_numpy(dtype=np.float64)
+        self._close_tail = close[-MONTH_BARS:]
+        self._sma = {window: _RollingWindow(window, close) for window in (20, 50, 60, 200)}
+
+        delta = np.diff(close, prepend=np.nan)
+        self._gain = _RollingWindow(14, np.where(delta > 0, delta, 0.0))
+        self._loss = _RollingWindow(14, np.where(delta < 0, -delta, 0.0))
+        self._tr = _RollingWindow(14, self._true_range(df, np.concatenate([[np.nan], close[:-1]])))
+
+        self._ema = {
+            name: frame["Close"].ewm(span=span, adjust=False).mean().iloc[-1] if len(frame) else np.nan
+            for name, span in _EMA_SPANS.items()
+        }
+        self._ema["macd_signal"] = frame["MACD_SIGNAL"].iloc[-1] if len(frame) else np.nan
+
+        self._has_volume = "Volume" in df.columns
+        if self._has_volume:
+            volume = df["Volume"].to_numpy(dtype=np.float64)
+            self._volume = {window: _RollingWindow(window, volume) for window in (20, 50)}
+            self._atv_tail = frame["ATV_20"].to_numpy(dtype=np.float64)[-(SLOPE_WINDOW - 1):]
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def frame(self):
+        """Full indicator frame so far (appended chunks are joined on first access)."""
+        if len(self._chunks) > 1:
+            self._chunks = [pd.concat(self._chunks)]
+        return self._chunks[0]
+
+    def extends(self, df):
+        """Whether df starts with the bars this state was built from (same first and last bar)."""
+        n = self._length
+        if n == 0 or len(df) < n or list(df.columns) != self._raw_columns:
+            return False
+        return (df.iloc[:1].reset_index(drop=True).equals(self._first_raw.reset_index(drop=True))
+                and df.iloc[n - 1:n].reset_index(drop=True).equals(self._last_raw.reset_index(drop=True)))
+
+    @staticmethod
+    def _true_range(df, prev_close):
+        high = df["High"].to_numpy(dtype=np.float64)
+        low = df["Low"].to_numpy(dtype=np.float64)
+        return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+    def update(self, new_rows):
+        """
+        Append new bars (same columns as the original history) and return their indicator rows.
+        """
+        k = len(new_rows)
+        if k == 0:
+            return self._chunks[0].iloc[0:0]
+
+        new_rows = new_rows[self._raw_columns]
+        rows = new_rows.copy()
+        close = new_rows["Close"].to_numpy(dtype=np.float64)
+        last_close = self._close_tail[-1:] if len(self._close_tail) else np.array([np.nan])
+        prev_close = np.concatenate([last_close, close[:-1]])
+
+        rows["SMA20"], std_20 = self._sma[20].push(close, std=True)
+        rows["SMA50"] = self._sma[50].push(close)
+        rows["SMA200"] = self._sma[200].push(close)
+        rows["BB_MID"] = rows["SMA20"]
+        rows["BB_UPPER"] = rows["BB_MID"] + 2 * std_20
+        rows["BB_LOWER"] = rows["BB_MID"] - 2 * std_20
+
+        delta = close - prev_close
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = self._gain.push(np.where(delta > 0, delta, 0.0)) / self._loss.push(np.where(delta < 0, -delta, 0.0))
+            rows["RSI"] = 100 - (100 / (1 + rs))
+
+        # Recursive EMA columns continue from the stored state
+        ema = {name: _ewm_continue(self._ema[name], close, span) for name, span in _EMA_SPANS.items()}
+        macd = ema["ema12"] - ema["ema26"]
+        macd_signal = _ewm_continue(self._ema["macd_signal"], macd, 9)
+        rows["MACD"] = macd
+        rows["MACD_SIGNAL"] = macd_signal
+        rows["MACD_HIST"] = macd - macd_signal
+
+        rows["ATR"] = self._tr.push(self._true_range(new_rows, prev_close))
+
+        ma60, std60 = self._sma[60].push(close, std=True)
+        rows["Z_SCORE_60"] = (close - ma60) / std60
+
+        rows["EMA20"] = ema["ema20"]
+        rows["EMA50"] = ema["ema50"]
+        rows["EMA_Cross_Signal"] = ema_cross_signal(
+            np.concatenate([[self._ema["ema20"]], ema["ema20"]]),
+            np.concatenate([[self._ema["ema50"]], ema["ema50"]]),
+        )[1:]
+
+        if self._has_volume:
+            volume = new_rows["Volume"].to_numpy(dtype=np.float64)
+            volume_sma20 = self._volume[20].push(volume)
+            rows["Volume_SMA20"] = volume_sma20
+            rows["Volume_SMA50"] = self._volume[50].push(volume)
+            rows["Rel_Volume"] = volume / volume_sma20
+            slope = rolling_slope(np.concatenate([self._atv_tail, volume_sma20]))[-k:]
+            rows["Volume_Slope"] = slope
+            rows["ATV_20"] = volume_sma20
+            rows["ATV_Slope"] = slope
+            self._atv_tail = np.concatenate([self._atv_tail, volume_sma20])[-(SLOPE_WINDOW - 1):]
+
+        # Closes from MONTH_BARS bars back, NaN-padded at the start of the history
+        closes = np.concatenate([np.full(MONTH_BARS - len(self._close_tail), np.nan), self._close_tail, close])
+        rows["Monthly_Return"] = close / closes[:k] - 1
+
+        if self._range_index:
+            rows.index = pd.RangeIndex(self._length, self._length + k)
+
+        for name in _EMA_SPANS:
+            self._ema[name] = ema[name][-1]
+        self._ema["macd_signal"] = macd_signal[-1]
+        self._close_tail = closes[-MONTH_BARS:]
+        if self._length == 0:
+            self._first_raw = new_rows.iloc[:1].copy()
+        self._last_raw = new_rows.iloc[-1:].copy()
+        self._chunks.append(rows)
+        self._length += k
+        return rows
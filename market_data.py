@@ -0,0 +1,62 @@
+# =============================================================================
+# MARKET_DATA.PY - Shared S&P 500 / VIX history for market-regime detection
+# =============================================================================
+# The index series live in the shared on-disk price store next to the stock
+# histories, so the app, the backtest tab and the CLI batch runner all read
+# the same files. A refresh only downloads the bars after the stored series,
+# and only once the store's freshness window has passed, so regime inputs
+# cost one small delta fetch per window for the whole deployment instead of
+# a two-year download per process.
+# =============================================================================
+
+import pandas as pd
+
+import price_store
+from models import detect_market_regime_series
+
+SP500_SYMBOL = "^GSPC"
+VIX_SYMBOL = "^VIX"
+
+
+def _since(frame, start):
+    """Rows of frame dated on or after start (wall-clock dates; start may be None)."""
+    if start is None or frame.empty:
+        return frame
+    index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    return frame[index >= pd.Timestamp(start)]
+
+
+def load_index(symbol, start=None, store=None):
+    """
+    Daily history of an index symbol from the shared store, refreshed by delta.
+
+    Args:
+        symbol: Index symbol, e.g. "^GSPC"
+        start: First date to return (inclusive), or None for the full history
+        store: PriceStore override; the shared store when None
+
+    Returns:
+        DataFrame indexed by date (yfinance history() shape); empty if unavailable
+    """
+    store = store or price_store.get_store()
+    return _since(store.refresh(symbol), start)
+
+
+def load_market_data(start=None, store=None):
+    """(sp500, vix) daily histories from start onward."""
+    return load_index(SP500_SYMBOL, start, store), load_index(VIX_SYMBOL, start, store)
+
+
+def load_regime_series(start=None, store=None):
+    """
+    Market regime for every S&P 500 bar from start onward.
+
+    The regimes are computed over the full stored history before slicing, so
+    the first bars of the window are already warmed up.
+
+    Returns:
+        Series of regime labels indexed by date (empty if the index data is unavailable)
+    """
+    sp500, vix = load_market_data(store=store)
+    regimes = detect_market_regime_series(sp500, vix)["regime"]
+    return _since(regimes, start)
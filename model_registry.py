@@ -0,0 +1,142 @@
+# =============================================================================
+# MODEL_REGISTRY.PY - Bounded on-disk registry for trained models
+# =============================================================================
+# One <key>.zip per model plus a <key>.json sidecar describing what it was
+# trained on and an optional <key>.npz compact export for fast inference. Keys
+# are content hashes chosen by the caller. Every hit refreshes the entry's
+# last_used stamp, and after each registration the least recently used models
+# are evicted until the registry fits its count and size caps.
+# =============================================================================
+
+import glob
+import json
+import os
+import tempfile
+import time
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models_cache")
+
+MAX_MODELS = 40
+MAX_BYTES = 512 * 1024 * 1024
+
+
+class ModelRegistry:
+    """
+    Content-addressed model files with JSON metadata and LRU eviction.
+
+    Only entries with a sidecar are managed: model files without one (e.g. the
+    ppo_*.zip files of the older cache layout, some of them tracked in git)
+    are never evicted and do not count toward the caps.
+    """
+
+    def __init__(self, root=MODEL_DIR, max_models=MAX_MODELS, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+
+    def model_path(self, key):
+        return os.path.join(self.root, f"{key}.zip")
+
+    def meta_path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def export_path(self, key):
+        return os.path.join(self.root, f"{key}.npz")
+
+    def get(self, key):
+        """Metadata for key, or None if the model or its sidecar is missing."""
+        if not os.path.exists(self.model_path(key)):
+            return None
+        try:
+            with open(self.meta_path(key)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def entries(self):
+        """Metadata of every registered model, newest first."""
+        found = []
+        for meta_path in glob.glob(os.path.join(self.root, "*.json")):
+            key = os.path.splitext(os.path.basename(meta_path))[0]
+            meta = self.get(key)
+            if meta is not None:
+                found.append(meta)
+        return sorted(found, key=lambda m: m.get("created_at", 0), reverse=True)
+
+    def touch(self, key):
+        """Mark key as just used."""
+        meta = self.get(key)
+        if meta is not None:
+            meta["last_used"] = time.time()
+            self._write_meta(key, meta)
+
+    def register(self, key, save_fn, meta, export_fn=None):
+        """
+        Store a model under key and evict old entries.
+
+        Args:
+            key: Content hash identifying the model
+            save_fn: fn(path) writing the model file to path (a .zip path)
+            meta: JSON-serialisable metadata for the sidecar
+            export_fn: Optional fn(path) writing the compact export (a .npz path)
+
+        Returns:
+            The stored metadata dict
+        """
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp.zip")
+        os.close(fd)
+        try:
+            save_fn(tmp_path)
+            os.replace(tmp_path, self.model_path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if export_fn is not None:
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp.npz")
+            os.close(fd)
+            try:
+                export_fn(tmp_path)
+                os.replace(tmp_path, self.export_path(key))
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        now = time.time()
+        meta = dict(meta, key=key, created_at=now, last_used=now, size_bytes=self._size(key))
+        self._write_meta(key, meta)
+        self.evict(keep=key)
+        return meta
+
+    def remove(self, key):
+        for path in (self.model_path(key), self.meta_path(key), self.export_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self, keep=None):
+        """Drop least recently used models until within max_models and max_bytes."""
+        candidates = sorted((meta.get("last_used", 0), meta["key"], self._size(meta["key"]))
+                            for meta in self.entries())
+        count = len(candidates)
+        total = sum(size for _, _, size in candidates)
+        for _, key, size in candidates:
+            if count <= self.max_models and total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            count -= 1
+            total -= size
+
+    def _size(self, key):
+        paths = (self.model_path(key), self.export_path(key))
+        return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+
+    def _write_meta(self, key, meta):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(meta, fh, indent=2, default=str)
+        os.replace(tmp_path, self.meta_path(key))
@@ -2,9 +2,13 @@
 # MODELS.PY - Scoring algorithms, sentiment analysis, and recommendation engine
 # =============================================================================
 
+import hashlib
+
 import numpy as np
 import pandas as pd
 
+from tracing import traced
+
 # =============================================================================
 # SENTIMENT ANALYSIS
 # =============================================================================
@@ -70,6 +74,7 @@ def classify_risk(df):
 # MARKET REGIME DETECTION
 # =============================================================================
 
+@traced()
 def detect_market_regime(sp500_df, vix_df):
     """
     Detect market regime: Bull, Bear, Sideways, or High-Volatility.
@@ -127,10 +132,88 @@ def detect_market_regime(sp500_df, vix_df):
     return "Sideways", "orange", metrics
 
 
+def _naive_dates(dates):
+    """Dates as a tz-naive DatetimeIndex (wall-clock time kept), for as-of lookups."""
+    index = pd.DatetimeIndex(dates)
+    return index.tz_localize(None) if index.tz is not None else index
+
+
+def detect_market_regime_series(sp500_df, vix_df):
+    """
+    Whole-history version of detect_market_regime.
+
+    Each S&P 500 bar gets the regime detect_market_regime would return with
+    both histories cut at that date: VIX values are taken as of the bar (the
+    latest VIX close on or before it). Bars before the first VIX close are
+    "Unknown".
+
+    Returns:
+        DataFrame indexed like sp500_df with "regime", "price_vs_sma200",
+        "sma200_slope", "sma_crossover", "vix" and "vix_ma20" columns
+    """
+    columns = ["regime", "price_vs_sma200", "sma200_slope", "sma_crossover", "vix", "vix_ma20"]
+    if sp500_df.empty or vix_df.empty:
+        return pd.DataFrame(columns=columns, index=sp500_df.index)
+
+    close = sp500_df["Close"].to_numpy(dtype=np.float64)
+    sma200 = sp500_df["Close"].rolling(window=200).mean().to_numpy()
+    sma50 = sp500_df["Close"].rolling(window=50).mean().to_numpy()
+
+    # SMA200 19 bars back (iloc[-20]); the current value until 20 bars exist
+    sma200_ago = np.concatenate([sma200[:19], sma200[:-19]])[:len(sma200)]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sma200_slope = np.where(sma200_ago != 0, (sma200 - sma200_ago) / sma200_ago * 100, 0.0)
+        price_vs_sma200 = np.where(sma200 != 0, (close - sma200) / sma200 * 100, 0.0)
+        sma_crossover = np.where(sma200 != 0, (sma50 - sma200) / sma200 * 100, 0.0)
+
+    vix_close = pd.Series(vix_df["Close"].to_numpy(dtype=np.float64), index=_naive_dates(vix_df.index))
+    vix_ma20 = vix_close.rolling(window=20).mean()
+    dates = _naive_dates(sp500_df.index)
+    vix = vix_close.reindex(dates, method="ffill").to_numpy()
+    vix_ma = vix_ma20.reindex(dates, method="ffill").to_numpy()
+
+    high_vol = (vix > 25) | (vix > vix_ma * 1.3)
+    bull = (price_vs_sma200 > 2) & (sma200_slope > 0) & (sma_crossover > 0)
+    bear = (price_vs_sma200 < -2) & (sma200_slope < 0) & (sma_crossover < 0)
+    regime = np.select([high_vol, bull, bear], ["High-Volatility", "Bull", "Bear"], default="Sideways").astype(object)
+    regime[np.isnan(vix)] = "Unknown"
+
+    return pd.DataFrame({
+        "regime": regime,
+        "price_vs_sma200": price_vs_sma200,
+        "sma200_slope": sma200_slope,
+        "sma_crossover": sma_crossover,
+        "vix": vix,
+        "vix_ma20": vix_ma,
+    }, index=sp500_df.index)
+
+
+def lookup_regimes(regimes, dates):
+    """
+    Regime label in force on each of dates.
+
+    Args:
+        regimes: Series of labels indexed by date (e.g. the "regime" column of
+                 detect_market_regime_series), or a single label for every date
+        dates: Sequence of dates
+
+    Returns:
+        np.ndarray of labels; "Unknown" before the first regime date
+    """
+    dates = _naive_dates(dates)
+    if isinstance(regimes, str):
+        return np.full(len(dates), regimes, dtype=object)
+    series = pd.Series(regimes.to_numpy(dtype=object), index=_naive_dates(regimes.index))
+    series = series[~series.index.duplicated(keep="last")].sort_index()
+    return series.reindex(dates, method="ffill").fillna("Unknown").to_numpy(dtype=object)
+
+
 # =============================================================================
 # SCORING MODELS
 # =============================================================================
 
+@traced()
 def calculate_technical_score(df):
     """Calculate technical score (0-100) based on trend, RSI, MACD."""
     if df.empty or len(df) < 200:
@@ -196,6 +279,87 @@ def calculate_technical_score(df):
     return total, scores
 
 
+def technical_subscores(close, sma50, sma200, rsi, macd, macd_signal, macd_hist):
+    """
+    Element-wise calculate_technical_score thresholds over aligned arrays.
+
+    Works for any set of observations (one ticker over time, or many tickers on
+    one day); warm-up handling is left to the caller.
+
+    Returns:
+        dict of np.ndarray: "trend", "rsi", "macd", "total"
+    """
+    trend = np.select(
+        [
+            (close > sma50) & (sma50 > sma200),
+            (close > sma50) & (close > sma200),
+            close > sma200,
+            (close < sma50) & (sma50 < sma200),
+            (close < sma50) & (close < sma200),
+        ],
+        [40, 30, 20, 0, 10],
+        default=15,
+    )
+    trend[np.isnan(sma50) | np.isnan(sma200)] = 0
+
+    rsi_score = np.select(
+        [
+            (rsi >= 40) & (rsi <= 60),
+            (rsi >= 30) & (rsi < 40),
+            (rsi > 60) & (rsi <= 70),
+            rsi < 30,
+            rsi > 70,
+        ],
+        [25, 30, 20, 25, 10],
+        default=15,
+    )
+
+    macd_score = np.select(
+        [
+            (macd > macd_signal) & (macd_hist > 0) & (macd > 0),
+            (macd > macd_signal) & (macd_hist > 0),
+            (macd < macd_signal) & (macd_hist < 0) & (macd < 0),
+            (macd < macd_signal) & (macd_hist < 0),
+        ],
+        [30, 25, 5, 10],
+        default=15,
+    )
+
+    return {"trend": trend, "rsi": rsi_score, "macd": macd_score, "total": trend + rsi_score + macd_score}
+
+
+@traced()
+def calculate_technical_score_series(df):
+    """
+    Whole-series version of calculate_technical_score.
+
+    Row i of each array equals what calculate_technical_score(df.iloc[:i + 1])
+    returns: the total is 50 during the 200-bar warm-up, the sub-scores are
+    computed for every row with the same thresholds.
+
+    Returns:
+        dict of np.ndarray: "trend", "rsi", "macd", "total"
+    """
+    n = len(df)
+    close = df["Close"].to_numpy(dtype=np.float64)
+
+    def _column(name, fill):
+        if name in df.columns:
+            return df[name].to_numpy(dtype=np.float64)
+        return np.full(n, fill, dtype=np.float64)
+
+    sma50 = df["SMA50"].to_numpy(dtype=np.float64) if "SMA50" in df.columns else df["Close"].rolling(50).mean().to_numpy()
+    sma200 = df["SMA200"].to_numpy(dtype=np.float64) if "SMA200" in df.columns else df["Close"].rolling(200).mean().to_numpy()
+
+    scores = technical_subscores(
+        close, sma50, sma200, _column("RSI", 50.0),
+        _column("MACD", 0.0), _column("MACD_SIGNAL", 0.0), _column("MACD_HIST", 0.0),
+    )
+    scores["total"][:min(n, 199)] = 50
+    return scores
+
+
+@traced()
 def calculate_risk_score(df):
     """Calculate risk score (0-100, higher = less risky/better)."""
     if df.empty:
@@ -527,6 +691,7 @@ def generate_view_changers(recommendation, info, price_data):
 # STRATEGY 2: Paper 1 — EMA Crossover + ATV Confirmation + RSI Gate + RL Agent
 # =============================================================================
 
+@traced()
 def calculate_volume_score(df):
     """
     Calculate volume score (0-100) based on volume trend alignment and
@@ -583,6 +748,39 @@ def calculate_volume_score(df):
     return total, {"score": total, "volume_confirms_trend": volume_confirms, "details": details}
 
 
+def volume_score_arrays(price_change, vol_slope, rel_vol):
+    """
+    Element-wise calculate_volume_score over aligned arrays.
+
+    Args:
+        price_change: Close change over the last 10 bars (0 when unavailable)
+        vol_slope: Volume_Slope (NaN is treated as 0)
+        rel_vol: Rel_Volume (NaN is treated as 1.0)
+
+    Returns:
+        np.ndarray of int scores (0-100)
+    """
+    price_change = np.asarray(price_change, dtype=np.float64)
+    vol_slope = np.nan_to_num(np.asarray(vol_slope, dtype=np.float64), nan=0.0)
+    rel_vol = np.asarray(rel_vol, dtype=np.float64)
+    rel_vol = np.where(np.isnan(rel_vol), 1.0, rel_vol)
+
+    confirms = ((price_change > 0) & (vol_slope > 0)) | ((price_change < 0) & (vol_slope < 0))
+    alignment = np.where(
+        confirms, 40 + np.minimum(10, np.abs(vol_slope) / 100000),
+        np.where(vol_slope == 0, 25, 10),
+    )
+    alignment = np.clip(alignment, 0, 50)
+
+    rel_score = np.select(
+        [rel_vol >= 2.0, rel_vol >= 1.5, rel_vol >= 1.2, rel_vol >= 0.8, rel_vol >= 0.5],
+        [50, 40, 35, 25, 15],
+        default=5,
+    )
+    return np.clip((alignment + rel_score).astype(np.int64), 0, 100)
+
+
+@traced()
 def generate_paper1_signal(df, row_idx=-1):
     """
     Generate Paper 1 signal faithfully: EMA20/50 crossover + ATV slope confirmation + RSI gate.
@@ -664,6 +862,88 @@ def generate_paper1_signal(df, row_idx=-1):
         return "HOLD", details
 
 
+def paper1_signal_masks(ema_cross, atv_slope, rsi):
+    """
+    Element-wise generate_paper1_signal rules (without the 50-bar warm-up).
+
+    Args:
+        ema_cross: EMA_Cross_Signal values (+1 / -1 / 0)
+        atv_slope: ATV_Slope with NaN already replaced by 0
+        rsi: RSI with NaN already replaced by 50
+
+    Returns:
+        (golden, death, golden_confirmed, death_confirmed, buy, sell) boolean arrays
+    """
+    golden = ema_cross == 1
+    death = ema_cross == -1
+    golden_confirmed = golden & (atv_slope > 0)
+    death_confirmed = death & (atv_slope < 0)
+    buy = golden_confirmed & (rsi <= 70)
+    sell = death_confirmed & (rsi >= 30)
+    return golden, death, golden_confirmed, death_confirmed, buy, sell
+
+
+@traced()
+def generate_paper1_signals(df):
+    """
+    Batch version of generate_paper1_signal: evaluate every row in one NumPy pass.
+
+    Row i gets exactly the signal generate_paper1_signal(df.iloc[:i + 1]) would
+    return, so rows before the 50-bar warm-up are HOLD.
+
+    Returns:
+        signals: np.ndarray of "BUY" / "SELL" / "HOLD", one per row
+        details: DataFrame (same index as df) with the per-row detail fields
+    """
+    n = len(df)
+    index = df.index
+
+    def _column(name, fill):
+        if name in df.columns:
+            return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+        return np.full(n, fill, dtype=np.float64)
+
+    ema_cross = _column("EMA_Cross_Signal", 0.0)
+    atv_raw = _column("ATV_Slope", 0.0)
+    rsi_raw = _column("RSI", 50.0)
+    atv_slope = np.where(np.isnan(atv_raw), 0.0, atv_raw)
+    rsi = np.where(np.isnan(rsi_raw), 50.0, rsi_raw)
+
+    golden, death, golden_confirmed, death_confirmed, buy, sell = paper1_signal_masks(ema_cross, atv_slope, rsi)
+    no_cross = ~(golden | death)
+    warm = np.arange(n) >= 49
+
+    signals = np.full(n, "HOLD", dtype=object)
+    signals[warm & buy] = "BUY"
+    signals[warm & sell] = "SELL"
+
+    crossover_type = np.where(golden, "golden_cross", np.where(death, "death_cross", "none")).astype(object)
+    rsi_gate = np.full(n, "n/a", dtype=object)
+    rsi_gate[buy | sell] = "passed"
+    rsi_gate[golden_confirmed & ~buy] = "blocked_overbought"
+    rsi_gate[death_confirmed & ~sell] = "blocked_oversold"
+
+    ema20 = _column("EMA20", np.nan)
+    ema50 = _column("EMA50", np.nan)
+    ema_trend = np.where(ema20 > ema50, "bullish", "bearish").astype(object)
+    ema_trend[np.isnan(ema20) | np.isnan(ema50)] = "neutral"
+    ema_trend[~no_cross] = None
+
+    details = pd.DataFrame({
+        "ema_cross_signal": np.nan_to_num(ema_cross).astype(np.int64),
+        "atv_slope": atv_slope,
+        "rsi": rsi,
+        "crossover_type": crossover_type,
+        "atv_confirmed": golden_confirmed | death_confirmed,
+        "rsi_gate": rsi_gate,
+        "ema_trend": ema_trend,
+    }, index=index)
+    details["reason"] = np.where(warm, None, "insufficient_data")
+
+    return signals, details
+
+
+@traced()
 def generate_recommendation_paper1(tech_score, fund_score, volume_score, rsi_value,
                                     market_regime, ticker, info, time_horizon="long",
                                     price_data=None, rl_prediction=None):
@@ -852,15 +1132,87 @@ INTERACTION_COEFFICIENTS = {
 }
 
 
-def _percentile_rank(value, values, higher_is_better=True):
-    """Compute percentile rank (0-100) of value within values list."""
-    valid = [v for v in values if v is not None and not pd.isna(v)]
-    if not valid or value is None or pd.isna(value):
-        return 50
-    rank = sum(1 for v in valid if v <= value) / len(valid) * 100
-    if not higher_is_better:
-        rank = 100 - rank
-    return rank
+class SectorFactorIndex:
+    """
+    Sorted peer values per metric column for percentile ranking.
+
+    Built once from a peer-metrics DataFrame (one row per peer, e.g. from
+    peer_metrics_row); None/NaN entries are dropped. rank() is a binary search,
+    so scoring every stock of a sector costs O(log n) per factor instead of a
+    scan of the peer list, and rank_many() ranks a whole array in one call.
+    A value's percentile is the share of peers at or below it (0-100), or 100
+    minus that when lower is better; a missing value or an empty column ranks 50.
+    """
+
+    def __init__(self, peer_metrics):
+        self.columns = [c for c in peer_metrics.columns if c != "ticker"]
+        self.size = len(peer_metrics)
+        self.sorted = {}
+        for column in self.columns:
+            values = pd.to_numeric(peer_metrics[column], errors="coerce").to_numpy(dtype=np.float64)
+            self.sorted[column] = np.sort(values[~np.isnan(values)])
+
+    @classmethod
+    def from_peers(cls, peer_metrics):
+        """Index for peer_metrics (returned as-is if already an index); None when there are no peers."""
+        if peer_metrics is None or isinstance(peer_metrics, cls):
+            return peer_metrics
+        if peer_metrics.empty:
+            return None
+        return cls(peer_metrics)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, column):
+        return column in self.sorted
+
+    def with_member(self, row):
+        """Copy of the index with one more peer (a {column: value} dict) inserted."""
+        index = object.__new__(SectorFactorIndex)
+        index.columns = list(self.columns)
+        index.size = self.size + 1
+        index.sorted = {}
+        for column, values in self.sorted.items():
+            value = pd.to_numeric(row.get(column), errors="coerce")
+            if value is None or pd.isna(value):
+                index.sorted[column] = values
+            else:
+                index.sorted[column] = np.insert(values, np.searchsorted(values, value), value)
+        return index
+
+    def mean(self, column):
+        """Mean of the non-missing peer values of column (NaN if none)."""
+        values = self.sorted.get(column)
+        return float(values.mean()) if values is not None and len(values) else np.nan
+
+    def rank(self, column, value, higher_is_better=True):
+        """Percentile rank (0-100) of one value within column."""
+        values = self.sorted.get(column)
+        if values is None or not len(values) or value is None or pd.isna(value):
+            return 50
+        rank = int(np.searchsorted(values, value, side="right")) / len(values) * 100
+        return 100 - rank if not higher_is_better else rank
+
+    def rank_many(self, column, values, higher_is_better=True):
+        """Percentile ranks (0-100) of an array of values within column; NaN ranks 50."""
+        values = np.asarray(values, dtype=np.float64)
+        peers = self.sorted.get(column)
+        if peers is None or not len(peers):
+            return np.full(values.shape, 50.0)
+        ranks = np.searchsorted(peers, values, side="right") / len(peers) * 100
+        if not higher_is_better:
+            ranks = 100 - ranks
+        ranks[np.isnan(values)] = 50
+        return ranks
+
+    def fingerprint(self):
+        """Hash of the peer values, for caching results computed against this index."""
+        digest = hashlib.sha256(str(self.size).encode())
+        for column in sorted(self.sorted):
+            digest.update(column.encode())
+            digest.update(self.sorted[column].tobytes())
+        return digest.hexdigest()
 
 
 def _get_price_to_book(info, peer_metrics=None):
@@ -880,20 +1232,79 @@ def _get_price_to_book(info, peer_metrics=None):
     return None, "unavailable"
 
 
-def calculate_fundamental_score_paper2(info, peer_metrics=None, risk_profile="moderate",
-                                        price_data=None):
+# Paper 2 factor order used by the batched scorer
+PAPER2_FACTORS = ("pb", "roe", "momentum", "beta", "market_cap")
+
+# Monomial index over PAPER2_FACTORS: which factors each interaction term multiplies
+INTERACTION_TERMS = list(INTERACTION_COEFFICIENTS)
+INTERACTION_MASK = np.array([[f in term for f in PAPER2_FACTORS] for term in INTERACTION_TERMS])
+INTERACTION_COEFF_VECTOR = np.array([INTERACTION_COEFFICIENTS[term] for term in INTERACTION_TERMS])
+
+
+def paper2_scores_batch(pctiles, pb_available=True, use_percentile=True, risk_profile="moderate"):
     """
-    Calculate fundamental score using Paper 2's exact 5 factors:
-    1. Small P/B ratio (ascending - lower = higher score)
-    2. Large ROE (descending - higher = higher score)
-    3. Large monthly return/momentum (descending - higher = higher score)
-    4. Small Beta (ascending - lower = higher score)
-    5. Large market cap (descending - higher = higher score)
+    Paper 2 weighted totals, interaction terms and final scores for many stocks at once.
 
-    With interaction terms from Table 2 and risk-profile weights from Figure 12.
+    Args:
+        pctiles: (n_stocks, 5) factor percentiles (0-100) in PAPER2_FACTORS order;
+                 they are normalized to [0, 1] for the interaction terms
+        pb_available: bool or (n_stocks,) bool; without P/B its weight is
+                      redistributed over the other factors and P/B terms are dropped
+        use_percentile: bool or (n_stocks,) bool; interaction terms only apply to
+                        percentile (peer-relative) scores
+        risk_profile: "conservative", "moderate" or "aggressive"
+
+    Returns:
+        dict with "weighted" (n,), "interactions" (n, n_terms) contributions in
+        INTERACTION_TERMS order, "interaction_bonus" (n,) and "total" (n,) clipped
+        to 0-100. Each row equals calculate_fundamental_score_paper2 for that stock.
     """
-    scores = {}
+    pctiles = np.atleast_2d(np.asarray(pctiles, dtype=np.float64))
+    n = len(pctiles)
+    pb_available = np.broadcast_to(np.asarray(pb_available, dtype=bool), (n,))
+    use_percentile = np.broadcast_to(np.asarray(use_percentile, dtype=bool), (n,))
+
     profile_weights = RISK_PROFILE_WEIGHTS_P2.get(risk_profile, RISK_PROFILE_WEIGHTS_P2["moderate"])
+    weights = np.array([profile_weights[f] for f in PAPER2_FACTORS])
+    r_total = weights[1:].sum()
+    redistributed = np.concatenate([[0.0], weights[1:] / r_total if r_total > 0 else np.full(4, 0.25)])
+    factor_weights = np.where(pb_available[:, None], weights, redistributed)
+
+    # Column by column so the sums are accumulated in the scalar version's order
+    weighted = np.zeros(n)
+    for k in range(len(PAPER2_FACTORS)):
+        weighted = weighted + pctiles[:, k] * factor_weights[:, k]
+
+    norm = pctiles / 100.0
+    products = np.where(INTERACTION_MASK[None, :, :], norm[:, None, :], 1.0).prod(axis=2)
+    active = use_percentile[:, None] & (pb_available[:, None] | ~INTERACTION_MASK[:, 0][None, :])
+    interactions = np.where(active, products * INTERACTION_COEFF_VECTOR, 0.0)
+    interaction_bonus = np.zeros(n)
+    for k in range(len(INTERACTION_TERMS)):
+        interaction_bonus = interaction_bonus + interactions[:, k]
+
+    return {
+        "weighted": weighted,
+        "interactions": interactions,
+        "interaction_bonus": interaction_bonus,
+        "total": np.clip(weighted + interaction_bonus, 0, 100),
+    }
+
+
+def paper2_factor_scores(info, peer_metrics=None, momentum=None):
+    """
+    The five Paper 2 factor percentiles of one stock (before weighting).
+
+    Args:
+        info: yfinance info dict
+        peer_metrics: Peer-metrics DataFrame or SectorFactorIndex
+        momentum: Monthly return; revenueGrowth is used as a proxy when None
+
+    Returns:
+        dict with "<factor>_pctile" entries, "pb_source", "used_percentile",
+        "n_factors" and "pb_unavailable" (only when P/B is missing)
+    """
+    scores = {}
 
     # Extract factors
     roe = info.get("returnOnEquity")
@@ -904,16 +1315,11 @@ def calculate_fundamental_score_paper2(info, peer_metrics=None, risk_profile="mo
     pb_value, pb_source = _get_price_to_book(info)
     scores["pb_source"] = pb_source
 
-    # Momentum: use monthly return from price_data if available, else revenueGrowth as proxy
-    momentum = None
-    if price_data is not None and "Monthly_Return" in price_data.columns:
-        mr = price_data["Monthly_Return"].iloc[-1]
-        if pd.notna(mr):
-            momentum = mr
     if momentum is None:
         momentum = info.get("revenueGrowth")  # fallback proxy
 
-    use_percentile = (peer_metrics is not None and not peer_metrics.empty and len(peer_metrics) >= 3)
+    peer_index = SectorFactorIndex.from_peers(peer_metrics)
+    use_percentile = peer_index is not None and len(peer_index) >= 3
 
     # Track which factors are available for degraded mode
     n_factors = 5
@@ -924,8 +1330,8 @@ def calculate_fundamental_score_paper2(info, peer_metrics=None, risk_profile="mo
 
     if use_percentile:
         # Factor 1: P/B (ascending = lower is better)
-        if pb_available and "priceToBook" in peer_metrics.columns:
-            pb_pctile = _percentile_rank(pb_value, peer_metrics["priceToBook"].tolist(), higher_is_better=False)
+        if pb_available and "priceToBook" in peer_index:
+            pb_pctile = peer_index.rank("priceToBook", pb_value, higher_is_better=False)
         elif pb_available:
             pb_pctile = _absolute_pb(pb_value)
         else:
@@ -933,12 +1339,11 @@ def calculate_fundamental_score_paper2(info, peer_metrics=None, risk_profile="mo
         scores["pb_pctile"] = pb_pctile
 
         # Factor 2: ROE (descending = higher is better)
-        roe_pctile = _percentile_rank(roe, peer_metrics["roe"].tolist(), higher_is_better=True) if roe is not None else 50
-        scores["roe_pctile"] = roe_pctile
+        scores["roe_pctile"] = peer_index.rank("roe", roe, higher_is_better=True)
 
         # Factor 3: Momentum (descending = higher is better)
-        if momentum is not None and "rev_growth" in peer_metrics.columns:
-            momentum_pctile = _percentile_rank(momentum, peer_metrics["rev_growth"].tolist(), higher_is_better=True)
+        if momentum is not None and "rev_growth" in peer_index:
+            momentum_pctile = peer_index.rank("rev_growth", momentum, higher_is_better=True)
         elif momentum is not None:
             momentum_pctile = _absolute_momentum(momentum)
         else:
@@ -946,12 +1351,11 @@ def calculate_fundamental_score_paper2(info, peer_metrics=None, risk_profile="mo
         scores["momentum_pctile"] = momentum_pctile
 
         # Factor 4: Beta (ascending = lower is better)
-        beta_pctile = _percentile_rank(beta, peer_metrics["beta"].tolist(), higher_is_better=False) if beta is not None else 50
-        scores["beta_pctile"] = beta_pctile
+        scores["beta_pctile"] = peer_index.rank("beta", beta, higher_is_better=False)
 
         # Factor 5: Market Cap (descending = higher is better)
-        if market_cap is not None and "marketCap" in peer_metrics.columns:
-            mcap_pctile = _percentile_rank(market_cap, peer_metrics["marketCap"].tolist(), higher_is_better=True)
+        if market_cap is not None and "marketCap" in peer_index:
+            mcap_pctile = peer_index.rank("marketCap", market_cap, higher_is_better=True)
         elif market_cap is not None:
             mcap_pctile = _absolute_mcap(market_cap)
         else:
@@ -959,81 +1363,122 @@ def calculate_fundamental_score_paper2(info, peer_metrics=None, risk_profile="mo
         scores["market_cap_pctile"] = mcap_pctile
     else:
         # Absolute fallbacks
-        pb_pctile = _absolute_pb(pb_value) if pb_available else 50
-        scores["pb_pctile"] = pb_pctile
-        roe_pctile = _absolute_roe(roe)
-        scores["roe_pctile"] = roe_pctile
-        momentum_pctile = _absolute_momentum(momentum)
-        scores["momentum_pctile"] = momentum_pctile
-        beta_pctile = _absolute_beta(beta)
-        scores["beta_pctile"] = beta_pctile
-        mcap_pctile = _absolute_mcap(market_cap)
-        scores["market_cap_pctile"] = mcap_pctile
+        scores["pb_pctile"] = _absolute_pb(pb_value) if pb_available else 50
+        scores["roe_pctile"] = _absolute_roe(roe)
+        scores["momentum_pctile"] = _absolute_momentum(momentum)
+        scores["beta_pctile"] = _absolute_beta(beta)
+        scores["market_cap_pctile"] = _absolute_mcap(market_cap)
 
-    # Compute weighted total
-    if pb_available:
-        total = (
-            pb_pctile * profile_weights["pb"] +
-            roe_pctile * profile_weights["roe"] +
-            momentum_pctile * profile_weights["momentum"] +
-            beta_pctile * profile_weights["beta"] +
-            mcap_pctile * profile_weights["market_cap"]
-        )
-    else:
-        # Redistribute P/B weight proportionally to other factors
-        remaining = {k: v for k, v in profile_weights.items() if k != "pb"}
-        r_total = sum(remaining.values())
-        if r_total > 0:
-            total = (
-                roe_pctile * (remaining["roe"] / r_total) +
-                momentum_pctile * (remaining["momentum"] / r_total) +
-                beta_pctile * (remaining["beta"] / r_total) +
-                mcap_pctile * (remaining["market_cap"] / r_total)
-            )
-        else:
-            total = (roe_pctile + momentum_pctile + beta_pctile + mcap_pctile) / 4
+    scores["used_percentile"] = use_percentile
+    scores["n_factors"] = n_factors
+    return scores
+
+
+def _factor_row(scores):
+    return [scores[f"{f}_pctile"] for f in PAPER2_FACTORS]
+
+
+@traced()
+def calculate_fundamental_score_paper2(info, peer_metrics=None, risk_profile="moderate",
+                                        price_data=None):
+    """
+    Calculate fundamental score using Paper 2's exact 5 factors:
+    1. Small P/B ratio (ascending - lower = higher score)
+    2. Large ROE (descending - higher = higher score)
+    3. Large monthly return/momentum (descending - higher = higher score)
+    4. Small Beta (ascending - lower = higher score)
+    5. Large market cap (descending - higher = higher score)
+
+    With interaction terms from Table 2 and risk-profile weights from Figure 12.
+    peer_metrics is a peer-metrics DataFrame or a prebuilt SectorFactorIndex.
+    """
+    # Momentum: use monthly return from price_data if available, else revenueGrowth as proxy
+    momentum = None
+    if price_data is not None and "Monthly_Return" in price_data.columns:
+        mr = price_data["Monthly_Return"].iloc[-1]
+        if pd.notna(mr):
+            momentum = mr
+
+    scores = paper2_factor_scores(info, peer_metrics=peer_metrics, momentum=momentum)
+    pb_available = not scores.get("pb_unavailable", False)
+    use_percentile = scores["used_percentile"]
+    batch = paper2_scores_batch(
+        [_factor_row(scores)], pb_available=pb_available, use_percentile=use_percentile,
+        risk_profile=risk_profile,
+    )
 
     # Interaction terms (from Table 2 regression coefficients)
-    interaction_bonus = 0
     if use_percentile:
-        # Normalize percentiles to [0, 1]
-        norm = {
-            "pb": pb_pctile / 100.0,
-            "roe": roe_pctile / 100.0,
-            "momentum": momentum_pctile / 100.0,
-            "beta": beta_pctile / 100.0,
-            "market_cap": mcap_pctile / 100.0,
+        scores["interaction_details"] = {
+            "+".join(term): round(float(contribution), 3)
+            for term, uses_pb, contribution in zip(INTERACTION_TERMS, INTERACTION_MASK[:, 0], batch["interactions"][0])
+            if pb_available or not uses_pb
         }
 
-        interaction_details = {}
-        for factors, coeff in INTERACTION_COEFFICIENTS.items():
-            if not pb_available and "pb" in factors:
-                continue
-            product = 1.0
-            for f in factors:
-                product *= norm[f]
-            contribution = product * coeff
-            interaction_bonus += contribution
-            interaction_details["+".join(factors)] = round(contribution, 3)
-
-        scores["interaction_details"] = interaction_details
-
-    scores["interaction_bonus"] = round(interaction_bonus, 2)
-    total = min(100, max(0, total + interaction_bonus))
+    total = float(batch["total"][0])
+    scores["interaction_bonus"] = round(float(batch["interaction_bonus"][0]), 2)
     scores["total"] = total
     scores["risk_profile"] = risk_profile
-    scores["used_percentile"] = use_percentile
-    scores["n_factors"] = n_factors
 
     # Backward compatibility aliases
-    scores["profitability_pctile"] = roe_pctile
-    scores["growth_pctile"] = momentum_pctile
-    scores["leverage_pctile"] = beta_pctile
-    scores["valuation_pctile"] = pb_pctile
+    scores["profitability_pctile"] = scores["roe_pctile"]
+    scores["growth_pctile"] = scores["momentum_pctile"]
+    scores["leverage_pctile"] = scores["beta_pctile"]
+    scores["valuation_pctile"] = scores["pb_pctile"]
 
     return total, scores
 
 
+@traced()
+def calculate_fundamental_score_paper2_series(info, peer_metrics=None, risk_profile="moderate",
+                                               price_data=None):
+    """
+    Whole-series version of calculate_fundamental_score_paper2.
+
+    Only the momentum factor (Monthly_Return) changes over time, so the P/B, ROE,
+    beta and market cap percentiles are scored once and every row of price_data
+    is scored in one paper2_scores_batch call. Row i equals the scalar score
+    computed with price_data.iloc[:i + 1].
+
+    Returns:
+        totals: np.ndarray of scores (0-100), one per row
+        scores: dict of the static factor scores plus per-row
+                "momentum_pctile" and "interaction_bonus" arrays
+    """
+    peer_index = SectorFactorIndex.from_peers(peer_metrics)
+    scores = paper2_factor_scores(info, peer_metrics=peer_index)
+    use_percentile = scores["used_percentile"]
+    pb_available = not scores.get("pb_unavailable", False)
+
+    n = len(price_data) if price_data is not None else 0
+    fallback = info.get("revenueGrowth")
+    fallback = np.nan if fallback is None else float(fallback)
+    if price_data is not None and "Monthly_Return" in price_data.columns:
+        momentum = price_data["Monthly_Return"].to_numpy(dtype=np.float64)
+        momentum = np.where(np.isnan(momentum), fallback, momentum)
+    else:
+        momentum = np.full(n, fallback, dtype=np.float64)
+
+    if use_percentile and "rev_growth" in peer_index:
+        momentum_pctile = peer_index.rank_many("rev_growth", momentum)
+        momentum_pctile[np.isnan(momentum)] = 50
+    else:
+        momentum_pctile = _absolute_momentum_many(momentum)
+
+    pctiles = np.tile(np.array(_factor_row(scores), dtype=np.float64), (n, 1))
+    pctiles[:, PAPER2_FACTORS.index("momentum")] = momentum_pctile
+    batch = paper2_scores_batch(pctiles, pb_available=pb_available, use_percentile=use_percentile,
+                                risk_profile=risk_profile)
+
+    scores["risk_profile"] = risk_profile
+    scores["profitability_pctile"] = scores["roe_pctile"]
+    scores["leverage_pctile"] = scores["beta_pctile"]
+    scores["valuation_pctile"] = scores["pb_pctile"]
+    scores["momentum_pctile"] = momentum_pctile
+    scores["interaction_bonus"] = batch["interaction_bonus"]
+    return batch["total"], scores
+
+
 def _absolute_pb(pb):
     """Absolute P/B score (lower is better)."""
     if pb is None or pd.isna(pb):
@@ -1066,22 +1511,32 @@ def _absolute_roe(roe):
         return 15
 
 
+# (threshold, score) bands for absolute momentum, checked top-down: the first
+# threshold the momentum exceeds sets the score, MOMENTUM_FLOOR_SCORE otherwise
+MOMENTUM_SCORE_BANDS = ((0.20, 95), (0.10, 75), (0.02, 55), (0, 40), (-0.10, 25))
+MOMENTUM_FLOOR_SCORE = 10
+
+
 def _absolute_momentum(momentum):
     """Absolute momentum score (higher is better)."""
     if momentum is None or pd.isna(momentum):
         return 50
-    if momentum > 0.20:
-        return 95
-    elif momentum > 0.10:
-        return 75
-    elif momentum > 0.02:
-        return 55
-    elif momentum > 0:
-        return 40
-    elif momentum > -0.10:
-        return 25
-    else:
-        return 10
+    for threshold, score in MOMENTUM_SCORE_BANDS:
+        if momentum > threshold:
+            return score
+    return MOMENTUM_FLOOR_SCORE
+
+
+def _absolute_momentum_many(momentum):
+    """_absolute_momentum over an array (NaN scores 50)."""
+    momentum = np.asarray(momentum, dtype=np.float64)
+    scores = np.select(
+        [momentum > threshold for threshold, _ in MOMENTUM_SCORE_BANDS],
+        [score for _, score in MOMENTUM_SCORE_BANDS],
+        default=MOMENTUM_FLOOR_SCORE,
+    ).astype(np.float64)
+    scores[np.isnan(momentum)] = 50
+    return scores
 
 
 def _absolute_beta(beta):
@@ -1191,6 +1646,7 @@ def _absolute_valuation(pe, peg):
     return 50
 
 
+@traced()
 def generate_recommendation_paper2(tech_score, fund_score, market_regime, ticker, info,
                                     risk_profile="moderate", time_horizon="long"):
     """
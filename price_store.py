@@ -0,0 +1,226 @@
+# =============================================================================
+# PRICE_STORE.PY - Persistent local OHLCV store with delta fetching
+# =============================================================================
+# One compressed NumPy file per ticker (data_cache/prices/<TICKER>.npz) holding
+# the date index and one column per price field. On refresh only the bars at
+# the end of the stored series are downloaded and merged in, so process
+# restarts and cache expiry no longer re-download decades of history.
+# =============================================================================
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import tracing
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_cache")
+PRICE_DIR = os.path.join(DATA_DIR, "prices")
+
+# Seconds a stored series counts as fresh before the store asks for new bars
+DEFAULT_MAX_AGE = 3600
+
+# Relative tolerance when checking that an overlapping stored bar still matches
+_OVERLAP_RTOL = 1e-6
+
+
+def yfinance_fetcher(ticker, start=None):
+    """
+    Default fetcher: daily, unadjusted bars from yfinance.
+
+    Args:
+        ticker: Ticker symbol
+        start: First date to fetch (inclusive), or None for the full history
+
+    Returns:
+        DataFrame indexed by date with Open/High/Low/Close/Volume columns
+    """
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker)
+    if start is None:
+        return stock.history(period="max", interval="1d", auto_adjust=False)
+    return stock.history(start=start, interval="1d", auto_adjust=False)
+
+
+class PriceStore:
+    """
+    On-disk daily price store keyed by ticker.
+
+    The fetcher is any callable fetcher(ticker, start=None) -> DataFrame indexed
+    by date (the yfinance history() shape), so tests can plug in a local fake.
+    """
+
+    def __init__(self, root=PRICE_DIR, fetcher=None, max_age=DEFAULT_MAX_AGE):
+        self.root = root
+        self.fetcher = fetcher or yfinance_fetcher
+        self.max_age = max_age
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker.upper()}.npz")
+
+    def read(self, ticker):
+        """
+        Read the stored series for ticker.
+
+        Returns:
+            (DataFrame indexed by Date, fetched_at timestamp); empty frame and 0 if not stored
+        """
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return pd.DataFrame(), 0.0
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                tz = str(data["__tz__"])
+                index = pd.to_datetime(data["__date__"], utc=True)
+                index = index.tz_convert(tz) if tz else index.tz_localize(None)
+                columns = [str(c) for c in data["__columns__"]]
+                dtypes = [str(d) for d in data["__dtypes__"]]
+                frame = pd.DataFrame({c: data[f"col{i}"] for i, c in enumerate(columns)}, index=index)
+                for col, dtype in zip(columns, dtypes):
+                    if dtype.startswith("int") and not frame[col].isna().any():
+                        frame[col] = frame[col].astype(dtype)
+                fetched_at = float(data["__fetched_at__"])
+        except Exception:
+            return pd.DataFrame(), 0.0
+        frame.index.name = "Date"
+        return frame, fetched_at
+
+    def read_columns(self, ticker, columns, tail=None):
+        """
+        Read selected columns of the stored series as plain arrays.
+
+        Skips building the full DataFrame, for bulk readers such as the
+        screener that only need a few fields of many tickers.
+
+        Args:
+            ticker: Ticker symbol
+            columns: Column names; "Date" returns the date index
+            tail: Keep only the last `tail` bars
+
+        Returns:
+            {column: array} for the stored columns among `columns`; {} if the
+            ticker is not stored
+        """
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                stored = [str(c) for c in data["__columns__"]]
+                keep = slice(-tail, None) if tail else slice(None)
+                found = {c: data[f"col{stored.index(c)}"][keep] for c in columns if c in stored}
+                if "Date" in columns:
+                    tz = str(data["__tz__"])
+                    index = pd.to_datetime(data["__date__"][keep], utc=True)
+                    found["Date"] = index.tz_convert(tz) if tz else index.tz_localize(None)
+        except Exception:
+            return {}
+        return found
+
+    def write(self, ticker, frame, fetched_at=None):
+        """Atomically replace the stored series for ticker."""
+        os.makedirs(self.root, exist_ok=True)
+        index = pd.DatetimeIndex(frame.index)
+        tz = str(index.tz) if index.tz is not None else ""
+        dates = (index.tz_convert("UTC") if tz else index).as_unit("ns").asi8
+        arrays = {
+            f"col{i}": pd.to_numeric(frame[c], errors="coerce").to_numpy(dtype=np.float64)
+            for i, c in enumerate(frame.columns)
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez_compressed(
+                    fh,
+                    __date__=dates,
+                    __tz__=np.array(tz),
+                    __columns__=np.array([str(c) for c in frame.columns]),
+                    __dtypes__=np.array([str(frame[c].dtype) for c in frame.columns]),
+                    __fetched_at__=np.array(fetched_at if fetched_at is not None else time.time()),
+                    **arrays,
+                )
+            os.replace(tmp_path, self.path(ticker))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def refresh(self, ticker, force=False):
+        """
+        Bring the stored series up to date and return it.
+
+        Only bars from the second-to-last stored date onward are fetched. The
+        older of the overlapping bars must match what is stored; if it does not
+        (a split or dividend re-based the history) the full history is reloaded.
+        """
+        stored, fetched_at = self.read(ticker)
+        if not force and not stored.empty and time.time() - fetched_at < self.max_age:
+            return stored
+
+        if stored.empty or len(stored) < 2 or force:
+            fresh = self._fetch(ticker)
+            if fresh.empty:
+                return stored
+            self.write(ticker, fresh)
+            return fresh
+
+        anchor_date = stored.index[-2]
+        delta = self._fetch(ticker, start=anchor_date.strftime("%Y-%m-%d"))
+        if delta.empty:
+            self.write(ticker, stored)
+            return stored
+
+        if not self._overlap_matches(stored, delta, anchor_date):
+            return self.refresh(ticker, force=True)
+
+        merged = pd.concat([stored[stored.index < delta.index[0]], delta])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self.write(ticker, merged)
+        return merged
+
+    def get(self, ticker):
+        """Return the up-to-date history for ticker with a Date column (load_history shape)."""
+        frame = self.refresh(ticker)
+        if frame.empty:
+            return frame
+        return frame.rename_axis("Date").reset_index()
+
+    def _fetch(self, ticker, start=None):
+        frame = self.fetcher(ticker, start=start)
+        if frame is None or frame.empty:
+            return pd.DataFrame()
+        tracing.add_bytes(frame.memory_usage(deep=True).sum())
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        frame.index.name = "Date"
+        return frame
+
+    @staticmethod
+    def _overlap_matches(stored, delta, anchor_date):
+        if anchor_date not in delta.index:
+            return delta.index[0] > anchor_date
+        for col in ("Close", "Adj Close"):
+            if col in stored.columns and col in delta.columns:
+                old = stored.at[anchor_date, col]
+                new = delta.at[anchor_date, col]
+                if not np.isclose(old, new, rtol=_OVERLAP_RTOL, equal_nan=True):
+                    return False
+        return True
+
+
+_default_store = None
+
+
+def get_store():
+    """Shared PriceStore backed by yfinance."""
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
+
+
+def load_prices(ticker):
+    """Up-to-date daily history for ticker from the shared store (Date column, OHLCV)."""
+    return get_store().get(ticker)
@@ -1,166 +1,160 @@
 # =============================================================================
 # RL_AGENT.PY - PPO Reinforcement Learning Agent for Paper 1
 # =============================================================================
-# Gymnasium environment + PPO training pipeline with model caching.
+# PPO training pipeline (environments in rl_envs.py) with a content-addressed
+# model registry (see model_registry.py). Every registered model is also
+# exported as a NumPy policy (rl_policy.py), so inference never imports torch.
 # Gracefully degrades if stable-baselines3 is not installed.
 # =============================================================================
 
-import os
+import argparse
 import hashlib
+import importlib.util
+import json
+import time
 import numpy as np
 import pandas as pd
 
-# Graceful import guard
-RL_AVAILABLE = False
-try:
-    import gymnasium as gym
-    from gymnasium import spaces
-    from stable_baselines3 import PPO
-    from stable_baselines3.common.vec_env import DummyVecEnv
-    RL_AVAILABLE = True
-except (ImportError, OSError):
-    pass
-
-CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models_cache")
+from model_registry import MODEL_DIR, ModelRegistry
+from rl_policy import NumpyPolicy
+from tracing import traced
+
+# Graceful import guard: only check that the training stack is installed here;
+# stable-baselines3 (and torch) are imported on first training or PPO load
+RL_AVAILABLE = all(importlib.util.find_spec(name) is not None
+                   for name in ("gymnasium", "stable_baselines3", "torch"))
+
+CACHE_DIR = MODEL_DIR
+
+# PPO settings; any change produces new cache keys. n_steps is the rollout
+# length summed over all environment copies (see _ppo_args), so the number of
+# rollout/update cycles per timestep does not depend on N_ENVS
+PPO_HYPERPARAMS = {
+    "policy": "MlpPolicy",
+    "learning_rate": 3e-4,
+    "n_steps": 256,
+    "batch_size": 64,
+    "n_epochs": 10,
+    "gamma": 0.99,
+}
+DEFAULT_TIMESTEPS = 50000
+TRAIN_SPLIT = 0.8
+
+# Columns the environment reads; the cache key hashes exactly these
+FEATURE_COLUMNS = ("EMA_Cross_Signal", "ATV_Slope", "Close", "RSI", "Rel_Volume", "Volume")
+
+# A cached model trained on the same history up to this many bars ago is reused
+MAX_STALE_BARS = 5
+# Parallel rollout collection: number of environment copies and how they run
+#   "numpy"   - one process, all copies stepped with array operations
+#   "subproc" - one StockTradingEnv per worker process
+#   "dummy"   - StockTradingEnv copies stepped one after another
+N_ENVS = 8
+ENV_BACKEND = "numpy"
+ENV_BACKENDS = ("numpy", "subproc", "dummy")
+
+# Shortest episode a random start offset may leave
+MIN_EPISODE_STEPS = 64
+
+# Warm-start fine-tuning on newly arrived bars
+FINE_TUNE_TIMESTEPS = 5000
+# Fine-tuned generations allowed before a full retrain resets drift
+MAX_FINE_TUNE_VERSIONS = 10
+
+# Trailing rows fingerprinted to recognise that history inside a newer frame
+MATCH_TAIL_ROWS = 250
 
 
 # =============================================================================
-# GYMNASIUM ENVIRONMENT
+# TRAINING PIPELINE
 # =============================================================================
 
-if RL_AVAILABLE:
-    class StockTradingEnv(gym.Env):
-        """
-        Gymnasium environment for Paper 1 PPO agent.
-
-        State: [ema_cross_signal, atv_slope_normalized, 1d_return, 5d_return, rsi_normalized, rel_volume]
-        Actions: Discrete(3) -> buy(0), sell(1), hold(2)
-        Reward: Rt = (Pt+1 - Pt)/Pt * (1 + beta * (Vt - V_avg)/V_avg)  (paper's Eq. 5)
-        """
-        metadata = {"render_modes": []}
-
-        def __init__(self, df, beta=0.5):
-            super().__init__()
-            self.df = df.reset_index(drop=True)
-            self.beta = beta
-            self.current_step = 0
-            self.max_steps = len(df) - 2  # Need at least 1 future step for reward
-
-            self.action_space = spaces.Discrete(3)  # buy=0, sell=1, hold=2
-            # 6-dimensional continuous observation
-            self.observation_space = spaces.Box(
-                low=-np.inf, high=np.inf, shape=(6,), dtype=np.float32
-            )
-
-            # Precompute features
-            self._precompute()
-
-        def _precompute(self):
-            """Precompute normalized features for all timesteps."""
-            df = self.df
-
-            # EMA cross signal (already -1, 0, 1)
-            self.ema_cross = df["EMA_Cross_Signal"].values.astype(np.float32) if "EMA_Cross_Signal" in df.columns else np.zeros(len(df), dtype=np.float32)
-
-            # ATV slope normalized (z-score)
-            if "ATV_Slope" in df.columns:
-                atv = df["ATV_Slope"].fillna(0).values.astype(np.float64)
-                atv_std = np.std(atv) if np.std(atv) > 0 else 1.0
-                self.atv_norm = (atv / atv_std).astype(np.float32)
-            else:
-                self.atv_norm = np.zeros(len(df), dtype=np.float32)
-
-            # 1-day return
-            close = df["Close"].values.astype(np.float64)
-            self.ret_1d = np.zeros(len(df), dtype=np.float32)
-            self.ret_1d[1:] = ((close[1:] - close[:-1]) / np.where(close[:-1] != 0, close[:-1], 1)).astype(np.float32)
-
-            # 5-day return
-            self.ret_5d = np.zeros(len(df), dtype=np.float32)
-            if len(df) > 5:
-                self.ret_5d[5:] = ((close[5:] - close[:-5]) / np.where(close[:-5] != 0, close[:-5], 1)).astype(np.float32)
-
-            # RSI normalized to [-1, 1]
-            if "RSI" in df.columns:
-                rsi = df["RSI"].fillna(50).values.astype(np.float64)
-                self.rsi_norm = ((rsi - 50) / 50).astype(np.float32)
-            else:
-                self.rsi_norm = np.zeros(len(df), dtype=np.float32)
-
-            # Relative volume (capped)
-            if "Rel_Volume" in df.columns:
-                rv = df["Rel_Volume"].fillna(1.0).values.astype(np.float64)
-                self.rel_vol = np.clip(rv, 0, 5).astype(np.float32)
-            else:
-                self.rel_vol = np.ones(len(df), dtype=np.float32)
-
-            # For reward computation
-            self.close = close
-            if "Volume" in df.columns:
-                vol = df["Volume"].fillna(0).values.astype(np.float64)
-                self.volume = vol
-                self.vol_avg = pd.Series(vol).rolling(window=20, min_periods=1).mean().values
-            else:
-                self.volume = np.ones(len(df), dtype=np.float64)
-                self.vol_avg = np.ones(len(df), dtype=np.float64)
-
-        def _get_obs(self):
-            i = self.current_step
-            return np.array([
-                self.ema_cross[i],
-                self.atv_norm[i],
-                self.ret_1d[i],
-                self.ret_5d[i],
-                self.rsi_norm[i],
-                self.rel_vol[i],
-            ], dtype=np.float32)
-
-        def reset(self, seed=None, options=None):
-            super().reset(seed=seed)
-            self.current_step = 0
-            return self._get_obs(), {}
-
-        def step(self, action):
-            i = self.current_step
-
-            # Price return for reward
-            if i + 1 < len(self.close):
-                price_return = (self.close[i + 1] - self.close[i]) / self.close[i] if self.close[i] != 0 else 0
-            else:
-                price_return = 0
-
-            # Volume factor for reward (paper's Eq. 5)
-            v_avg = self.vol_avg[i] if self.vol_avg[i] > 0 else 1
-            vol_factor = 1 + self.beta * (self.volume[i] - v_avg) / v_avg
-
-            # Reward based on action
-            if action == 0:  # buy
-                reward = price_return * vol_factor
-            elif action == 1:  # sell
-                reward = -price_return * vol_factor
-            else:  # hold
-                reward = 0.0
-
-            self.current_step += 1
-            terminated = self.current_step >= self.max_steps
-            truncated = False
-
-            obs = self._get_obs() if not terminated else np.zeros(6, dtype=np.float32)
-
-            return obs, float(reward), terminated, truncated, {}
+def _ppo():
+    """stable-baselines3 PPO class (importing it loads torch)."""
+    from stable_baselines3 import PPO
+    return PPO
+
+
+def _ppo_args(n_envs):
+    """(policy, kwargs) for the PPO constructor, with n_steps split across n_envs copies."""
+    params = dict(PPO_HYPERPARAMS)
+    policy = params.pop("policy")
+    params["n_steps"] = max(1, params["n_steps"] // n_envs)
+    return policy, params
+
+
+def _feature_hash(df):
+    """Hash of the feature columns the environment trains on."""
+    columns = [c for c in FEATURE_COLUMNS if c in df.columns]
+    digest = hashlib.sha256(",".join(columns).encode())
+    if columns:
+        matrix = np.column_stack([
+            pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64) for c in columns
+        ])
+        digest.update(np.ascontiguousarray(matrix).tobytes())
+    return digest.hexdigest()
+
+
+def _params_hash(total_timesteps):
+    """Hash of everything besides the data that determines a trained model."""
+    raw = json.dumps(
+        {"hyperparams": PPO_HYPERPARAMS, "timesteps": total_timesteps, "split": TRAIN_SPLIT,
+         "n_envs": N_ENVS, "backend": ENV_BACKEND, "n_steps_per_env": _ppo_args(N_ENVS)[1]["n_steps"]},
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
 
+def _get_cache_key(df, total_timesteps=DEFAULT_TIMESTEPS):
+    """Content-addressed cache key: training feature matrix + hyperparameters."""
+    raw = _params_hash(total_timesteps) + _feature_hash(df)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
 
-# =============================================================================
-# TRAINING PIPELINE
-# =============================================================================
 
-def _get_cache_key(ticker, data_len):
-    """Generate a cache key based on ticker and data length."""
-    raw = f"{ticker}_{data_len}"
-    return hashlib.md5(raw.encode()).hexdigest()[:12]
+def _date_labels(df):
+    """Row dates as strings, or None if df carries no dates."""
+    if "Date" in df.columns:
+        return pd.Index(pd.to_datetime(df["Date"])).astype(str)
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df.index.astype(str)
+    return None
 
 
-def train_ppo_agent(df, ticker="UNKNOWN", total_timesteps=50000):
+def _find_recent_model(registry, df, ticker, params_hash, max_stale_bars):
+    """
+    Newest registered model whose training history ended at most max_stale_bars bars before df.
+
+    The model's last bar is located in df by date (by row count when there are
+    no dates) and the trailing MATCH_TAIL_ROWS rows up to it must hash the same,
+    so different data of the same length never matches while a lookback
+    window that slid forward by a few days still does.
+    """
+    dates = _date_labels(df)
+    for meta in registry.entries():
+        if meta.get("ticker") != ticker or meta.get("params_hash") != params_hash:
+            continue
+        if dates is not None and meta.get("data_end"):
+            end = dates.get_indexer([meta["data_end"]])[0] + 1
+            if end <= 0:
+                continue
+        else:
+            end = meta.get("n_rows", 0)
+        new_bars = len(df) - end
+        tail_rows = min(MATCH_TAIL_ROWS, meta.get("n_rows", 0))
+        if not 0 <= new_bars <= max_stale_bars or end < tail_rows:
+            continue
+        if _feature_hash(df.iloc[end - tail_rows:end]) == meta.get("tail_hash"):
+            return meta
+    return None
+
+
+def _split_bounds(n):
+    """(train_end, val_end) row positions of the 80/10/10 split."""
+    return int(n * TRAIN_SPLIT), int(n * 0.9)
+
+
+def train_ppo_agent(df, ticker="UNKNOWN", total_timesteps=DEFAULT_TIMESTEPS,
+                    n_envs=N_ENVS, backend=ENV_BACKEND):
     """
     Train a PPO agent on historical data.
 
@@ -168,6 +162,8 @@ def train_ppo_agent(df, ticker="UNKNOWN", total_timesteps=50000):
         df: DataFrame with computed indicators (EMA_Cross_Signal, ATV_Slope, RSI, etc.)
         ticker: Ticker symbol for caching
         total_timesteps: Training duration
+        n_envs: Parallel environment copies collecting rollouts
+        backend: How the copies run (see ENV_BACKENDS)
 
     Returns:
         model: Trained PPO model, or None if RL not available
@@ -175,39 +171,119 @@ def train_ppo_agent(df, ticker="UNKNOWN", total_timesteps=50000):
     if not RL_AVAILABLE:
         return None
 
-    # 80/10/10 split
-    n = len(df)
-    train_end = int(n * 0.8)
-    val_end = int(n * 0.9)
-
+    # 80/10/10 split; validation and test slices are left for evaluate_agent
+    train_end, _ = _split_bounds(len(df))
     train_df = df.iloc[:train_end].copy()
-    # val_df = df.iloc[train_end:val_end].copy()  # reserved for validation
-    # test_df = df.iloc[val_end:].copy()  # reserved for testing
 
     if len(train_df) < 100:
         return None
 
-    env = DummyVecEnv([lambda: StockTradingEnv(train_df)])
-
-    model = PPO(
-        "MlpPolicy",
-        env,
-        learning_rate=3e-4,
-        n_steps=256,
-        batch_size=64,
-        n_epochs=10,
-        gamma=0.99,
-        verbose=0,
+    from rl_envs import make_vec_env
+
+    env = make_vec_env(train_df, n_envs=n_envs, backend=backend)
+
+    policy, params = _ppo_args(n_envs)
+    model = _ppo()(policy, env, verbose=0, **params)
+
+    try:
+        model.learn(total_timesteps=total_timesteps)
+    finally:
+        env.close()
+
+    return model
+
+
+def _lookup_cached(registry, df, ticker, max_stale_bars, total_timesteps):
+    """Registry metadata of a usable model for df (exact key, then recent history), or None."""
+    return registry.get(_get_cache_key(df, total_timesteps)) or _find_recent_model(
+        registry, df, ticker, _params_hash(total_timesteps), max_stale_bars
     )
 
-    model.learn(total_timesteps=total_timesteps)
 
+def load_cached_agent(df, ticker="UNKNOWN", max_stale_bars=MAX_STALE_BARS,
+                      total_timesteps=DEFAULT_TIMESTEPS):
+    """
+    Load a usable PPO agent from the model registry without training.
+
+    An exact match on (features, hyperparameters) is reused, as is a model for
+    the same ticker trained on this history up to max_stale_bars bars ago.
+
+    Returns:
+        model: PPO model or None on a cache miss
+    """
+    if not RL_AVAILABLE:
+        return None
+
+    registry = ModelRegistry(CACHE_DIR)
+    meta = _lookup_cached(registry, df, ticker, max_stale_bars, total_timesteps)
+    if meta is None:
+        return None
+    try:
+        model = _ppo().load(registry.model_path(meta["key"]))
+    except Exception:
+        registry.remove(meta["key"])
+        return None
+    registry.touch(meta["key"])
     return model
 
 
-def get_ppo_agent(df, ticker="UNKNOWN", force_retrain=False):
+@traced()
+def load_cached_policy(df, ticker="UNKNOWN", max_stale_bars=MAX_STALE_BARS,
+                       total_timesteps=DEFAULT_TIMESTEPS):
     """
-    Get a PPO agent, using cache if available.
+    Like load_cached_agent, but returns the NumPy export of the policy.
+
+    Reads only the .npz export, so torch is not imported. Models registered
+    before exports existed are converted once (this path does load torch).
+
+    Returns:
+        NumpyPolicy or None on a cache miss
+    """
+    registry = ModelRegistry(CACHE_DIR)
+    meta = _lookup_cached(registry, df, ticker, max_stale_bars, total_timesteps)
+    if meta is None:
+        return None
+    key = meta["key"]
+    try:
+        policy = NumpyPolicy.load(registry.export_path(key))
+    except (OSError, KeyError, ValueError):
+        if not RL_AVAILABLE:
+            return None
+        try:
+            policy = NumpyPolicy.from_model(_ppo().load(registry.model_path(key)))
+            policy.save(registry.export_path(key))
+        except Exception:
+            return None
+    registry.touch(key)
+    return policy
+
+
+def get_policy(df, ticker="UNKNOWN", force_retrain=False, max_stale_bars=MAX_STALE_BARS,
+               total_timesteps=DEFAULT_TIMESTEPS):
+    """
+    NumPy policy for df: the cached export if there is one, else get_ppo_agent() then export.
+
+    Returns:
+        NumpyPolicy or None
+    """
+    if not force_retrain:
+        policy = load_cached_policy(df, ticker, max_stale_bars, total_timesteps)
+        if policy is not None:
+            return policy
+    model = get_ppo_agent(df, ticker=ticker, force_retrain=force_retrain,
+                          max_stale_bars=max_stale_bars, total_timesteps=total_timesteps)
+    return NumpyPolicy.from_model(model) if model is not None else None
+
+
+@traced()
+def get_ppo_agent(df, ticker="UNKNOWN", force_retrain=False, max_stale_bars=MAX_STALE_BARS,
+                  total_timesteps=DEFAULT_TIMESTEPS, warm_start=False):
+    """
+    Get a PPO agent, training one if the model registry has none (see load_cached_agent).
+
+    On a cache miss a model is trained from scratch, unless warm_start is set
+    and the registry holds a model trained on a prefix of df: that one is
+    fine-tuned on the new bars instead (see update_ppo_agent).
 
     Returns:
         model: PPO model or None
@@ -215,78 +291,258 @@ def get_ppo_agent(df, ticker="UNKNOWN", force_retrain=False):
     if not RL_AVAILABLE:
         return None
 
-    os.makedirs(CACHE_DIR, exist_ok=True)
-    cache_key = _get_cache_key(ticker, len(df))
-    cache_path = os.path.join(CACHE_DIR, f"ppo_{cache_key}")
-
     # Try loading from cache
-    if not force_retrain and os.path.exists(cache_path + ".zip"):
-        try:
-            model = PPO.load(cache_path)
+    if not force_retrain:
+        model = load_cached_agent(df, ticker, max_stale_bars, total_timesteps)
+        if model is not None:
             return model
-        except Exception:
-            pass
+        if warm_start:
+            model, _ = update_ppo_agent(None, df, ticker=ticker, total_timesteps=total_timesteps)
+            if model is not None:
+                return model
 
     # Train new model
-    model = train_ppo_agent(df, ticker)
+    started = time.time()
+    model = train_ppo_agent(df, ticker, total_timesteps=total_timesteps)
     if model is not None:
-        try:
-            model.save(cache_path)
-        except Exception:
-            pass
+        _register_model(model, df, ticker, total_timesteps, started)
 
     return model
 
 
-def predict_action(model, df, row_idx=-1):
+def _register_model(model, df, ticker, total_timesteps, started, **extra):
+    """Store model in the registry under df's content key; returns its metadata or None."""
+    dates = _date_labels(df)
+    try:
+        save_policy = lambda path: NumpyPolicy.from_model(model).save(path)
+        return ModelRegistry(CACHE_DIR).register(_get_cache_key(df, total_timesteps), model.save, {
+            "ticker": ticker,
+            "params_hash": _params_hash(total_timesteps),
+            "tail_hash": _feature_hash(df.iloc[-MATCH_TAIL_ROWS:]),
+            "n_rows": len(df),
+            "data_start": dates[0] if dates is not None and len(dates) else None,
+            "data_end": dates[-1] if dates is not None and len(dates) else None,
+            "total_timesteps": total_timesteps,
+            "hyperparams": PPO_HYPERPARAMS,
+            "train_seconds": round(time.time() - started, 2),
+            **extra,
+        }, export_fn=save_policy)
+    except Exception:
+        return None
+
+
+# =============================================================================
+# INCREMENTAL FINE-TUNING
+# =============================================================================
+
+def evaluate_agent(model, df):
     """
-    Get PPO agent's action prediction for a given state.
+    Cumulative Eq. 5 reward of the deterministic policy on df's validation slice.
+
+    The slice is the 10% after the training window that train_ppo_agent sets
+    aside; it is scored as one episode from its first bar.
 
     Returns:
-        action: 0=buy, 1=sell, 2=hold, or None if model unavailable
+        float reward, or None if the slice is too short or the model unavailable
     """
     if model is None or not RL_AVAILABLE:
         return None
+    train_end, val_end = _split_bounds(len(df))
+    val_df = df.iloc[train_end:val_end]
+    if len(val_df) < 3:
+        return None
 
-    if row_idx < 0:
-        row_idx = len(df) + row_idx
+    from rl_envs import BatchedStockTradingVecEnv
 
-    # Build observation
-    row = df.iloc[row_idx]
+    env = BatchedStockTradingVecEnv(val_df, n_envs=1, random_start=False)
+    obs = env.obs_matrix[:env.max_steps]
+    actions, _ = model.predict(obs, deterministic=True)
+    actions = np.asarray(actions).reshape(-1)
+    reward = env.buy_reward[:env.max_steps]
+    return float(np.sum(np.where(actions == 0, reward, np.where(actions == 1, -reward, 0.0))))
 
-    ema_cross = float(row.get("EMA_Cross_Signal", 0) or 0)
 
-    atv_slope = float(row.get("ATV_Slope", 0) or 0)
-    if "ATV_Slope" in df.columns:
-        atv_std = df["ATV_Slope"].std()
-        if atv_std and atv_std > 0:
-            atv_norm = atv_slope / atv_std
-        else:
-            atv_norm = 0.0
-    else:
-        atv_norm = 0.0
+def _find_parent_model(registry, df, ticker, total_timesteps):
+    """
+    Newest registered model for ticker whose training history is a prefix of df.
+
+    The model's last bar must sit at row n_rows - 1 of df (located by date when
+    there are dates) and the trailing MATCH_TAIL_ROWS rows up to it must hash
+    the same, so a model trained on a different window (e.g. the full history
+    against a two-year backtest slice) is never extended onto df.
+    """
+    params_hash = _params_hash(total_timesteps)
+    dates = _date_labels(df)
+    for meta in registry.entries():
+        if meta.get("ticker") != ticker or meta.get("params_hash") != params_hash:
+            continue
+        n_rows = meta.get("n_rows", 0)
+        if not 0 < n_rows <= len(df):
+            continue
+        if dates is not None and meta.get("data_end") and dates[n_rows - 1] != meta["data_end"]:
+            continue
+        tail_rows = min(MATCH_TAIL_ROWS, n_rows)
+        if _feature_hash(df.iloc[n_rows - tail_rows:n_rows]) == meta.get("tail_hash"):
+            return meta
+    return None
+
+
+def update_ppo_agent(model, df_new, ticker="UNKNOWN", timesteps=FINE_TUNE_TIMESTEPS,
+                     compare_full_retrain=False, total_timesteps=DEFAULT_TIMESTEPS, parent_key=None):
+    """
+    Warm-start fine-tuning: continue learn() on the extended window and register a new version.
+
+    Args:
+        model: PPO model to continue from; None loads the ticker's newest
+            registered model whose training history df_new extends
+        df_new: Full indicator frame including the newly arrived bars
+        ticker: Ticker symbol
+        timesteps: Extra timesteps of training
+        compare_full_retrain: Also train from scratch and keep whichever scores
+            higher on the validation slice (see evaluate_agent)
+        total_timesteps: Budget of a full retrain (part of the registry key)
+        parent_key: Registry key an explicitly passed model was loaded from;
+            its entry supplies the lineage (parent_key, version). A model
+            passed without one is recorded as a first fine-tune of an
+            unregistered model.
 
-    # 1-day return
-    if row_idx > 0:
-        prev_close = df["Close"].iloc[row_idx - 1]
-        ret_1d = (row["Close"] - prev_close) / prev_close if prev_close != 0 else 0
+    Returns:
+        (model, report): report holds parent_key, version, fine_tune_reward,
+        full_retrain_reward, chosen ("fine_tune" or "full_retrain") and, when
+        model is None, skipped: "no_parent" (nothing to warm-start from),
+        "no_new_bars" (the parent was trained on all of df_new), "version_cap"
+        (the parent has reached MAX_FINE_TUNE_VERSIONS), "load_failed" or
+        "too_little_data"
+    """
+    report = {"parent_key": None, "version": None, "fine_tune_reward": None,
+              "full_retrain_reward": None, "chosen": None, "skipped": None}
+    if not RL_AVAILABLE:
+        return None, report
+
+    registry = ModelRegistry(CACHE_DIR)
+    if model is None:
+        parent = _find_parent_model(registry, df_new, ticker, total_timesteps)
+        if parent is None:
+            report["skipped"] = "no_parent"
+            return None, report
     else:
-        ret_1d = 0.0
+        parent = registry.get(parent_key) if parent_key else None
+    # Fine-tuning on zero new bars would only bump the version towards the cap
+    if parent is not None and parent.get("n_rows", 0) >= len(df_new):
+        report["skipped"] = "no_new_bars"
+        return None, report
+    parent_version = (parent or {}).get("version", 0)
+    if parent_version >= MAX_FINE_TUNE_VERSIONS:
+        report["skipped"] = "version_cap"
+        return None, report
+    if model is None:
+        try:
+            model = _ppo().load(registry.model_path(parent["key"]))
+        except Exception:
+            report["skipped"] = "load_failed"
+            return None, report
 
-    # 5-day return
-    if row_idx >= 5:
-        close_5d_ago = df["Close"].iloc[row_idx - 5]
-        ret_5d = (row["Close"] - close_5d_ago) / close_5d_ago if close_5d_ago != 0 else 0
+    train_end, _ = _split_bounds(len(df_new))
+    train_df = df_new.iloc[:train_end].copy()
+    if len(train_df) < 100:
+        report["skipped"] = "too_little_data"
+        return None, report
+
+    from rl_envs import make_vec_env
+
+    started = time.time()
+    env = make_vec_env(train_df, n_envs=model.n_envs)
+    try:
+        model.set_env(env)
+        model.learn(total_timesteps=timesteps, reset_num_timesteps=False)
+    finally:
+        env.close()
+    report.update(parent_key=(parent or {}).get("key"), version=parent_version + 1, chosen="fine_tune")
+
+    if compare_full_retrain:
+        retrain_started = time.time()
+        retrained = train_ppo_agent(df_new, ticker, total_timesteps=total_timesteps)
+        report["fine_tune_reward"] = evaluate_agent(model, df_new)
+        report["full_retrain_reward"] = evaluate_agent(retrained, df_new)
+        if retrained is not None and (report["fine_tune_reward"] is None
+                                      or report["full_retrain_reward"] > report["fine_tune_reward"]):
+            _register_model(retrained, df_new, ticker, total_timesteps, retrain_started,
+                            validation_reward=report["full_retrain_reward"])
+            report.update(chosen="full_retrain", version=0)
+            return retrained, report
+
+    _register_model(model, df_new, ticker, total_timesteps, started,
+                    parent_key=report["parent_key"], version=report["version"],
+                    fine_tune_timesteps=timesteps, validation_reward=report["fine_tune_reward"])
+    return model, report
+
+
+def build_observations(df):
+    """
+    Build the 6-dim observation for every row of df in one pass.
+
+    Row i uses only rows 0..i: the ATV slope is scaled by the standard deviation
+    of ATV_Slope over that prefix (no lookahead), and missing values propagate
+    exactly as they do for a single-row prediction.
+
+    Returns:
+        np.ndarray of shape (len(df), 6), dtype float32
+    """
+    n = len(df)
+
+    def _column(name, default):
+        if name not in df.columns:
+            return np.full(n, default, dtype=np.float64)
+        values = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+        # Mirrors `float(row.get(name, default) or default)`: only exact zeros fall back
+        return np.where(values == 0, default, values)
+
+    ema_cross = _column("EMA_Cross_Signal", 0.0)
+
+    if "ATV_Slope" in df.columns:
+        atv_slope = _column("ATV_Slope", 0.0)
+        atv_std = pd.to_numeric(df["ATV_Slope"], errors="coerce").expanding().std().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            atv_norm = np.where(atv_std > 0, atv_slope / atv_std, 0.0)
     else:
-        ret_5d = 0.0
+        atv_norm = np.zeros(n)
+
+    close = df["Close"].to_numpy(dtype=np.float64)
+    ret_1d = np.zeros(n)
+    ret_5d = np.zeros(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if n > 1:
+            prev = close[:-1]
+            ret_1d[1:] = np.where(prev != 0, (close[1:] - prev) / prev, 0)
+        if n > 5:
+            prev = close[:-5]
+            ret_5d[5:] = np.where(prev != 0, (close[5:] - prev) / prev, 0)
+
+    rsi_norm = (_column("RSI", 50.0) - 50) / 50
 
-    rsi = float(row.get("RSI", 50) or 50)
-    rsi_norm = (rsi - 50) / 50
+    rel_vol = _column("Rel_Volume", 1.0)
+    rel_vol = np.where(rel_vol > 5.0, 5.0, rel_vol)
 
-    rel_vol = float(row.get("Rel_Volume", 1.0) or 1.0)
-    rel_vol = min(rel_vol, 5.0)
+    return np.column_stack([ema_cross, atv_norm, ret_1d, ret_5d, rsi_norm, rel_vol]).astype(np.float32)
 
-    obs = np.array([ema_cross, atv_norm, ret_1d, ret_5d, rsi_norm, rel_vol], dtype=np.float32)
+
+@traced()
+def predict_action(model, df, row_idx=-1):
+    """
+    Get PPO agent's action prediction for a given state.
+
+    model may be a PPO model or its NumpyPolicy export.
+
+    Returns:
+        action: 0=buy, 1=sell, 2=hold, or None if model unavailable
+    """
+    if model is None:
+        return None
+
+    if row_idx < 0:
+        row_idx = len(df) + row_idx
+
+    obs = build_observations(df.iloc[:row_idx + 1])[-1]
 
     try:
         action, _ = model.predict(obs, deterministic=True)
@@ -295,6 +551,151 @@ def predict_action(model, df, row_idx=-1):
         return None
 
 
+@traced()
+def predict_actions(model, df):
+    """
+    Batched predict_action: one model.predict call over every row of df.
+
+    Element i equals predict_action(model, df, row_idx=i), with -1 where that
+    returns None (rows whose observation is not finite, e.g. indicator warm-up).
+
+    Returns:
+        np.ndarray of actions (0=buy, 1=sell, 2=hold, -1=none), or None if model unavailable
+    """
+    if model is None or len(df) == 0:
+        return None
+
+    obs = build_observations(df)
+    valid = np.isfinite(obs).all(axis=1)
+    actions = np.full(len(df), -1, dtype=np.int64)
+    if not valid.any():
+        return actions
+
+    try:
+        predicted, _ = model.predict(obs[valid], deterministic=True)
+    except Exception:
+        return None
+    actions[valid] = np.asarray(predicted, dtype=np.int64).reshape(-1)
+    return actions
+
+
 def is_available():
     """Check if RL dependencies are installed."""
     return RL_AVAILABLE
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def _env_steps_per_second(env, n_steps):
+    """Raw rollout throughput of a VecEnv under random actions."""
+    env.reset()
+    rng = np.random.default_rng(0)
+    rounds = max(1, n_steps // env.num_envs)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        env.step(rng.integers(0, 3, size=env.num_envs))
+    return rounds * env.num_envs / (time.perf_counter() - started)
+
+
+def benchmark(df, total_timesteps=20000, n_envs=N_ENVS, backends=ENV_BACKENDS):
+    """
+    Measure env and PPO training throughput for each backend.
+
+    Every configuration trains for the same timesteps with the same number of
+    rollout/update cycles, so the validation reward (see evaluate_agent) shows
+    whether a faster backend also learns an equivalent policy.
+
+    Returns:
+        list of dicts: backend, n_envs, env_steps_per_sec, train_steps_per_sec,
+        updates (rollout/update cycles) and val_reward
+    """
+    from rl_envs import make_vec_env
+
+    train_df = df.iloc[:int(len(df) * TRAIN_SPLIT)].copy()
+    configs = [("dummy", 1)] + [(backend, n_envs) for backend in backends]
+    results = []
+    for backend, count in configs:
+        env = make_vec_env(train_df, n_envs=count, backend=backend, seed=0)
+        try:
+            env_rate = _env_steps_per_second(env, total_timesteps)
+            policy, params = _ppo_args(count)
+            model = _ppo()(policy, env, verbose=0, seed=0, **params)
+            started = time.perf_counter()
+            model.learn(total_timesteps=total_timesteps)
+            train_rate = total_timesteps / (time.perf_counter() - started)
+        finally:
+            env.close()
+        results.append({
+            "backend": backend, "n_envs": count,
+            "env_steps_per_sec": env_rate, "train_steps_per_sec": train_rate,
+            "updates": -(-total_timesteps // (params["n_steps"] * count)),
+            "val_reward": evaluate_agent(model, df),
+        })
+    return results
+
+
+def _load_frame(ticker):
+    from indicators import compute_indicators
+    from price_store import load_prices
+
+    prices = load_prices(ticker)
+    return compute_indicators(prices) if not prices.empty else prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPO agent utilities")
+    parser.add_argument("--benchmark", action="store_true", help="Report env and training steps/sec per backend")
+    parser.add_argument("--update", nargs="+", metavar="TICKER",
+                        help="Fine-tune each ticker's newest cached model on the latest bars")
+    parser.add_argument("--compare", action="store_true",
+                        help="With --update: also retrain from scratch and keep the better model on the validation slice")
+    parser.add_argument("--ticker", default="SPY", help="Ticker whose history is used (default: SPY)")
+    parser.add_argument("--timesteps", type=int, default=20000, help="Timesteps per measurement (default: 20000)")
+    parser.add_argument("--envs", type=int, default=N_ENVS, help=f"Parallel environments (default: {N_ENVS})")
+    args = parser.parse_args()
+
+    if not args.benchmark and not args.update:
+        parser.print_help()
+        return
+    if not RL_AVAILABLE:
+        print("RL agent unavailable — install stable-baselines3 and gymnasium.")
+        return
+
+    if args.update:
+        for ticker in args.update:
+            df = _load_frame(ticker)
+            if df.empty:
+                print(f"{ticker}: no price data")
+                continue
+            started = time.time()
+            model, report = update_ppo_agent(None, df, ticker=ticker, compare_full_retrain=args.compare)
+            if report["skipped"] == "no_new_bars":
+                print(f"{ticker}: up to date, no new bars since the newest model")
+                continue
+            if model is None:
+                # No usable parent (or the lineage is capped): train from scratch,
+                # bypassing the cache lookup that would hand back the same model
+                model = get_ppo_agent(df, ticker=ticker, force_retrain=True)
+                report["chosen"] = "full_retrain" if model is not None else None
+            reason = f", {report['skipped'].replace('_', ' ')}" if report["skipped"] else ""
+            print(f"{ticker}: {report['chosen'] or 'failed'}{reason} in {time.time() - started:.1f}s "
+                  f"(fine-tune reward {report['fine_tune_reward']}, full retrain reward {report['full_retrain_reward']})")
+        return
+
+    df = _load_frame(args.ticker)
+    if df.empty:
+        print(f"No price data for {args.ticker}.")
+        return
+
+    print(f"Benchmarking on {args.ticker}: {len(df)} bars, {args.timesteps:,} timesteps per run")
+    print(f"{'Backend':<10}{'Envs':>6}{'Env steps/s':>16}{'Train steps/s':>16}{'Updates':>10}{'Val reward':>12}")
+    for row in benchmark(df, total_timesteps=args.timesteps, n_envs=args.envs):
+        val_reward = f"{row['val_reward']:.4f}" if row["val_reward"] is not None else "n/a"
+        print(f"{row['backend']:<10}{row['n_envs']:>6}{row['env_steps_per_sec']:>16,.0f}"
+              f"{row['train_steps_per_sec']:>16,.0f}{row['updates']:>10}{val_reward:>12}")
+
+
+if __name__ == "__main__":
+    main()
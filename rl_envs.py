@@ -0,0 +1,274 @@
+# =============================================================================
+# RL_ENVS.PY - Gymnasium training environments for the Paper 1 PPO agent
+# =============================================================================
+# Imported by rl_agent only when training, since stable-baselines3 pulls in
+# torch; inference never needs this module.
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+import gymnasium as gym
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv
+
+from rl_agent import ENV_BACKEND, ENV_BACKENDS, MIN_EPISODE_STEPS, N_ENVS
+
+
+def _precompute_features(df):
+    """
+    Observation features and reward inputs for every timestep of df.
+
+    Returns:
+        dict of arrays: ema_cross, atv_norm, ret_1d, ret_5d, rsi_norm, rel_vol
+        (float32), prices, volume, vol_avg (float64)
+    """
+    # EMA cross signal (already -1, 0, 1)
+    ema_cross = df["EMA_Cross_Signal"].values.astype(np.float32) if "EMA_Cross_Signal" in df.columns else np.zeros(len(df), dtype=np.float32)
+
+    # ATV slope normalized (z-score)
+    if "ATV_Slope" in df.columns:
+        atv = df["ATV_Slope"].fillna(0).values.astype(np.float64)
+        atv_std = np.std(atv) if np.std(atv) > 0 else 1.0
+        atv_norm = (atv / atv_std).astype(np.float32)
+    else:
+        atv_norm = np.zeros(len(df), dtype=np.float32)
+
+    # 1-day return
+    close = df["Close"].values.astype(np.float64)
+    ret_1d = np.zeros(len(df), dtype=np.float32)
+    ret_1d[1:] = ((close[1:] - close[:-1]) / np.where(close[:-1] != 0, close[:-1], 1)).astype(np.float32)
+
+    # 5-day return
+    ret_5d = np.zeros(len(df), dtype=np.float32)
+    if len(df) > 5:
+        ret_5d[5:] = ((close[5:] - close[:-5]) / np.where(close[:-5] != 0, close[:-5], 1)).astype(np.float32)
+
+    # RSI normalized to [-1, 1]
+    if "RSI" in df.columns:
+        rsi = df["RSI"].fillna(50).values.astype(np.float64)
+        rsi_norm = ((rsi - 50) / 50).astype(np.float32)
+    else:
+        rsi_norm = np.zeros(len(df), dtype=np.float32)
+
+    # Relative volume (capped)
+    if "Rel_Volume" in df.columns:
+        rv = df["Rel_Volume"].fillna(1.0).values.astype(np.float64)
+        rel_vol = np.clip(rv, 0, 5).astype(np.float32)
+    else:
+        rel_vol = np.ones(len(df), dtype=np.float32)
+
+    # For reward computation
+    if "Volume" in df.columns:
+        volume = df["Volume"].fillna(0).values.astype(np.float64)
+        vol_avg = pd.Series(volume).rolling(window=20, min_periods=1).mean().values
+    else:
+        volume = np.ones(len(df), dtype=np.float64)
+        vol_avg = np.ones(len(df), dtype=np.float64)
+
+    return {
+        "ema_cross": ema_cross, "atv_norm": atv_norm, "ret_1d": ret_1d, "ret_5d": ret_5d,
+        "rsi_norm": rsi_norm, "rel_vol": rel_vol,
+        "prices": close, "volume": volume, "vol_avg": vol_avg,
+    }
+
+
+class StockTradingEnv(gym.Env):
+    """
+    Gymnasium environment for Paper 1 PPO agent.
+
+    State: [ema_cross_signal, atv_slope_normalized, 1d_return, 5d_return, rsi_normalized, rel_volume]
+    Actions: Discrete(3) -> buy(0), sell(1), hold(2)
+    Reward: Rt = (Pt+1 - Pt)/Pt * (1 + beta * (Vt - V_avg)/V_avg)  (paper's Eq. 5)
+    """
+    metadata = {"render_modes": []}
+
+    def __init__(self, df, beta=0.5, random_start=False):
+        super().__init__()
+        self.df = df.reset_index(drop=True)
+        self.beta = beta
+        self.random_start = random_start
+        self.current_step = 0
+        self.max_steps = len(df) - 2  # Need at least 1 future step for reward
+
+        self.action_space = spaces.Discrete(3)  # buy=0, sell=1, hold=2
+        # 6-dimensional continuous observation
+        self.observation_space = spaces.Box(
+            low=-np.inf, high=np.inf, shape=(6,), dtype=np.float32
+        )
+
+        # Precompute features
+        self._precompute()
+
+    def _precompute(self):
+        """Precompute normalized features for all timesteps."""
+        for name, values in _precompute_features(self.df).items():
+            setattr(self, name, values)
+
+    def _get_obs(self):
+        i = self.current_step
+        return np.array([
+            self.ema_cross[i],
+            self.atv_norm[i],
+            self.ret_1d[i],
+            self.ret_5d[i],
+            self.rsi_norm[i],
+            self.rel_vol[i],
+        ], dtype=np.float32)
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        high = self.max_steps - MIN_EPISODE_STEPS
+        self.current_step = int(self.np_random.integers(0, high + 1)) if self.random_start and high > 0 else 0
+        return self._get_obs(), {}
+
+    def step(self, action):
+        i = self.current_step
+
+        # Price return for reward
+        if i + 1 < len(self.prices):
+            price_return = (self.prices[i + 1] - self.prices[i]) / self.prices[i] if self.prices[i] != 0 else 0
+        else:
+            price_return = 0
+
+        # Volume factor for reward (paper's Eq. 5)
+        v_avg = self.vol_avg[i] if self.vol_avg[i] > 0 else 1
+        vol_factor = 1 + self.beta * (self.volume[i] - v_avg) / v_avg
+
+        # Reward based on action
+        if action == 0:  # buy
+            reward = price_return * vol_factor
+        elif action == 1:  # sell
+            reward = -price_return * vol_factor
+        else:  # hold
+            reward = 0.0
+
+        self.current_step += 1
+        terminated = self.current_step >= self.max_steps
+        truncated = False
+
+        obs = self._get_obs() if not terminated else np.zeros(6, dtype=np.float32)
+
+        return obs, float(reward), terminated, truncated, {}
+
+
+class BatchedStockTradingVecEnv(VecEnv):
+    """
+    N copies of StockTradingEnv stepped together with array operations.
+
+    Every copy reads the same precomputed feature matrix; only the current
+    step differs, so a vectorized step is a gather plus a few array ops
+    instead of N Python env.step() calls. Copies auto-reset like
+    DummyVecEnv, starting at a random offset when random_start is set.
+    """
+
+    def __init__(self, df, n_envs=N_ENVS, beta=0.5, random_start=True, seed=None):
+        features = _precompute_features(df.reset_index(drop=True))
+        self.obs_matrix = np.column_stack([
+            features[name] for name in ("ema_cross", "atv_norm", "ret_1d", "ret_5d", "rsi_norm", "rel_vol")
+        ]).astype(np.float32)
+        self.max_steps = len(df) - 2
+        self.random_start = random_start
+        self._rng = np.random.default_rng(seed)
+        self._steps = np.zeros(n_envs, dtype=np.int64)
+        self._actions = None
+
+        # Per-bar reward for a buy (paper's Eq. 5); sell is its negative, hold is 0
+        close, volume, vol_avg = features["prices"], features["volume"], features["vol_avg"]
+        price_return = np.zeros(len(close))
+        if len(close) > 1:
+            prev = close[:-1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                price_return[:-1] = np.where(prev != 0, (close[1:] - prev) / prev, 0)
+        v_avg = np.where(vol_avg > 0, vol_avg, 1)
+        self.buy_reward = price_return * (1 + beta * (volume - v_avg) / v_avg)
+
+        super().__init__(
+            n_envs,
+            spaces.Box(low=-np.inf, high=np.inf, shape=(6,), dtype=np.float32),
+            spaces.Discrete(3),
+        )
+
+    def _start_steps(self, count):
+        high = self.max_steps - MIN_EPISODE_STEPS
+        if self.random_start and high > 0:
+            return self._rng.integers(0, high + 1, size=count)
+        return np.zeros(count, dtype=np.int64)
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+        self._steps = self._start_steps(self.num_envs)
+        return self.obs_matrix[self._steps].copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(-1)
+
+    def step_wait(self):
+        actions, steps = self._actions, self._steps
+        reward = self.buy_reward[steps]
+        rewards = np.where(actions == 0, reward, np.where(actions == 1, -reward, 0.0)).astype(np.float32)
+
+        steps = steps + 1
+        dones = steps >= self.max_steps
+        obs = self.obs_matrix[np.minimum(steps, len(self.obs_matrix) - 1)].copy()
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            done_idx = np.flatnonzero(dones)
+            for i in done_idx:
+                infos[i]["terminal_observation"] = np.zeros(6, dtype=np.float32)
+                infos[i]["TimeLimit.truncated"] = False
+            steps[done_idx] = self._start_steps(len(done_idx))
+            obs[done_idx] = self.obs_matrix[steps[done_idx]]
+        self._steps = steps
+        return obs, rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name, None)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+
+def _make_env(train_df, random_start, seed):
+    def _init():
+        env = StockTradingEnv(train_df, random_start=random_start)
+        env.reset(seed=seed)
+        return env
+    return _init
+
+
+def make_vec_env(train_df, n_envs=N_ENVS, backend=ENV_BACKEND, seed=None):
+    """
+    Vectorized training environment over train_df.
+
+    Args:
+        train_df: Training slice with computed indicators
+        n_envs: Number of parallel environment copies
+        backend: One of ENV_BACKENDS
+        seed: Seed for the random start offsets
+
+    Returns:
+        VecEnv; copies start at random offsets whenever n_envs > 1
+    """
+    random_start = n_envs > 1
+    if backend == "numpy":
+        return BatchedStockTradingVecEnv(train_df, n_envs=n_envs, random_start=random_start, seed=seed)
+    seeds = [None if seed is None else seed + i for i in range(n_envs)]
+    env_fns = [_make_env(train_df, random_start, s) for s in seeds]
+    if backend == "subproc" and n_envs > 1:
+        return SubprocVecEnv(env_fns)
+    if backend in ("dummy", "subproc"):
+        return DummyVecEnv(env_fns)
+    raise ValueError(f"Unknown env backend '{backend}' (expected one of {ENV_BACKENDS})")
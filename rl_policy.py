@@ -0,0 +1,105 @@
+# =============================================================================
+# RL_POLICY.PY - NumPy-only PPO policy for inference without torch
+# =============================================================================
+# The PPO MlpPolicy actor is a stack of Linear layers with a tanh (or ReLU)
+# between them followed by the action head; deterministic prediction is the
+# argmax of the action logits. Exporting those weights to a small .npz lets the
+# app and backtester predict with a few matrix multiplies, without importing
+# torch or stable-baselines3.
+# =============================================================================
+
+import hashlib
+
+import numpy as np
+
+_ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0),
+    "identity": lambda x: x,
+}
+
+
+class NumpyPolicy:
+    """
+    Actor network of a discrete-action PPO MlpPolicy.
+
+    predict() mirrors PPO.predict(obs, deterministic=True), so it can be passed
+    anywhere a PPO model is used for inference.
+    """
+
+    def __init__(self, weights, biases, activation="tanh"):
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activation = activation
+
+    @classmethod
+    def from_model(cls, model):
+        """Extract the actor weights from a stable-baselines3 PPO model."""
+        policy = model.policy
+        layers = [m for m in policy.mlp_extractor.policy_net if hasattr(m, "weight")]
+        layers.append(policy.action_net)
+        activation = getattr(policy, "activation_fn", None)
+        name = activation.__name__.lower() if activation is not None else "tanh"
+        if name not in _ACTIVATIONS:
+            raise ValueError(f"Unsupported activation '{name}'")
+        return cls(
+            [layer.weight.detach().cpu().numpy() for layer in layers],
+            [layer.bias.detach().cpu().numpy() for layer in layers],
+            activation=name,
+        )
+
+    def save(self, path):
+        """Write the weights to a .npz file."""
+        arrays = {}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"w{i}"] = w
+            arrays[f"b{i}"] = b
+        with open(path, "wb") as fh:
+            np.savez(fh, activation=np.array(self.activation), n_layers=np.array(len(self.weights)), **arrays)
+
+    def fingerprint(self):
+        """Hash of the activation and weights, for caching results computed with this policy."""
+        digest = hashlib.sha256(self.activation.encode())
+        for w, b in zip(self.weights, self.biases):
+            digest.update(w.tobytes())
+            digest.update(b.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = int(data["n_layers"])
+            return cls(
+                [data[f"w{i}"] for i in range(n_layers)],
+                [data[f"b{i}"] for i in range(n_layers)],
+                activation=str(data["activation"]),
+            )
+
+    def logits(self, obs):
+        """Action logits for one observation (shape (6,)) or a batch (shape (n, 6))."""
+        x = np.asarray(obs, dtype=np.float32)
+        act = _ACTIVATIONS[self.activation]
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            x = x @ w.T + b
+            if i < last:
+                x = act(x)
+        return x
+
+    def predict(self, obs, deterministic=True):
+        """
+        Returns:
+            (actions, None): an int for one observation, an array for a batch
+        """
+        obs = np.asarray(obs, dtype=np.float32)
+        if not np.isfinite(obs).all():
+            raise ValueError("Observation contains non-finite values")
+        logits = self.logits(obs)
+        if deterministic:
+            actions = logits.argmax(axis=-1)
+        else:
+            probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+            probs /= probs.sum(axis=-1, keepdims=True)
+            flat = probs.reshape(-1, probs.shape[-1])
+            actions = np.array([np.random.choice(len(p), p=p) for p in flat]).reshape(probs.shape[:-1])
+        return actions, None
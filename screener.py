@@ -0,0 +1,351 @@
+# =============================================================================
+# SCREENER.PY - Universe-wide scoring and ranking in one vectorized pass
+# =============================================================================
+# Loads every ticker of the S&P 500 / NASDAQ-100 universe from the local price
+# store into a bars x tickers panel, computes the screener indicators for all
+# columns at once and evaluates the technical score, volume score and Paper 1
+# signal for every ticker's latest bar with array operations. Paper 2
+# fundamentals come from the shared fundamentals store. The result is a ranked
+# table, so a daily list of ~600 names costs one pass instead of one page load
+# per ticker.
+#
+# Usage:
+#   python screener.py --universe all --rank composite --top 25
+#   python screener.py --universe sp500 --rank paper1 --output screen.csv
+# =============================================================================
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import fundamentals_store
+import market_data
+import price_store
+from fetch_pool import fetch_many, peer_metrics_row
+from indicators import compute_panel_indicators
+from models import (
+    PAPER2_FACTORS,
+    SectorFactorIndex,
+    detect_market_regime,
+    generate_recommendation_paper2,
+    paper1_signal_masks,
+    paper2_factor_scores,
+    paper2_scores_batch,
+    technical_subscores,
+    volume_score_arrays,
+)
+
+# Trailing bars kept per ticker. SMA200 needs 200; the extra bars let the
+# adjust=False EMAs (slowest span 50) converge to the full-history values.
+PANEL_BARS = 600
+
+# Sector peers per ticker for Paper 2 percentiles (same cap as the app)
+MAX_SECTOR_PEERS = 15
+
+# Threads decompressing stored series
+READ_WORKERS = 8
+
+RANK_OPTIONS = ("composite", "paper1", "paper2")
+
+_SIGNAL_ORDER = {"BUY": 0, "HOLD": 1, "SELL": 2}
+
+
+def _tail_arrays(frame, bars):
+    """Last `bars` rows of a stored-series frame in the read_columns() shape."""
+    if frame is None or frame.empty or "Close" not in frame.columns:
+        return {}
+    tail = frame.iloc[-bars:]
+    arrays = {"Date": tail.index, "Close": tail["Close"].to_numpy(dtype=np.float64)}
+    if "Volume" in tail.columns:
+        arrays["Volume"] = tail["Volume"].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def load_panel(tickers, store=None, refresh=True, bars=PANEL_BARS):
+    """
+    Stack the stored daily histories of tickers into bars x tickers panels.
+
+    Histories are aligned on each ticker's own last bar (not on calendar
+    dates), so every column holds that ticker's most recent `bars` bars,
+    left-padded with NaN when it has fewer.
+
+    Args:
+        tickers: Iterable of ticker symbols
+        store: PriceStore to read from; the shared store when None
+        refresh: Bring stale series up to date (concurrently) before reading;
+                 False reads only what is already on disk
+        bars: Trailing bars kept per ticker
+
+    Returns:
+        close: DataFrame (bars x tickers) of closes
+        volume: DataFrame (bars x tickers) of volumes (NaN where missing)
+        meta: DataFrame indexed by ticker with "bars" (bars in the panel) and
+              "last_date". Tickers with no stored history are left out.
+    """
+    store = store or price_store.get_store()
+    tickers = list(dict.fromkeys(tickers))
+    if refresh:
+        frames = fetch_many(tickers, store.refresh, host="yahoo")
+        series = [_tail_arrays(frame, bars) for frame in frames]
+    else:
+        # Reads are dominated by zlib decompression, which releases the GIL
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+            series = list(pool.map(lambda t: store.read_columns(t, ("Date", "Close", "Volume"), tail=bars), tickers))
+
+    kept, meta = [], []
+    close = np.full((bars, len(tickers)), np.nan)
+    volume = np.full((bars, len(tickers)), np.nan)
+    for ticker, arrays in zip(tickers, series):
+        if "Close" not in arrays or not len(arrays["Close"]):
+            continue
+        n = len(arrays["Close"])
+        col = len(kept)
+        close[bars - n:, col] = arrays["Close"]
+        if "Volume" in arrays:
+            volume[bars - n:, col] = arrays["Volume"]
+        kept.append(ticker)
+        meta.append({"ticker": ticker, "bars": n, "last_date": arrays["Date"][-1]})
+
+    index = pd.RangeIndex(-bars + 1, 1, name="bar")
+    close = pd.DataFrame(close[:, :len(kept)], index=index, columns=kept)
+    volume = pd.DataFrame(volume[:, :len(kept)], index=index, columns=kept)
+    meta = pd.DataFrame(meta, columns=["ticker", "bars", "last_date"]).set_index("ticker")
+    return close, volume, meta
+
+
+def score_panel(close, volume, meta):
+    """
+    Latest-bar technical score, volume score and Paper 1 signal for every ticker.
+
+    Each value equals what calculate_technical_score, calculate_volume_score
+    and generate_paper1_signal return for that ticker's indicator frame.
+
+    Returns:
+        DataFrame indexed by ticker
+    """
+    panel = compute_panel_indicators(close, volume)
+    last = {name: frame.iloc[-1].to_numpy(dtype=np.float64) for name, frame in panel.items()}
+    price = close.iloc[-1].to_numpy(dtype=np.float64)
+    n_bars = meta.loc[close.columns, "bars"].to_numpy()
+
+    tech = technical_subscores(
+        price, last["SMA50"], last["SMA200"], last["RSI"],
+        last["MACD"], last["MACD_SIGNAL"], last["MACD_HIST"],
+    )
+    tech_score = np.where(n_bars < 200, 50, tech["total"])
+
+    price_change = np.zeros(len(price))
+    if len(close) >= 10:
+        price_change = np.where(n_bars >= 10, price - close.iloc[-10].to_numpy(dtype=np.float64), 0.0)
+    volume_score = volume_score_arrays(price_change, last["Volume_Slope"], last["Rel_Volume"])
+    has_volume = volume.notna().any().to_numpy()
+    volume_score = np.where(has_volume, volume_score, 0)
+
+    rsi = np.where(np.isnan(last["RSI"]), 50.0, last["RSI"])
+    atv_slope = np.nan_to_num(last["ATV_Slope"], nan=0.0)
+    *_, buy, sell = paper1_signal_masks(last["EMA_Cross_Signal"], atv_slope, rsi)
+    warm = n_bars >= 50
+    signal = np.full(len(price), "HOLD", dtype=object)
+    signal[warm & buy] = "BUY"
+    signal[warm & sell] = "SELL"
+
+    return pd.DataFrame({
+        "last_date": meta.loc[close.columns, "last_date"].to_numpy(),
+        "bars": n_bars,
+        "close": price,
+        "rsi": last["RSI"],
+        "monthly_return": last["Monthly_Return"],
+        "tech_score": tech_score.astype(np.int64),
+        "volume_score": volume_score.astype(np.int64),
+        "paper1_signal": signal,
+    }, index=pd.Index(close.columns, name="ticker"))
+
+
+def score_fundamentals(universe_df, monthly_returns, risk_profile="moderate", store=None):
+    """
+    Paper 2 fundamental score for every ticker, with sector peers from the universe.
+
+    Args:
+        universe_df: Universe table with "ticker" and "sector" columns
+        monthly_returns: Series of latest Monthly_Return indexed by ticker
+        risk_profile: "conservative", "moderate" or "aggressive"
+        store: FundamentalsStore; the shared store when None
+
+    Returns:
+        Series of scores (0-100) indexed by ticker
+    """
+    store = store or fundamentals_store.get_store()
+    all_tickers = universe_df["ticker"].tolist()
+    infos = dict(zip(all_tickers, store.get_many(all_tickers)))
+    rows = {t: peer_metrics_row(t, infos.get(t) or {}) for t in all_tickers}
+    sector_of = dict(zip(universe_df["ticker"], universe_df["sector"]))
+
+    # A ticker's peers are the first MAX_SECTOR_PEERS other names of its sector
+    # plus itself: the leading MAX_SECTOR_PEERS + 1 names for those among them,
+    # the leading MAX_SECTOR_PEERS plus the ticker for everyone else. Two
+    # indexes per sector cover both cases.
+    leading, head = {}, {}
+    for sector, members in universe_df.groupby("sector", sort=False)["ticker"]:
+        members = members.tolist()
+        leading[sector] = set(members[:MAX_SECTOR_PEERS + 1])
+        head[sector] = (
+            SectorFactorIndex(pd.DataFrame([rows[t] for t in members[:MAX_SECTOR_PEERS + 1]])),
+            SectorFactorIndex(pd.DataFrame([rows[t] for t in members[:MAX_SECTOR_PEERS]])),
+        )
+
+    factor_rows, pb_available, use_percentile = [], [], []
+    for ticker in monthly_returns.index:
+        sector = sector_of.get(ticker)
+        if sector not in head:
+            peer_index = None
+        elif ticker in leading[sector]:
+            peer_index = head[sector][0]
+        else:
+            peer_index = head[sector][1].with_member(rows[ticker])
+        momentum = monthly_returns[ticker]
+        factors = paper2_factor_scores(
+            infos.get(ticker) or {}, peer_metrics=peer_index, momentum=None if pd.isna(momentum) else momentum
+        )
+        factor_rows.append([factors[f"{f}_pctile"] for f in PAPER2_FACTORS])
+        pb_available.append(not factors.get("pb_unavailable", False))
+        use_percentile.append(factors["used_percentile"])
+
+    batch = paper2_scores_batch(
+        np.array(factor_rows, dtype=np.float64).reshape(-1, len(PAPER2_FACTORS)),
+        pb_available=np.array(pb_available, dtype=bool),
+        use_percentile=np.array(use_percentile, dtype=bool),
+        risk_profile=risk_profile,
+    )
+    scores = pd.Series(batch["total"], index=monthly_returns.index)
+    return scores.rename("fund_score")
+
+
+def rank_results(results, rank_by="composite"):
+    """Sort a screener table by composite score, Paper 1 signal or Paper 2 percentile."""
+    if rank_by not in RANK_OPTIONS:
+        raise ValueError(f"rank_by must be one of {RANK_OPTIONS}")
+    if rank_by == "paper1":
+        order = results["paper1_signal"].map(_SIGNAL_ORDER)
+        ranked = results.assign(_order=order).sort_values(
+            ["_order", "composite_score"], ascending=[True, False]
+        ).drop(columns="_order")
+    elif rank_by == "paper2":
+        ranked = results.sort_values(["paper2_pctile", "composite_score"], ascending=False)
+    else:
+        ranked = results.sort_values("composite_score", ascending=False)
+    ranked = ranked.reset_index(drop=True)
+    ranked.index = ranked.index + 1
+    ranked.index.name = "rank"
+    return ranked
+
+
+def run_screener(universe_df, rank_by="composite", include_fundamentals=True, refresh=True,
+                 risk_profile="moderate", market_regime="Unknown", store=None,
+                 fund_store=None):
+    """
+    Score and rank every ticker in universe_df.
+
+    Args:
+        universe_df: Universe table (ticker, name, sector, ...), e.g. load_all_us_stocks()
+        rank_by: "composite", "paper1" or "paper2"
+        include_fundamentals: Score Paper 2 fundamentals (needs info snapshots)
+        refresh: Bring stored prices up to date first
+        risk_profile: Paper 2 risk profile
+        market_regime: Regime label used for the composite weights
+        store: PriceStore override
+        fund_store: FundamentalsStore override
+
+    Returns:
+        Ranked DataFrame, one row per ticker with stored prices
+    """
+    universe_df = universe_df.drop_duplicates(subset=["ticker"])
+    close, volume, meta = load_panel(universe_df["ticker"], store=store, refresh=refresh)
+    results = score_panel(close, volume, meta)
+
+    if include_fundamentals and len(results):
+        fund = score_fundamentals(universe_df, results["monthly_return"], risk_profile=risk_profile,
+                                  store=fund_store)
+        results["fund_score"] = fund.reindex(results.index)
+        results["paper2_pctile"] = results["fund_score"].rank(pct=True) * 100
+        composite, recommendation = [], []
+        for tech_score, fund_score in zip(results["tech_score"], results["fund_score"]):
+            rec = generate_recommendation_paper2(
+                tech_score, fund_score, market_regime, "", {},
+                risk_profile=risk_profile, time_horizon="long",
+            )
+            composite.append(rec["composite_score"])
+            recommendation.append(rec["recommendation"])
+        results["composite_score"] = composite
+        results["recommendation"] = recommendation
+    else:
+        results["fund_score"] = np.nan
+        results["paper2_pctile"] = np.nan
+        results["composite_score"] = (results["tech_score"] + results["volume_score"]) / 2
+        results["recommendation"] = None
+
+    labels = universe_df.set_index("ticker")
+    for column in ("name", "sector"):
+        if column in labels.columns:
+            results.insert(0, column, labels[column].reindex(results.index))
+    results = results.rename_axis("ticker").reset_index()
+    return rank_results(results, rank_by)
+
+
+def detect_stored_regime(store=None):
+    """Market regime from the stored ^GSPC and ^VIX histories ("Unknown" if unavailable)."""
+    try:
+        sp500, vix = market_data.load_market_data(store=store)
+        regime, _, _ = detect_market_regime(sp500, vix)
+        return regime
+    except Exception:
+        return "Unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score and rank the whole stock universe")
+    parser.add_argument("--universe", choices=["sp500", "nasdaq100", "all"], default="all")
+    parser.add_argument("--rank", choices=RANK_OPTIONS, default="composite")
+    parser.add_argument("--top", type=int, default=25, help="Rows to print (0 = all)")
+    parser.add_argument("--risk-profile", choices=["conservative", "moderate", "aggressive"], default="moderate")
+    parser.add_argument("--regime", default=None,
+                        help="Market regime label; detected from stored ^GSPC/^VIX when omitted")
+    parser.add_argument("--no-fundamentals", action="store_true", help="Skip Paper 2 fundamentals")
+    parser.add_argument("--offline", action="store_true", help="Use stored prices without refreshing")
+    parser.add_argument("--output", default=None, help="Write the full ranked table to this CSV")
+    args = parser.parse_args()
+
+    from universe import fetch_universe
+
+    universe_df = fetch_universe(args.universe)
+    if universe_df.empty:
+        print("Universe could not be loaded")
+        return
+
+    regime = args.regime or detect_stored_regime()
+    started = time.perf_counter()
+    results = run_screener(
+        universe_df,
+        rank_by=args.rank,
+        include_fundamentals=not args.no_fundamentals,
+        refresh=not args.offline,
+        risk_profile=args.risk_profile,
+        market_regime=regime,
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"Scored {len(results)} of {len(universe_df)} tickers in {elapsed:.1f}s (regime: {regime})")
+    shown = results if args.top <= 0 else results.head(args.top)
+    columns = ["ticker", "name", "sector", "composite_score", "tech_score", "volume_score",
+               "fund_score", "paper2_pctile", "paper1_signal", "recommendation"]
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.1f}".format):
+        print(shown[[c for c in columns if c in shown.columns]].to_string())
+    if args.output:
+        results.to_csv(args.output)
+        print(f"Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,3 +9,4 @@ from . import technical
 from . import fundamentals
 from . import news
 from . import backtest
+from . import screener
@@ -10,13 +10,15 @@ from models import (
     generate_key_drivers, generate_key_risk, generate_bull_bear_case,
     generate_action_checklist, generate_view_changers,
 )
+from tracing import traced
 
 
+@traced()
 def render(selected, price_data, info, tech_score, tech_details,
            market_regime, regime_metrics, last_row,
            selected_strategy="Volume+RSI", volume_score=0, volume_details=None,
            rsi_value=50, risk_profile="moderate", fund_score_p2=50, fund_details_p2=None,
-           paper1_details=None, rl_prediction=None, cost_basis=None):
+           paper1_details=None, rl_prediction=None):
     """Render the Analysis tab content."""
     st.subheader("Market & Stock Analysis")
 
@@ -80,20 +82,6 @@ def render(selected, price_data, info, tech_score, tech_details,
         comp_status = "success" if composite >= 65 else "warning" if composite >= 45 else "danger"
         st.markdown(render_accent_card("Score", f"{composite:.0f}/100", "Weighted composite score.", comp_status, border_color="#0097A7"), unsafe_allow_html=True)
 
-    # Position P&L (if user owns the stock)
-    if cost_basis is not None:
-        current_price = last_row["Close"]
-        pnl_pct = (current_price - cost_basis) / cost_basis * 100
-        pnl_dollar = current_price - cost_basis
-        pnl_status = "success" if pnl_pct >= 0 else "danger"
-        pnl_label = "Profit" if pnl_pct >= 0 else "Loss"
-        st.markdown(f"""
-        <div style="background:{'rgba(16,185,129,0.08)' if pnl_pct >= 0 else 'rgba(239,68,68,0.08)'}; border-left:4px solid {'#10B981' if pnl_pct >= 0 else '#EF4444'}; padding:12px 16px; border-radius:6px; margin:8px 0;">
-            <span style="font-weight:600;">My Position:</span> Bought at <b>${cost_basis:.2f}</b> → Now <b>${current_price:.2f}</b> —
-            <span style="color:{'#10B981' if pnl_pct >= 0 else '#EF4444'}; font-weight:700;">{pnl_label}: {pnl_pct:+.1f}% (${pnl_dollar:+.2f}/share)</span>
-        </div>
-        """, unsafe_allow_html=True)
-
     # RSI gate warning (for Paper 1 strategy)
     if selected_strategy == "Volume+RSI":
         rsi_gate = recommendation_data.get("rsi_gate_applied", False)
@@ -6,6 +6,8 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
+from tracing import traced
+
 # Chart styling constants
 CHART_FONT_COLOR = "#1A3C40"
 CHART_AXIS_COLOR = "#37616A"
@@ -18,6 +20,7 @@ STRATEGY_COLORS = {
 }
 
 
+@traced()
 def render(selected, price_data, info, market_regime, peer_metrics=None):
     """Render the Backtest comparison tab."""
     st.subheader("Strategy Backtest")
@@ -30,6 +33,7 @@ def render(selected, price_data, info, market_regime, peer_metrics=None):
         get_strategy_functions,
         compute_indicators as bt_compute_indicators,
     )
+    import backtest_store
 
     # Period selector
     period_col1, period_col2 = st.columns([3, 1])
@@ -45,62 +49,122 @@ def render(selected, price_data, info, market_regime, peer_metrics=None):
     period_map = {"1Y": 252, "2Y": 504, "3Y": 756, "5Y": 1260}
     bt_days = period_map.get(bt_period, 504)
 
-    # Run backtest button
+    bt_df_slice = _backtest_frame(price_data, bt_days, bt_compute_indicators)
+    store = backtest_store.get_store()
+    data_hash = backtest_store.data_digest(bt_df_slice)
+
+    # Run backtest button; otherwise re-display the stored results for this data
     if st.button("Run Backtest", type="primary"):
         with st.spinner(f"Running {bt_period} backtest for {selected}..."):
-            _run_and_display_backtest(
-                selected, price_data, info, market_regime, peer_metrics,
-                bt_days, bt_period, simulate_strategy, calculate_backtest_metrics,
-                get_strategy_functions, bt_compute_indicators,
+            all_results = _run_backtest(
+                selected, bt_df_slice, info, market_regime, peer_metrics,
+                bt_days, bt_period, data_hash, store, simulate_strategy,
+                calculate_backtest_metrics, get_strategy_functions,
             )
+    else:
+        all_results = store.latest(selected, bt_period, data_hash)
+        if all_results:
+            run_at = max(r["meta"]["created_at"] for r in all_results.values())
+            st.caption(f"Stored results from {pd.Timestamp(run_at, unit='s'):%Y-%m-%d %H:%M} UTC "
+                       "on today's data. Click 'Run Backtest' to add missing strategies.")
+
+    if all_results:
+        _display_results(all_results, bt_df_slice)
     else:
         st.info(f"Click 'Run Backtest' to compare all strategies (including RL agent) over {bt_period}.")
 
+    _render_stored_runs(store, selected)
 
-def _run_and_display_backtest(
-    selected, price_data, info, market_regime, peer_metrics,
-    bt_days, bt_period, simulate_strategy, calculate_backtest_metrics,
-    get_strategy_functions, bt_compute_indicators,
-):
-    """Execute backtest and display results."""
 
+def _backtest_frame(price_data, bt_days, bt_compute_indicators):
+    """Indicator frame for the backtest window plus 200 warm-up rows, positionally indexed."""
     # Prepare data: ensure indicators are computed
     if "EMA_Cross_Signal" not in price_data.columns:
         bt_df = bt_compute_indicators(price_data)
     else:
-        bt_df = price_data.copy()
+        bt_df = price_data
 
     # Slice to backtest period (need extra 200 days for warmup)
     total_needed = bt_days + 200
-    if len(bt_df) < total_needed:
-        bt_df_slice = bt_df.copy()
-    else:
-        bt_df_slice = bt_df.tail(total_needed).copy()
-    bt_df_slice = bt_df_slice.reset_index(drop=True)
+    return bt_df.tail(total_needed).reset_index(drop=True)
 
-    # Get strategy functions (includes RL agent if available)
-    strategies = get_strategy_functions(
-        info, market_regime, peer_metrics,
-        backtest_df=bt_df_slice, ticker=selected,
-    )
 
-    # Run each strategy
+def _run_backtest(
+    selected, bt_df_slice, info, market_regime, peer_metrics,
+    bt_days, bt_period, data_hash, store, simulate_strategy,
+    calculate_backtest_metrics, get_strategy_functions,
+):
+    """Load the stored result of each strategy, simulating and storing only the missing ones."""
+    total_needed = bt_days + 200
+
+    # Regime in force on each backtest day; today's label if index history is unavailable
+    from backtest import RL_AVAILABLE, RL_STRATEGY, get_rl_strategy, load_regime_series
+
+    try:
+        regimes = load_regime_series(lookback_months=-(-total_needed // 22))
+    except Exception:
+        regimes = None
+    if regimes is None or regimes.empty:
+        regimes = market_regime
+
+    # Rule-based strategies are cheap to build; the RL strategy is looked up
+    # with an already-registered policy only, so stored runs never train
+    strategies = get_strategy_functions(info, regimes, peer_metrics, ticker=selected, include_rl=False)
+    rl_strategy = get_rl_strategy(info, regimes, bt_df_slice, ticker=selected, train=False)
+    if rl_strategy is not None:
+        strategies[RL_STRATEGY] = rl_strategy
+
     all_results = {}
+    missing = {}
+    for name, fn in strategies.items():
+        params = getattr(fn, "params", None)
+        cached = store.get(selected, bt_period, data_hash, name, params) if params is not None else None
+        if cached is not None:
+            all_results[name] = cached
+        else:
+            missing[name] = fn
+
+    # No registered policy: reuse a stored RL run on this data, else train one
+    if rl_strategy is None and RL_AVAILABLE and len(bt_df_slice) >= 100:
+        stored = store.latest(selected, bt_period, data_hash).get(RL_STRATEGY)
+        if stored is not None:
+            all_results[RL_STRATEGY] = stored
+            strategies[RL_STRATEGY] = None
+        else:
+            rl_strategy = get_rl_strategy(info, regimes, bt_df_slice, ticker=selected)
+            if rl_strategy is not None:
+                strategies[RL_STRATEGY] = missing[RL_STRATEGY] = rl_strategy
+
+    # Run each strategy without a stored result
     progress = st.progress(0)
-    strategy_names = list(strategies.keys())
-
-    for i, (name, fn) in enumerate(strategies.items()):
+    for i, (name, fn) in enumerate(missing.items()):
         equity_curve, trades, signals = simulate_strategy(bt_df_slice, fn)
         metrics = calculate_backtest_metrics(equity_curve, trades)
-        all_results[name] = {
-            "equity_curve": equity_curve,
-            "trades": trades,
-            "signals": signals,
-            "metrics": metrics,
-        }
-        progress.progress((i + 1) / len(strategies))
+        params = getattr(fn, "params", None)
+        if params is not None:
+            all_results[name] = store.put(
+                selected, bt_period, data_hash, name, params, equity_curve, trades, signals, metrics
+            )
+        else:
+            all_results[name] = {
+                "equity_curve": equity_curve,
+                "trades": trades,
+                "signals": signals,
+                "metrics": metrics,
+            }
+        progress.progress((i + 1) / len(missing))
 
     progress.empty()
+    if len(missing) < len(strategies):
+        st.caption(f"{len(strategies) - len(missing)} of {len(strategies)} strategies loaded from stored results.")
+    return {name: all_results[name] for name in strategies}
+
+
+def _display_results(all_results, bt_df_slice):
+    """Comparison table, equity curves and signal timeline for {strategy: result}."""
+    strategy_names = sorted(
+        all_results, key=lambda n: list(STRATEGY_COLORS).index(n) if n in STRATEGY_COLORS else len(STRATEGY_COLORS)
+    )
 
     # =========================================================================
     # 1. COMPARISON TABLE
@@ -301,3 +365,26 @@ def _run_and_display_backtest(
             st.metric("Accuracy", f"{m['accuracy']:.1f}%")
         with t_col4:
             st.metric("Sharpe", f"{m['sharpe_ratio']:.2f}")
+
+
+def _render_stored_runs(store, selected):
+    """Table of every stored run for the ticker, to compare results across days."""
+    runs = store.runs(selected)
+    if not runs:
+        return
+    with st.expander(f"Stored runs for {selected} ({len(runs)})"):
+        rows = []
+        for meta in runs:
+            m = meta["metrics"]
+            rows.append({
+                "Run At": pd.Timestamp(meta["created_at"], unit="s").floor("min"),
+                "Data Through": str(meta.get("data_end") or "")[:10],
+                "Period": meta["period"],
+                "Strategy": meta["strategy"],
+                "Total Return %": m["total_return"],
+                "Sharpe Ratio": m["sharpe_ratio"],
+                "Max Drawdown %": m["max_drawdown"],
+                "Trades": m["trade_count"],
+                "Accuracy %": m["accuracy"],
+            })
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
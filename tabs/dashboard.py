@@ -8,7 +8,10 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from components import get_status_color
+from downsample import lttb_indices
+from indicators import CrossoverIndex
 from models import classify_headline_sentiment, generate_bull_bear_case
+from tracing import traced
 
 # Shared styles
 CARD = (
@@ -41,21 +44,17 @@ def _build_sparkline_svg(prices, dates=None, width=460, height=120, color="#0097
     cw = width - ml - mr   # chart area width
     ch = height - mt - mb   # chart area height
 
+    # At most one point per pixel of the plot area, computed in one pass
     n = len(prices)
-    points = []
-    for i, p in enumerate(prices):
-        x = ml + (i / (n - 1)) * cw
-        y = mt + (1 - (p - lo) / rng) * ch
-        points.append(f"{x:.1f},{y:.1f}")
+    keep = lttb_indices(prices, cw)
+    xs = ml + (keep / (n - 1)) * cw
+    ys = mt + (1 - (np.asarray(prices, dtype=np.float64)[keep] - lo) / rng) * ch
+    points = [f"{x:.1f},{y:.1f}" for x, y in zip(xs.tolist(), ys.tolist())]
     polyline = " ".join(points)
 
-    # Gradient fill
+    # Gradient fill along the same points
     first_y = mt + (1 - (prices[0] - lo) / rng) * ch
-    fill_path = f"M{ml},{first_y:.1f} "
-    fill_path += " ".join(
-        f"L{ml + (i / (n - 1)) * cw:.1f},{mt + (1 - (p - lo) / rng) * ch:.1f}"
-        for i, p in enumerate(prices)
-    )
+    fill_path = f"M{ml},{first_y:.1f} " + " ".join("L" + point for point in points)
     fill_path += f" L{ml + cw},{mt + ch} L{ml},{mt + ch} Z"
 
     # Y-axis: high, mid, low labels + grid lines
@@ -156,35 +155,18 @@ def _fund_snippet(fund_score_p2, info):
     return f"Fundamental concerns ({metrics}). Factor score: {fund_score_p2:.0f}/100."
 
 
-# ---- helpers ----
-
-def _find_crossovers(df):
-    """Find SMA50/200 golden & death crosses in df."""
-    if "SMA50" not in df.columns or "SMA200" not in df.columns:
-        return [], []
-    golden, death = [], []
-    s50, s200, dates, prices = df["SMA50"].values, df["SMA200"].values, df["Date"].values, df["Close"].values
-    for i in range(1, len(df)):
-        if pd.isna(s50[i]) or pd.isna(s200[i]) or pd.isna(s50[i-1]) or pd.isna(s200[i-1]):
-            continue
-        if s50[i-1] <= s200[i-1] and s50[i] > s200[i]:
-            golden.append((dates[i], prices[i], s50[i]))
-        if s50[i-1] >= s200[i-1] and s50[i] < s200[i]:
-            death.append((dates[i], prices[i], s50[i]))
-    return golden, death
-
-
 # =============================================================================
 # RENDER
 # =============================================================================
 
+@traced()
 def render(selected, price_data, info, last_row, change_pct,
            tech_score, tech_details, volume_score, volume_details,
            fund_score_p2, fund_details_p2,
            market_regime, regime_metrics,
            recommendation_data, rsi_value,
-           selected_strategy, news_items, cost_basis, paper1_details,
-           logo_url=""):
+           selected_strategy, news_items, paper1_details,
+           logo_url="", crossovers=None):
 
     rec = recommendation_data.get("recommendation", "HOLD")
     confidence = recommendation_data.get("confidence", 50)
@@ -253,7 +235,9 @@ def render(selected, price_data, info, last_row, change_pct,
         st.markdown(f'<div style="{LABEL}">Technical — Trend</div>', unsafe_allow_html=True)
 
         chart_1y = price_data.tail(252).copy()
-        golden_crosses, death_crosses = _find_crossovers(chart_1y)
+        if crossovers is None:
+            crossovers = CrossoverIndex(price_data)
+        golden_crosses, death_crosses = crossovers.in_frame("sma", chart_1y)
 
         dates_1y = chart_1y["Date"].tolist()
         close_1y = chart_1y["Close"].tolist()
@@ -7,6 +7,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
 from components import format_large_number
+from tracing import traced
 
 # Chart styling constants
 CHART_FONT_COLOR = "#1A3C40"
@@ -14,8 +15,9 @@ CHART_AXIS_COLOR = "#37616A"
 LEGEND_FONT_COLOR = "#1A3C40"
 
 
+@traced()
 def render(selected, info, financials, all_stocks_df, filtered_df,
-           price_data, load_sector_peers_metrics,
+           price_data, load_sector_peers_metrics, load_sector_factor_index,
            selected_strategy="Volume+RSI", fund_score_p2=50, fund_details_p2=None, risk_profile="moderate"):
     """Render the Fundamentals tab content."""
     st.subheader("Fundamentals")
@@ -132,6 +134,7 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
         fund_sector_peers = filtered_df["ticker"].tolist()[:15]
 
     peers_data = load_sector_peers_metrics(tuple(fund_sector_peers + [selected]))
+    peer_index = load_sector_factor_index(tuple(fund_sector_peers + [selected]))
     peer_means = peers_data[peers_data["ticker"] != selected].drop(columns=["ticker"]).mean()
 
     if show_peer_comparison:
@@ -497,7 +500,8 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
                 "Metric": "P/E Ratio",
                 "Company": f"{company_pe:.1f}",
                 "Industry": f"{peer_means.get('pe'):.1f}",
-                "Assessment": favorable
+                "Assessment": favorable,
+                "Sector Pctile": _sector_pctile(peer_index, "pe", company_pe, higher_is_better=False),
             })
 
         # PEG Ratio (lower is better)
@@ -507,7 +511,8 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
                 "Metric": "PEG Ratio",
                 "Company": f"{company_peg:.2f}",
                 "Industry": f"{peer_means.get('peg'):.2f}",
-                "Assessment": favorable
+                "Assessment": favorable,
+                "Sector Pctile": _sector_pctile(peer_index, "peg", company_peg, higher_is_better=False),
             })
 
         # ROE (higher is better)
@@ -517,7 +522,8 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
                 "Metric": "ROE",
                 "Company": f"{company_roe*100:.1f}%",
                 "Industry": f"{peer_means.get('roe')*100:.1f}%",
-                "Assessment": favorable
+                "Assessment": favorable,
+                "Sector Pctile": _sector_pctile(peer_index, "roe", company_roe, higher_is_better=True),
             })
 
         # Net Margin (higher is better)
@@ -527,7 +533,8 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
                 "Metric": "Net Margin",
                 "Company": f"{company_margin*100:.1f}%",
                 "Industry": f"{peer_means.get('net_margin')*100:.1f}%",
-                "Assessment": favorable
+                "Assessment": favorable,
+                "Sector Pctile": _sector_pctile(peer_index, "net_margin", company_margin, higher_is_better=True),
             })
 
         # Revenue Growth (higher is better)
@@ -537,7 +544,8 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
                 "Metric": "Revenue Growth",
                 "Company": f"{company_growth*100:.1f}%",
                 "Industry": f"{peer_means.get('rev_growth')*100:.1f}%",
-                "Assessment": favorable
+                "Assessment": favorable,
+                "Sector Pctile": _sector_pctile(peer_index, "rev_growth", company_growth, higher_is_better=True),
             })
 
         # Debt/Equity (lower is generally better)
@@ -547,7 +555,8 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
                 "Metric": "Debt/Equity",
                 "Company": f"{company_de:.1f}",
                 "Industry": f"{peer_means.get('de'):.1f}",
-                "Assessment": favorable
+                "Assessment": favorable,
+                "Sector Pctile": _sector_pctile(peer_index, "de", company_de, higher_is_better=False),
             })
 
         if comparison_data:
@@ -572,6 +581,13 @@ def render(selected, info, financials, all_stocks_df, filtered_df,
             st.info("Insufficient data for comparison table.")
 
 
+def _sector_pctile(peer_index, column, value, higher_is_better=True):
+    """Percentile of value among sector peers for the comparison table."""
+    if peer_index is None:
+        return "N/A"
+    return f"{peer_index.rank(column, value, higher_is_better=higher_is_better):.0f}"
+
+
 def _find_column(df, possible_names):
     """Find first matching column from list of possible names."""
     for name in possible_names:
@@ -6,8 +6,10 @@ import datetime as dt
 import streamlit as st
 from models import classify_headline_sentiment
 from components import render_metric_card
+from tracing import traced
 
 
+@traced()
 def render(news_items):
     """Render the News & Sentiment tab content."""
     st.subheader("Recent News")
@@ -6,11 +6,13 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 from components import render_metric_card, render_compact_card, format_mcap
+from tracing import traced
 
 
+@traced()
 def render(selected, price_data, info, all_stocks_df, filtered_df, sector, industry,
            last_row, change_pct, sp500_set,
-           load_industry_market_caps, load_sector_peers_metrics):
+           load_industry_market_caps, load_sector_factor_index):
     """Render the Overview tab content."""
     st.subheader(f"{selected} Overview")
 
@@ -357,18 +359,20 @@ def render(selected, price_data, info, all_stocks_df, filtered_df, sector, indus
         val_sector_peers = all_stocks_df[all_stocks_df["sector"] == stock_sector[0]]["ticker"].tolist()[:20]
     else:
         val_sector_peers = filtered_df["ticker"].tolist()[:20]
-    peers = load_sector_peers_metrics(tuple(val_sector_peers))
-    peer_pe = peers["pe"].dropna().mean()
+    peer_index = load_sector_factor_index(tuple(val_sector_peers))
+    peer_pe = peer_index.mean("pe") if peer_index is not None else float("nan")
 
     if info.get("trailingPE") and peer_pe:
+        pe_pctile = peer_index.rank("pe", info.get("trailingPE"))
+        pe_rank_text = f" Its P/E is higher than {pe_pctile:.0f}% of sector peers."
         if info.get("trailingPE") > peer_pe:
             val_text = "Above Peers"
             val_status_type = "warning"
-            val_tip = f"Relative Valuation: This stock's P/E of {info.get('trailingPE'):.1f} is above the sector average of {peer_pe:.1f}. The premium may be justified by faster growth or stronger fundamentals."
+            val_tip = f"Relative Valuation: This stock's P/E of {info.get('trailingPE'):.1f} is above the sector average of {peer_pe:.1f}.{pe_rank_text} The premium may be justified by faster growth or stronger fundamentals."
         else:
             val_text = "Below Peers"
             val_status_type = "success"
-            val_tip = f"Relative Valuation: This stock's P/E of {info.get('trailingPE'):.1f} is below the sector average of {peer_pe:.1f}. This may represent a value opportunity or reflect company-specific concerns."
+            val_tip = f"Relative Valuation: This stock's P/E of {info.get('trailingPE'):.1f} is below the sector average of {peer_pe:.1f}.{pe_rank_text} This may represent a value opportunity or reflect company-specific concerns."
     else:
         val_text = "N/A"
         val_status_type = "neutral"
@@ -0,0 +1,113 @@
+# =============================================================================
+# SCREENER TAB - Rank the whole universe by composite, Paper 1 or Paper 2
+# =============================================================================
+
+import streamlit as st
+
+from tracing import traced
+
+RANK_LABELS = {
+    "Composite score": "composite",
+    "Paper 1 signal": "paper1",
+    "Paper 2 percentile": "paper2",
+}
+
+DISPLAY_COLUMNS = {
+    "ticker": "Ticker",
+    "name": "Company",
+    "sector": "Sector",
+    "close": "Close",
+    "composite_score": "Composite",
+    "recommendation": "Rec.",
+    "tech_score": "Technical",
+    "volume_score": "Volume",
+    "fund_score": "Fundamental",
+    "paper2_pctile": "P2 Pctile",
+    "paper1_signal": "P1 Signal",
+    "rsi": "RSI",
+    "monthly_return": "1M Return",
+    "last_date": "Last Bar",
+}
+
+
+@traced()
+def render(all_stocks_df, market_regime, risk_profile="moderate"):
+    """Render the universe Screener tab."""
+    st.subheader("Universe Screener")
+    st.caption(
+        "Scores every S&P 500 / NASDAQ-100 stock from the local price store in one pass "
+        f"and ranks them. Market regime: {market_regime}."
+    )
+
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    with col1:
+        universe_choice = st.radio(
+            "Universe", ["S&P 500 + NASDAQ-100", "S&P 500 only"], horizontal=True, key="screener_universe"
+        )
+    with col2:
+        rank_label = st.radio("Rank by", list(RANK_LABELS), horizontal=True, key="screener_rank")
+    with col3:
+        include_fundamentals = st.checkbox("Fundamentals", value=True, key="screener_fundamentals",
+                                           help="Score Paper 2 fundamentals (slower on a cold cache)")
+    with col4:
+        top_n = st.number_input("Show top", min_value=10, max_value=700, value=50, step=10, key="screener_top")
+
+    universe_df = all_stocks_df
+    if universe_choice == "S&P 500 only":
+        universe_df = all_stocks_df[all_stocks_df["is_sp500"]]
+
+    params = (universe_choice, include_fundamentals, risk_profile, market_regime)
+    if st.button("Run Screener", type="primary"):
+        from screener import run_screener
+
+        with st.spinner(f"Scoring {len(universe_df)} stocks..."):
+            st.session_state["screener_results"] = run_screener(
+                universe_df,
+                include_fundamentals=include_fundamentals,
+                risk_profile=risk_profile,
+                market_regime=market_regime,
+            )
+            st.session_state["screener_params"] = params
+
+    results = st.session_state.get("screener_results")
+    if results is None:
+        st.info("Click 'Run Screener' to score and rank the universe.")
+        return
+    if st.session_state.get("screener_params") != params:
+        st.caption("Settings changed since the last run; click 'Run Screener' to refresh.")
+
+    from screener import rank_results
+
+    ranked = rank_results(results, RANK_LABELS[rank_label])
+
+    sectors = sorted(ranked["sector"].dropna().unique()) if "sector" in ranked.columns else []
+    chosen_sectors = st.multiselect("Sectors", sectors, key="screener_sectors")
+    if chosen_sectors:
+        ranked = ranked[ranked["sector"].isin(chosen_sectors)]
+
+    signal_counts = ranked["paper1_signal"].value_counts()
+    mcol1, mcol2, mcol3, mcol4 = st.columns(4)
+    mcol1.metric("Stocks scored", len(ranked))
+    mcol2.metric("P1 BUY", int(signal_counts.get("BUY", 0)))
+    mcol3.metric("P1 SELL", int(signal_counts.get("SELL", 0)))
+    mcol4.metric("Median composite", f"{ranked['composite_score'].median():.0f}" if len(ranked) else "N/A")
+
+    shown = ranked.head(int(top_n))
+    shown = shown[[c for c in DISPLAY_COLUMNS if c in shown.columns]].rename(columns=DISPLAY_COLUMNS)
+    st.dataframe(
+        shown.style.format({
+            "Close": "${:,.2f}",
+            "Composite": "{:.1f}",
+            "Fundamental": "{:.1f}",
+            "P2 Pctile": "{:.0f}",
+            "RSI": "{:.1f}",
+            "1M Return": "{:+.1%}",
+        }, na_rep="-"),
+        use_container_width=True,
+    )
+    st.download_button(
+        "Download CSV",
+        ranked.to_csv().encode("utf-8"),
+        file_name="screener.csv",
+        mime="text/csv",
+    )
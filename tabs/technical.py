@@ -7,6 +7,9 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 from components import get_status_color
+from downsample import CHART_WIDTH_PX, bar_widths, chart_rows
+from indicators import CrossoverIndex
+from tracing import traced
 
 # Chart styling constants
 CHART_FONT_COLOR = "#1A3C40"
@@ -14,63 +17,10 @@ CHART_AXIS_COLOR = "#37616A"
 LEGEND_FONT_COLOR = "#1A3C40"
 
 
-def find_crossovers(df):
-    """Find golden cross and death cross points in the data (SMA50/200)."""
-    if "SMA50" not in df.columns or "SMA200" not in df.columns:
-        return [], []
-
-    golden_crosses = []
-    death_crosses = []
-
-    sma50 = df["SMA50"].values
-    sma200 = df["SMA200"].values
-    dates = df["Date"].values
-    prices = df["Close"].values
-
-    for i in range(1, len(df)):
-        if pd.isna(sma50[i]) or pd.isna(sma200[i]) or pd.isna(sma50[i-1]) or pd.isna(sma200[i-1]):
-            continue
-
-        # Golden Cross: SMA50 crosses above SMA200
-        if sma50[i-1] <= sma200[i-1] and sma50[i] > sma200[i]:
-            golden_crosses.append((dates[i], prices[i], sma50[i]))
-
-        # Death Cross: SMA50 crosses below SMA200
-        if sma50[i-1] >= sma200[i-1] and sma50[i] < sma200[i]:
-            death_crosses.append((dates[i], prices[i], sma50[i]))
-
-    return golden_crosses, death_crosses
-
-
-def find_ema_crossovers(df):
-    """Find EMA20/50 golden and death cross points."""
-    if "EMA20" not in df.columns or "EMA50" not in df.columns:
-        return [], []
-
-    golden = []
-    death = []
-
-    ema20 = df["EMA20"].values
-    ema50 = df["EMA50"].values
-    dates = df["Date"].values
-    prices = df["Close"].values
-
-    for i in range(1, len(df)):
-        if pd.isna(ema20[i]) or pd.isna(ema50[i]) or pd.isna(ema20[i-1]) or pd.isna(ema50[i-1]):
-            continue
-
-        if ema20[i-1] <= ema50[i-1] and ema20[i] > ema50[i]:
-            golden.append((dates[i], prices[i], ema20[i]))
-
-        if ema20[i-1] >= ema50[i-1] and ema20[i] < ema50[i]:
-            death.append((dates[i], prices[i], ema20[i]))
-
-    return golden, death
-
-
+@traced()
 def render(selected, price_data, info, tech_score, tech_details, last_row,
-           selected_strategy="Volume+RSI", volume_score=0, volume_details=None):
-    """Render the Technical Indicators tab content."""
+           selected_strategy="Volume+RSI", volume_score=0, volume_details=None, crossovers=None):
+    """Render the Technical Indicators tab content (crossovers: CrossoverIndex of price_data)."""
     st.subheader("Technical Analysis")
 
     # =========================================================================
@@ -98,7 +48,10 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
         chart_data = price_data.copy()
         period_label = "All Time"
 
-    st.caption(f"Showing {period_label} ({len(chart_data)} days)")
+    caption = f"Showing {period_label} ({len(chart_data)} days)"
+    if len(chart_data) > CHART_WIDTH_PX:
+        caption += " - long series are thinned to the chart width, keeping peaks, troughs and crossovers"
+    st.caption(caption)
 
     # Get current values
     current_price = price_data["Close"].iloc[-1]
@@ -112,15 +65,18 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
     # =========================================================================
     st.markdown("### Trend")
 
-    # Find crossovers in the chart data
-    golden_crosses, death_crosses = find_crossovers(chart_data)
+    # Crossovers in the chart's date range
+    if crossovers is None:
+        crossovers = CrossoverIndex(price_data)
+    golden_crosses, death_crosses = crossovers.in_frame("sma", chart_data)
 
     # Create trend chart
     trend_fig = go.Figure()
 
-    # Get x and y data
-    dates = chart_data["Date"].tolist()
-    close_prices = chart_data["Close"].tolist()
+    # Get x and y data (thinned to the chart width for long periods)
+    trend_data = chart_rows(chart_data, "Close", keep_dates=[d for d, _, _ in golden_crosses + death_crosses])
+    dates = trend_data["Date"].tolist()
+    close_prices = trend_data["Close"].tolist()
 
     # Add Price line (most important - add last so it's on top)
     trend_fig.add_trace(go.Scatter(
@@ -133,7 +89,7 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
 
     # Add SMA 50 if available
     if "SMA50" in chart_data.columns:
-        sma50_data = chart_data["SMA50"].tolist()
+        sma50_data = trend_data["SMA50"].tolist()
         trend_fig.add_trace(go.Scatter(
             x=dates,
             y=sma50_data,
@@ -145,7 +101,7 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
 
     # Add SMA 200 if available
     if "SMA200" in chart_data.columns:
-        sma200_data = chart_data["SMA200"].tolist()
+        sma200_data = trend_data["SMA200"].tolist()
         trend_fig.add_trace(go.Scatter(
             x=dates,
             y=sma200_data,
@@ -289,8 +245,9 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
         rsi_fig.add_hrect(y0=70, y1=100, fillcolor="rgba(239, 68, 68, 0.08)", line_width=0)
         rsi_fig.add_hrect(y0=0, y1=30, fillcolor="rgba(34, 197, 94, 0.08)", line_width=0)
 
-        rsi_dates = chart_data["Date"].tolist()
-        rsi_values = chart_data["RSI"].tolist()
+        rsi_data = chart_rows(chart_data, "RSI")
+        rsi_dates = rsi_data["Date"].tolist()
+        rsi_values = rsi_data["RSI"].tolist()
 
         rsi_fig.add_trace(go.Scatter(
             x=rsi_dates,
@@ -374,21 +331,23 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
     # Create MACD chart
     macd_fig = go.Figure()
 
-    macd_dates = chart_data["Date"].tolist()
+    macd_data = chart_rows(chart_data, "MACD_HIST")
+    macd_dates = macd_data["Date"].tolist()
 
     if "MACD_HIST" in chart_data.columns:
-        hist_values = chart_data["MACD_HIST"].tolist()
+        hist_values = macd_data["MACD_HIST"].tolist()
         colors = ['#10B981' if (v is not None and v >= 0) else '#F43F5E' for v in hist_values]
         macd_fig.add_trace(go.Bar(
             x=macd_dates,
             y=hist_values,
             name="Histogram",
             marker_color=colors,
-            opacity=0.6
+            opacity=0.6,
+            width=bar_widths(macd_data, len(chart_data)),
         ))
 
     if "MACD" in chart_data.columns:
-        macd_values = chart_data["MACD"].tolist()
+        macd_values = macd_data["MACD"].tolist()
         macd_fig.add_trace(go.Scatter(
             x=macd_dates,
             y=macd_values,
@@ -397,7 +356,7 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
         ))
 
     if "MACD_SIGNAL" in chart_data.columns:
-        signal_values = chart_data["MACD_SIGNAL"].tolist()
+        signal_values = macd_data["MACD_SIGNAL"].tolist()
         macd_fig.add_trace(go.Scatter(
             x=macd_dates,
             y=signal_values,
@@ -490,14 +449,16 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
         vol_fig = go.Figure()
 
         if "Volume" in chart_data.columns:
-            vol_dates = chart_data["Date"].tolist()
-            vol_values = chart_data["Volume"].tolist()
+            vol_data = chart_rows(chart_data, "Volume")
+            vol_dates = vol_data["Date"].tolist()
+            vol_values = vol_data["Volume"].tolist()
 
-            # Color bars by price direction
+            # Color bars by price direction (against the previous day, not the previous plotted bar)
             close_vals = chart_data["Close"].values
             prev_close = np.roll(close_vals, 1)
             prev_close[0] = close_vals[0]
-            vol_colors = ['#10B981' if c >= p else '#F43F5E' for c, p in zip(close_vals, prev_close)]
+            up_day = pd.Series(close_vals >= prev_close, index=chart_data.index).loc[vol_data.index]
+            vol_colors = ['#10B981' if up else '#F43F5E' for up in up_day]
 
             vol_fig.add_trace(go.Bar(
                 x=vol_dates,
@@ -505,13 +466,14 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
                 name="Volume",
                 marker_color=vol_colors,
                 opacity=0.6,
+                width=bar_widths(vol_data, len(chart_data)),
             ))
 
             # Volume SMA 20
             if "Volume_SMA20" in chart_data.columns:
                 vol_fig.add_trace(go.Scatter(
                     x=vol_dates,
-                    y=chart_data["Volume_SMA20"].tolist(),
+                    y=vol_data["Volume_SMA20"].tolist(),
                     name="Vol SMA 20",
                     line=dict(color="#0097A7", width=2),
                     mode='lines',
@@ -521,7 +483,7 @@ def render(selected, price_data, info, tech_score, tech_details, last_row,
             if "Volume_SMA50" in chart_data.columns:
                 vol_fig.add_trace(go.Scatter(
                     x=vol_dates,
-                    y=chart_data["Volume_SMA50"].tolist(),
+                    y=vol_data["Volume_SMA50"].tolist(),
                     name="Vol SMA 50",
                     line=dict(color="#FF6B6B", width=2),
                     mode='lines',
@@ -586,14 +548,15 @@ Volume analysis confirms price movements by measuring participation:
         st.markdown("---")
         st.markdown("### EMA Crossover (Paper 1)")
 
-        ema_golden, ema_death = find_ema_crossovers(chart_data)
+        ema_golden, ema_death = crossovers.in_frame("ema", chart_data)
+        ema_data = chart_rows(chart_data, "Close", keep_dates=[d for d, _, _ in ema_golden + ema_death])
 
         ema_fig = go.Figure()
 
         # Price line
         ema_fig.add_trace(go.Scatter(
-            x=dates,
-            y=close_prices,
+            x=ema_data["Date"].tolist(),
+            y=ema_data["Close"].tolist(),
             name="Price",
             line=dict(color="#1A3C40", width=2.5),
             mode='lines'
@@ -602,8 +565,8 @@ Volume analysis confirms price movements by measuring participation:
         # EMA 20
         if "EMA20" in chart_data.columns:
             ema_fig.add_trace(go.Scatter(
-                x=dates,
-                y=chart_data["EMA20"].tolist(),
+                x=ema_data["Date"].tolist(),
+                y=ema_data["EMA20"].tolist(),
                 name="EMA 20",
                 line=dict(color="#0097A7", width=2),
                 mode='lines',
@@ -613,8 +576,8 @@ Volume analysis confirms price movements by measuring participation:
         # EMA 50
         if "EMA50" in chart_data.columns:
             ema_fig.add_trace(go.Scatter(
-                x=dates,
-                y=chart_data["EMA50"].tolist(),
+                x=ema_data["Date"].tolist(),
+                y=ema_data["EMA50"].tolist(),
                 name="EMA 50",
                 line=dict(color="#FF6B6B", width=2),
                 mode='lines',
@@ -690,8 +653,9 @@ Volume analysis confirms price movements by measuring participation:
         if "ATV_Slope" in chart_data.columns:
             atv_fig = go.Figure()
 
-            atv_dates = chart_data["Date"].tolist()
-            atv_values = chart_data["ATV_Slope"].tolist()
+            atv_data = chart_rows(chart_data, "ATV_Slope")
+            atv_dates = atv_data["Date"].tolist()
+            atv_values = atv_data["ATV_Slope"].tolist()
 
             # Color by positive/negative
             atv_colors = ['#10B981' if (v is not None and not pd.isna(v) and v >= 0) else '#F43F5E' for v in atv_values]
@@ -702,6 +666,7 @@ Volume analysis confirms price movements by measuring participation:
                 name="ATV Slope",
                 marker_color=atv_colors,
                 opacity=0.7,
+                width=bar_widths(atv_data, len(chart_data)),
             ))
 
             atv_fig.add_hline(y=0, line=dict(color="#9CA3AF", dash="dot", width=1))
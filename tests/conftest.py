@@ -0,0 +1,34 @@
+# =============================================================================
+# CONFTEST.PY - Shared fixtures for the test suite
+# =============================================================================
+# The app modules live at the repository root; tests import them directly.
+# Price frames are synthetic random walks, so no test touches the network.
+# =============================================================================
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_prices(n=600, seed=0, start="2015-01-02"):
+    """Daily OHLCV frame with a Date column, shaped like app.load_history() output."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    return pd.DataFrame({
+        "Date": pd.bdate_range(start, periods=n),
+        "Open": close * (1 + rng.normal(0, 0.005, n)),
+        "High": close * (1 + rng.uniform(0, 0.02, n)),
+        "Low": close * (1 - rng.uniform(0, 0.02, n)),
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, n).astype(float),
+    })
+
+
+@pytest.fixture
+def make_prices():
+    return synthetic_prices
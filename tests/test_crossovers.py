@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from indicators import CROSSOVER_PAIRS, CrossoverIndex, compute_indicators
+
+
+def loop_crossovers(df, fast, slow):
+    """Per-row scan the Technical and Dashboard tabs used before CrossoverIndex."""
+    golden, death = [], []
+    a, b, dates, prices = df[fast].values, df[slow].values, df["Date"].values, df["Close"].values
+    for i in range(1, len(df)):
+        if pd.isna(a[i]) or pd.isna(b[i]) or pd.isna(a[i - 1]) or pd.isna(b[i - 1]):
+            continue
+        if a[i - 1] <= b[i - 1] and a[i] > b[i]:
+            golden.append((dates[i], prices[i], a[i]))
+        if a[i - 1] >= b[i - 1] and a[i] < b[i]:
+            death.append((dates[i], prices[i], a[i]))
+    return golden, death
+
+
+@pytest.fixture(params=[None, "America/New_York"])
+def indicator_frame(request, make_prices):
+    frame = compute_indicators(make_prices(2500, seed=11))
+    if request.param:
+        frame["Date"] = frame["Date"].dt.tz_localize(request.param)
+    return frame
+
+
+@pytest.mark.parametrize("pair", list(CROSSOVER_PAIRS))
+def test_full_history_matches_loop(indicator_frame, pair):
+    index = CrossoverIndex(indicator_frame)
+    golden, death = index.between(pair)
+    expected_golden, expected_death = loop_crossovers(indicator_frame, *CROSSOVER_PAIRS[pair])
+    assert golden and death
+    assert golden == expected_golden
+    assert death == expected_death
+
+
+@pytest.mark.parametrize("pair", list(CROSSOVER_PAIRS))
+@pytest.mark.parametrize("bars", [63, 252, 1260])
+def test_chart_tail_matches_loop(indicator_frame, pair, bars):
+    index = CrossoverIndex(indicator_frame)
+    chart = indicator_frame.tail(bars)
+    golden, death = index.in_frame(pair, chart)
+
+    # The loop could not see a cross on the chart's first bar (it had no previous bar)
+    first = chart["Date"].values[0]
+    expected_golden, expected_death = loop_crossovers(chart, *CROSSOVER_PAIRS[pair])
+    assert [e for e in golden if e[0] != first] == expected_golden
+    assert [e for e in death if e[0] != first] == expected_death
+
+
+def test_empty_chart_and_missing_columns(indicator_frame):
+    index = CrossoverIndex(indicator_frame)
+    assert index.in_frame("sma", indicator_frame.iloc[0:0]) == ([], [])
+    bare = CrossoverIndex(indicator_frame[["Date", "Close"]])
+    assert len(bare) == 0
+    assert bare.between("sma") == ([], [])
@@ -0,0 +1,42 @@
+import pytest
+
+import tracing
+from fetch_pool import fetch_many
+
+
+@pytest.fixture
+def trace():
+    tracing.begin("test")
+    yield
+    tracing.end()
+
+
+def test_results_come_back_in_key_order_with_failures_isolated():
+    def fetch(key):
+        if key == 3:
+            raise ValueError(key)
+        return key * 10
+
+    assert fetch_many(range(6), fetch, retries=0) == [0, 10, 20, None, 40, 50]
+
+
+def test_worker_bytes_are_credited_to_the_calling_span(trace):
+    def fetch(key):
+        tracing.add_bytes(100 + key)
+        if key == 2:
+            raise ValueError(key)
+        return key
+
+    with tracing.span("outer") as outer:
+        with tracing.span("fetch") as inner:
+            fetch_many(range(5), fetch, retries=1, backoff=0)
+
+    # Key 2 fails twice and counts both attempts
+    expected = sum(100 + key for key in range(5)) + 102
+    assert inner["bytes"] == expected
+    assert outer["bytes"] == expected
+
+
+def test_worker_bytes_are_dropped_without_a_trace():
+    fetch_many(range(3), lambda key: tracing.add_bytes(10))
+    assert tracing.current_trace() is None
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from fundamentals_store import FundamentalsStore
+
+
+class FakeInfo:
+    """fetcher(ticker) -> info dict, counting calls; tickers in `down` return {}."""
+
+    def __init__(self):
+        self.calls = []
+        self.down = set()
+        self.version = 1
+
+    def __call__(self, ticker):
+        self.calls.append(ticker)
+        if ticker in self.down:
+            return {}
+        return {"symbol": ticker, "version": self.version}
+
+
+@pytest.fixture
+def fetcher():
+    return FakeInfo()
+
+
+@pytest.fixture
+def store(tmp_path, fetcher):
+    return FundamentalsStore(path=str(tmp_path / "fundamentals.sqlite"), fetcher=fetcher, max_age=3600)
+
+
+def test_misses_are_fetched_once_and_returned_in_order(store, fetcher):
+    infos = store.get_many(["B", "A", "B"])
+    assert [info["symbol"] for info in infos] == ["B", "A", "B"]
+    assert sorted(fetcher.calls) == ["A", "B"]
+
+    store.get_many(["A", "B"])
+    assert sorted(fetcher.calls) == ["A", "B"]
+
+
+def test_snapshots_are_shared_across_store_instances(tmp_path, store, fetcher):
+    store.get("A")
+    other = FundamentalsStore(path=store.path, fetcher=fetcher, max_age=3600)
+    assert other.get("A")["symbol"] == "A"
+    assert fetcher.calls == ["A"]
+
+
+def test_stale_snapshots_are_refetched(store, fetcher):
+    store.put_many({"A": {"symbol": "A", "version": 0}}, fetched_at=time.time() - 7200)
+    assert store.get("A")["version"] == 1
+    assert fetcher.calls == ["A"]
+
+    # A per-call max_age overrides the store's window
+    fetcher.version = 2
+    assert store.get("A", max_age=10 ** 9)["version"] == 1
+    assert store.get("A", max_age=0)["version"] == 2
+
+
+def test_failed_refetch_serves_the_stale_snapshot(store, fetcher):
+    store.put_many({"A": {"symbol": "A", "version": 0}}, fetched_at=time.time() - 7200)
+    fetcher.down.add("A")
+    assert store.get("A")["version"] == 0
+    # The stale snapshot keeps its old timestamp, so the next call retries
+    store.get("A")
+    assert fetcher.calls == ["A", "A"]
+
+
+def test_never_fetched_failure_is_none(store, fetcher):
+    fetcher.down.add("X")
+    assert store.get_many(["X"]) == [None]
+    assert store.get("X") == {}
+
+
+def test_invalidate_forces_a_refetch(store, fetcher):
+    store.get_many(["A", "B"])
+    store.invalidate(["A"])
+    assert set(store.read_many(["A", "B"])) == {"B"}
+    store.get_many(["A", "B"])
+    assert sorted(fetcher.calls) == ["A", "A", "B"]
+
+    store.invalidate()
+    assert store.read_many(["A", "B"]) == {}
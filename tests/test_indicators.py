@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import SLOPE_WINDOW, IndicatorState, compute_indicators, rolling_slope
+
+
+def assert_frames_close(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    assert actual.index.equals(expected.index)
+    for column in expected.columns:
+        if pd.api.types.is_numeric_dtype(expected[column]):
+            np.testing.assert_allclose(
+                actual[column].to_numpy(dtype=np.float64), expected[column].to_numpy(dtype=np.float64),
+                rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column,
+            )
+        else:
+            assert actual[column].equals(expected[column]), column
+
+
+def polyfit_slope(values, window=SLOPE_WINDOW):
+    """The original Volume_Slope/ATV_Slope computation."""
+    x = np.arange(window)
+    return pd.Series(values).rolling(window).apply(lambda y: np.polyfit(x, y, 1)[0], raw=True).to_numpy()
+
+
+def near_zero_trends(level=3e7, seed=0):
+    """Plateaus at a volume-like level joined by trends of either sign, down to 1e-12 of the level."""
+    rng = np.random.default_rng(seed)
+    pieces, value = [], level
+    for step in rng.choice([-1, 1], 30) * level * 10.0 ** rng.uniform(-12, -3, 30):
+        pieces.append(np.full(rng.integers(3, 15), value))
+        ramp = value + step * np.arange(1, rng.integers(3, 15))
+        pieces.append(ramp)
+        value = ramp[-1]
+    return np.concatenate(pieces)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_rolling_slope_matches_polyfit(make_prices, seed):
+    frame = compute_indicators(make_prices(1500, seed=seed))
+    series = [frame["Volume_SMA20"].to_numpy(), frame["ATV_20"].to_numpy(), near_zero_trends(seed=seed)]
+    for values in series:
+        actual, expected = rolling_slope(values), polyfit_slope(values)
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+
+        # polyfit's own rounding noise grows with the level of the window
+        level = pd.Series(np.abs(values)).rolling(SLOPE_WINDOW).max().to_numpy()
+        noise = 64 * np.finfo(np.float64).eps * level
+        valid = ~np.isnan(expected)
+        assert np.all(np.abs(actual - expected)[valid] <= (1e-9 * np.abs(expected) + noise)[valid])
+
+        # The sign gates Paper 1 signals: it must agree wherever polyfit's slope is above its noise
+        signed = valid & (np.abs(expected) > noise)
+        assert signed.sum() > 0
+        np.testing.assert_array_equal(np.sign(actual[signed]), np.sign(expected[signed]))
+
+
+def test_rolling_slope_is_zero_on_flat_windows():
+    values = np.r_[np.full(12, 3e7), np.full(12, 1.23456789e9), np.full(12, 0.1)]
+    slope = rolling_slope(values)
+    flat = np.r_[np.arange(9, 12), np.arange(21, 24), np.arange(33, 36)]
+    assert np.all(slope[flat] == 0)
+
+
+@pytest.mark.parametrize("split", [0, 1, 15, 250, 1190])
+def test_update_matches_full_compute(make_prices, split):
+    prices = make_prices(1200, seed=split)
+    state = IndicatorState(prices.iloc[:split])
+
+    position = split
+    for step in (1, 7, 1, 40, len(prices)):
+        rows = state.update(prices.iloc[position:position + step])
+        assert len(rows) == len(prices.iloc[position:position + step])
+        position += step
+
+    assert len(state) == len(prices)
+    assert_frames_close(state.frame, compute_indicators(prices))
+
+
+def test_update_returns_only_new_rows(make_prices):
+    prices = make_prices(400, seed=1)
+    state = IndicatorState(prices.iloc[:399])
+    rows = state.update(prices.iloc[399:])
+    assert_frames_close(rows, compute_indicators(prices).iloc[399:])
+    assert len(state.update(prices.iloc[0:0])) == 0
+
+
+def test_extends_detects_appended_and_rewritten_history(make_prices):
+    prices = make_prices(300, seed=2)
+    state = IndicatorState(prices.iloc[:250])
+    assert state.extends(prices)
+    assert not state.extends(prices.iloc[1:])
+
+    rebased = prices.copy()
+    rebased[["Open", "High", "Low", "Close"]] *= 0.5
+    assert not state.extends(rebased)
@@ -0,0 +1,43 @@
+import os
+
+from model_registry import ModelRegistry
+
+
+def write_bytes(n):
+    def save(path):
+        with open(path, "wb") as fh:
+            fh.write(b"\0" * n)
+    return save
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    registry = ModelRegistry(str(tmp_path), max_models=2)
+    registry.register("a", write_bytes(10), {})
+    registry.register("b", write_bytes(10), {})
+    registry.touch("a")
+    registry.register("c", write_bytes(10), {})
+
+    assert registry.get("b") is None
+    assert {meta["key"] for meta in registry.entries()} == {"a", "c"}
+
+
+def test_size_cap_keeps_the_new_entry(tmp_path):
+    registry = ModelRegistry(str(tmp_path), max_bytes=25)
+    registry.register("a", write_bytes(10), {})
+    registry.register("b", write_bytes(10), {})
+    registry.register("c", write_bytes(10), {})
+
+    assert [meta["key"] for meta in registry.entries()] == ["c", "b"]
+
+
+def test_files_without_a_sidecar_are_left_alone(tmp_path):
+    legacy = tmp_path / "ppo_4d6048956d6e.zip"
+    legacy.write_bytes(b"\0" * 100)
+    os.utime(legacy, (0, 0))
+
+    registry = ModelRegistry(str(tmp_path), max_models=1, max_bytes=50)
+    registry.register("a", write_bytes(10), {})
+    registry.register("b", write_bytes(10), {})
+
+    assert legacy.exists()
+    assert [meta["key"] for meta in registry.entries()] == ["b"]
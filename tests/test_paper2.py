@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fetch_pool import PEER_METRIC_FIELDS
+from models import (
+    INTERACTION_COEFFICIENTS,
+    MOMENTUM_SCORE_BANDS,
+    RISK_PROFILE_WEIGHTS_P2,
+    SectorFactorIndex,
+    calculate_fundamental_score_paper2,
+    calculate_fundamental_score_paper2_series,
+    paper2_factor_scores,
+    paper2_scores_batch,
+)
+
+
+def reference_percentile_rank(value, values, higher_is_better=True):
+    """List-scanning percentile rank that SectorFactorIndex replaced."""
+    valid = [v for v in values if v is not None and not pd.isna(v)]
+    if not valid or value is None or pd.isna(value):
+        return 50
+    rank = sum(1 for v in valid if v <= value) / len(valid) * 100
+    if not higher_is_better:
+        rank = 100 - rank
+    return rank
+
+
+def random_value(rng, missing=0.15):
+    """Small-grid value (so ties are common), None or NaN."""
+    draw = rng.random()
+    if draw < missing / 2:
+        return None
+    if draw < missing:
+        return np.nan
+    return float(rng.integers(-5, 6)) / 4
+
+
+def random_peers(rng, n_peers):
+    return pd.DataFrame([
+        {"ticker": f"P{i}", **{column: random_value(rng) for column in PEER_METRIC_FIELDS}}
+        for i in range(n_peers)
+    ])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rank_matches_list_scan(seed):
+    rng = np.random.default_rng(seed)
+    peers = random_peers(rng, int(rng.integers(1, 15)))
+    index = SectorFactorIndex(peers)
+
+    for column in PEER_METRIC_FIELDS:
+        probes = [random_value(rng) for _ in range(25)]
+        for higher_is_better in (True, False):
+            expected = [reference_percentile_rank(v, peers[column].tolist(), higher_is_better) for v in probes]
+            assert [index.rank(column, v, higher_is_better) for v in probes] == expected
+            ranked = index.rank_many(column, [np.nan if v is None else v for v in probes], higher_is_better)
+            assert ranked.tolist() == [float(e) for e in expected]
+
+
+def test_with_member_equals_rebuilt_index():
+    rng = np.random.default_rng(7)
+    peers = random_peers(rng, 9)
+    row = {"ticker": "NEW", **{column: random_value(rng) for column in PEER_METRIC_FIELDS}}
+
+    extended = SectorFactorIndex(peers).with_member(row)
+    rebuilt = SectorFactorIndex(pd.concat([peers, pd.DataFrame([row])], ignore_index=True))
+
+    assert len(extended) == len(rebuilt)
+    assert extended.fingerprint() == rebuilt.fingerprint()
+
+
+def test_empty_peers_and_missing_columns_rank_50():
+    assert SectorFactorIndex.from_peers(pd.DataFrame()) is None
+    index = SectorFactorIndex(pd.DataFrame({"ticker": ["A"], "roe": [None]}))
+    assert index.rank("roe", 0.3) == 50
+    assert index.rank("beta", 1.0) == 50
+    assert index.rank_many("roe", [0.1, np.nan]).tolist() == [50.0, 50.0]
+
+
+# -----------------------------------------------------------------------------
+# Scoring
+# -----------------------------------------------------------------------------
+
+PROFILES = ("conservative", "moderate", "aggressive")
+
+
+def reference_score(scores, risk_profile):
+    """Weighted total and interaction terms written out per factor, as the scalar scorer had them."""
+    weights = RISK_PROFILE_WEIGHTS_P2[risk_profile]
+    pb, roe, momentum, beta, mcap = (scores[f"{f}_pctile"] for f in ("pb", "roe", "momentum", "beta", "market_cap"))
+    pb_available = not scores.get("pb_unavailable", False)
+    if pb_available:
+        total = (pb * weights["pb"] + roe * weights["roe"] + momentum * weights["momentum"]
+                 + beta * weights["beta"] + mcap * weights["market_cap"])
+    else:
+        remaining = {k: v for k, v in weights.items() if k != "pb"}
+        r_total = sum(remaining.values())
+        total = (roe * (remaining["roe"] / r_total) + momentum * (remaining["momentum"] / r_total)
+                 + beta * (remaining["beta"] / r_total) + mcap * (remaining["market_cap"] / r_total))
+
+    bonus = 0
+    details = {}
+    if scores["used_percentile"]:
+        norm = {"pb": pb / 100.0, "roe": roe / 100.0, "momentum": momentum / 100.0,
+                "beta": beta / 100.0, "market_cap": mcap / 100.0}
+        for factors, coeff in INTERACTION_COEFFICIENTS.items():
+            if not pb_available and "pb" in factors:
+                continue
+            product = 1.0
+            for f in factors:
+                product *= norm[f]
+            bonus += product * coeff
+            details["+".join(factors)] = round(product * coeff, 3)
+    return min(100, max(0, total + bonus)), round(bonus, 2), details
+
+
+def random_info(rng):
+    info = {
+        "priceToBook": None if rng.random() < 0.3 else float(rng.uniform(0.3, 8)),
+        "returnOnEquity": random_value(rng),
+        "beta": random_value(rng),
+        "marketCap": None if rng.random() < 0.2 else float(rng.uniform(1e8, 1e12)),
+        "revenueGrowth": random_value(rng),
+    }
+    if info["priceToBook"] is None and rng.random() < 0.5:
+        info.update(bookValue=float(rng.uniform(1, 50)), sharesOutstanding=float(rng.uniform(1e7, 1e9)))
+    return info
+
+
+def scoring_peers(rng):
+    peers = random_peers(rng, int(rng.integers(0, 12)))
+    if len(peers):
+        peers["marketCap"] = rng.uniform(1e8, 1e12, len(peers))
+        peers["priceToBook"] = rng.uniform(0.3, 8, len(peers))
+    return peers
+
+
+@pytest.mark.parametrize("seed", range(400))
+def test_scalar_score_matches_reference(seed):
+    rng = np.random.default_rng(1000 + seed)
+    info = random_info(rng)
+    peers = scoring_peers(rng)
+    risk_profile = PROFILES[seed % 3]
+    price_data = None
+    if rng.random() < 0.5:
+        price_data = pd.DataFrame({"Monthly_Return": [0.0, random_value(rng)]})
+
+    total, scores = calculate_fundamental_score_paper2(info, peers, risk_profile, price_data=price_data)
+    expected_total, expected_bonus, expected_details = reference_score(scores, risk_profile)
+
+    assert total == expected_total
+    assert scores["interaction_bonus"] == expected_bonus
+    assert scores.get("interaction_details", {}) == expected_details
+
+    # Peer-relative factors are the list-scan percentiles
+    if scores["used_percentile"]:
+        assert scores["roe_pctile"] == reference_percentile_rank(info["returnOnEquity"], peers["roe"].tolist())
+        assert scores["beta_pctile"] == reference_percentile_rank(info["beta"], peers["beta"].tolist(), False)
+
+
+def test_batch_rows_match_scalar_scores():
+    rng = np.random.default_rng(5)
+    rows, pb_flags, percentile_flags, expected = [], [], [], []
+    for _ in range(200):
+        scores = paper2_factor_scores(random_info(rng), scoring_peers(rng))
+        rows.append([scores[f"{f}_pctile"] for f in ("pb", "roe", "momentum", "beta", "market_cap")])
+        pb_flags.append(not scores.get("pb_unavailable", False))
+        percentile_flags.append(scores["used_percentile"])
+        expected.append(scores)
+
+    for risk_profile in PROFILES:
+        batch = paper2_scores_batch(rows, pb_available=pb_flags, use_percentile=percentile_flags,
+                                    risk_profile=risk_profile)
+        for i, scores in enumerate(expected):
+            total, bonus, _ = reference_score(scores, risk_profile)
+            assert batch["total"][i] == total
+            assert round(float(batch["interaction_bonus"][i]), 2) == bonus
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_series_rows_match_scalar_on_prefixes(seed):
+    rng = np.random.default_rng(seed)
+    info = random_info(rng)
+    peers = scoring_peers(rng)
+    monthly = [random_value(rng, missing=0.3) for _ in range(40)]
+    price_data = pd.DataFrame({"Monthly_Return": [np.nan if v is None else v for v in monthly]})
+
+    totals, _ = calculate_fundamental_score_paper2_series(info, peers, PROFILES[seed % 3], price_data=price_data)
+    for i in range(len(price_data)):
+        total, _ = calculate_fundamental_score_paper2(info, peers, PROFILES[seed % 3],
+                                                      price_data=price_data.iloc[:i + 1])
+        assert totals[i] == total
+
+
+def test_series_momentum_bands_match_scalar_without_peers():
+    # Absolute momentum scoring: every band edge, a hair either side, and NaN
+    edges = [threshold for threshold, _ in MOMENTUM_SCORE_BANDS]
+    monthly = sorted({e + d for e in edges for d in (-1e-9, 0.0, 1e-9)} | {-0.5, 0.5}) + [np.nan]
+    price_data = pd.DataFrame({"Monthly_Return": monthly})
+    info = random_info(np.random.default_rng(0))
+
+    totals, scores = calculate_fundamental_score_paper2_series(info, None, "moderate", price_data=price_data)
+    for i in range(len(price_data)):
+        total, expected = calculate_fundamental_score_paper2(info, None, "moderate", price_data=price_data.iloc[[i]])
+        assert scores["momentum_pctile"][i] == expected["momentum_pctile"]
+        assert totals[i] == total
+
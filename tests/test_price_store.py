@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from price_store import PriceStore
+
+
+class FakeFetcher:
+    """fetcher(ticker, start=None) over an in-memory history, recording every call."""
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def __call__(self, ticker, start=None):
+        self.calls.append((ticker, start))
+        if start is None:
+            return self.history.copy()
+        return self.history[self.history.index >= pd.Timestamp(start)].copy()
+
+
+@pytest.fixture
+def history(make_prices):
+    frame = make_prices(300, seed=3).set_index("Date")
+    frame.index = frame.index.as_unit("ns")
+    frame["Volume"] = frame["Volume"].astype("int64")
+    return frame
+
+
+def test_first_refresh_fetches_full_history_and_round_trips(tmp_path, history):
+    fetcher = FakeFetcher(history)
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher)
+
+    refreshed = store.refresh("abc")
+    stored, fetched_at = store.read("ABC")
+
+    assert fetcher.calls == [("abc", None)]
+    assert fetched_at > 0
+    pd.testing.assert_frame_equal(refreshed, history, check_freq=False)
+    pd.testing.assert_frame_equal(stored, history, check_freq=False)
+
+
+def test_fresh_store_does_not_fetch(tmp_path, history):
+    fetcher = FakeFetcher(history)
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher, max_age=3600)
+    store.refresh("ABC")
+    store.refresh("ABC")
+    assert len(fetcher.calls) == 1
+
+
+def test_stale_store_fetches_only_the_delta(tmp_path, history):
+    fetcher = FakeFetcher(history.iloc[:250])
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher, max_age=0)
+    store.refresh("ABC")
+
+    fetcher.history = history
+    merged = store.refresh("ABC")
+
+    # Delta starts at the second-to-last stored bar so the overlap can be checked
+    assert fetcher.calls[-1] == ("ABC", history.index[248].strftime("%Y-%m-%d"))
+    pd.testing.assert_frame_equal(merged, history, check_freq=False)
+    pd.testing.assert_frame_equal(store.read("ABC")[0], history, check_freq=False)
+
+
+def test_rebased_history_falls_back_to_full_reload(tmp_path, history):
+    fetcher = FakeFetcher(history.iloc[:250])
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher, max_age=0)
+    store.refresh("ABC")
+
+    # A 2:1 split re-bases every stored bar
+    rebased = history.copy()
+    rebased[["Open", "High", "Low", "Close"]] /= 2
+    fetcher.history = rebased
+    merged = store.refresh("ABC")
+
+    assert fetcher.calls[-1] == ("ABC", None)
+    pd.testing.assert_frame_equal(merged, rebased, check_freq=False)
+
+
+def test_empty_delta_keeps_stored_series(tmp_path, history):
+    fetcher = FakeFetcher(history)
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher, max_age=0)
+    store.refresh("ABC")
+
+    fetcher.history = history.iloc[0:0]
+    pd.testing.assert_frame_equal(store.refresh("ABC"), history, check_freq=False)
+
+
+def test_get_returns_load_history_shape(tmp_path, history):
+    store = PriceStore(root=str(tmp_path), fetcher=FakeFetcher(history))
+    frame = store.get("ABC")
+    assert list(frame.columns) == ["Date", "Open", "High", "Low", "Close", "Volume"]
+    assert len(frame) == len(history)
+
+
+def test_timezone_aware_index_round_trips(tmp_path, history):
+    history.index = history.index.tz_localize("America/New_York")
+    store = PriceStore(root=str(tmp_path), fetcher=FakeFetcher(history))
+    store.refresh("ABC")
+    pd.testing.assert_frame_equal(store.read("ABC")[0], history, check_freq=False)
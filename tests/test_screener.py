@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fetch_pool import peer_metrics_row
+from fundamentals_store import FundamentalsStore
+from indicators import compute_indicators
+from models import (
+    calculate_fundamental_score_paper2,
+    calculate_technical_score,
+    calculate_volume_score,
+    generate_paper1_signal,
+)
+from price_store import PriceStore
+from screener import MAX_SECTOR_PEERS, PANEL_BARS, load_panel, score_fundamentals, score_panel
+
+# History lengths around every warm-up threshold, plus histories longer than the panel
+LENGTHS = [30, 49, 50, 120, 199, 200, 260, PANEL_BARS, 900]
+
+
+@pytest.fixture
+def histories(make_prices):
+    frames = {}
+    for i, n in enumerate(LENGTHS * 3):
+        frame = make_prices(n, seed=100 + i).set_index("Date")
+        frame.index = frame.index.as_unit("ns")
+        frames[f"T{i:02d}"] = frame
+
+    # Histories ending on an EMA cross, so BUY/SELL signals are exercised too
+    long = make_prices(2000, seed=99).set_index("Date")
+    long.index = long.index.as_unit("ns")
+    crosses = np.flatnonzero(compute_indicators(long)["EMA_Cross_Signal"].to_numpy())
+    for j, row in enumerate(crosses[crosses >= 60][:12]):
+        frames[f"X{j:02d}"] = long.iloc[:row + 1]
+    return frames
+
+
+@pytest.fixture
+def store(tmp_path, histories):
+    store = PriceStore(root=str(tmp_path), fetcher=lambda ticker, start=None: histories[ticker].copy())
+    for ticker in histories:
+        store.refresh(ticker)
+    return store
+
+
+@pytest.mark.parametrize("refresh", [True, False])
+def test_panel_scores_match_per_ticker_functions(store, histories, refresh):
+    close, volume, meta = load_panel(list(histories), store=store, refresh=refresh)
+    scored = score_panel(close, volume, meta)
+
+    for ticker, history in histories.items():
+        # The panel sees each ticker's last PANEL_BARS bars, computed as that ticker alone
+        frame = compute_indicators(history.iloc[-PANEL_BARS:].reset_index())
+        row = scored.loc[ticker]
+        assert row["bars"] == min(len(history), PANEL_BARS)
+        assert row["tech_score"] == calculate_technical_score(frame)[0], ticker
+        assert row["volume_score"] == calculate_volume_score(frame)[0], ticker
+        assert row["paper1_signal"] == generate_paper1_signal(frame)[0], ticker
+        np.testing.assert_allclose(row["rsi"], frame["RSI"].iloc[-1], rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(row["monthly_return"], frame["Monthly_Return"].iloc[-1],
+                                   rtol=1e-9, equal_nan=True)
+
+
+def test_unstored_tickers_are_left_out(store, histories):
+    close, volume, meta = load_panel(["T00", "MISSING"], store=store, refresh=False)
+    assert list(close.columns) == ["T00"]
+    assert list(meta.index) == ["T00"]
+    assert meta.loc["T00", "last_date"] == pd.Timestamp(histories["T00"].index[-1])
+
+
+def test_fundamental_scores_match_per_ticker_scoring(tmp_path):
+    rng = np.random.default_rng(4)
+    tickers = [f"F{i:02d}" for i in range(40)]
+    universe = pd.DataFrame({"ticker": tickers, "sector": rng.choice(["Tech", "Energy", "Utilities"], len(tickers))})
+    infos = {
+        t: {
+            "priceToBook": None if rng.random() < 0.2 else float(rng.uniform(0.5, 6)),
+            "returnOnEquity": float(rng.uniform(-0.2, 0.4)),
+            "beta": None if rng.random() < 0.1 else float(rng.uniform(0.4, 2)),
+            "marketCap": float(rng.uniform(1e9, 1e12)),
+            "revenueGrowth": float(rng.uniform(-0.1, 0.3)),
+        }
+        for t in tickers
+    }
+    store = FundamentalsStore(path=str(tmp_path / "f.sqlite"), fetcher=lambda t: infos[t])
+    monthly = pd.Series(rng.uniform(-0.15, 0.15, len(tickers)), index=tickers)
+    monthly.iloc[::7] = np.nan
+
+    for risk_profile in ("conservative", "moderate"):
+        scores = score_fundamentals(universe, monthly, risk_profile=risk_profile, store=store)
+        for ticker in tickers:
+            # The app's peer set: the sector's first MAX_SECTOR_PEERS other names plus the ticker
+            members = universe.loc[universe["sector"] == universe.set_index("ticker").at[ticker, "sector"], "ticker"]
+            peers = [t for t in members if t != ticker][:MAX_SECTOR_PEERS] + [ticker]
+            peer_df = pd.DataFrame([peer_metrics_row(t, infos[t]) for t in peers])
+            price_data = pd.DataFrame({"Monthly_Return": [monthly[ticker]]})
+            expected, _ = calculate_fundamental_score_paper2(infos[ticker], peer_df, risk_profile, price_data)
+            assert scores[ticker] == expected, ticker
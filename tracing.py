@@ -0,0 +1,227 @@
+# =============================================================================
+# TRACING.PY - Nested timing spans for one page load
+# =============================================================================
+# begin() opens a trace for the current thread (Streamlit runs each session's
+# script on its own thread), span() and @traced record nested wall-clock
+# spans into it, and end() closes it. Spans also carry the bytes fetched from
+# the network inside them and, for cached loaders, whether the call was a
+# cache hit. With no open trace every helper is a no-op, so the CLI and batch
+# workers pay one attribute lookup per call; fetch-pool threads count their
+# bytes with count_bytes() and the caller credits them to its own trace.
+# =============================================================================
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class Trace:
+    """
+    Span records of one script run, in start order.
+
+    Each record is a dict with name, depth, parent (record index or None),
+    start (seconds since the trace began), ms, cache ("hit", "miss" or None),
+    bytes (fetched inside the span, children included) and error.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self._stack = []
+        self.ms = None
+
+    def open(self, name, cache=None):
+        record = {
+            "name": name,
+            "depth": len(self._stack),
+            "parent": self._stack[-1] if self._stack else None,
+            "start": time.perf_counter() - self._t0,
+            "ms": None,
+            "cache": cache,
+            "bytes": 0,
+            "error": None,
+        }
+        self.spans.append(record)
+        self._stack.append(len(self.spans) - 1)
+        return record
+
+    def close(self, record):
+        record["ms"] = (time.perf_counter() - self._t0 - record["start"]) * 1000
+        self._stack.pop()
+
+    def current(self):
+        return self.spans[self._stack[-1]] if self._stack else None
+
+    def add_bytes(self, n):
+        for index in self._stack:
+            self.spans[index]["bytes"] += n
+
+    def finish(self):
+        self.ms = (time.perf_counter() - self._t0) * 1000
+        return self
+
+    def to_records(self):
+        """Span records tagged with the trace label and start time (JSON-serialisable)."""
+        return [dict(record, trace=self.label, trace_started_at=self.started_at) for record in self.spans]
+
+
+def begin(label):
+    """Open a new trace for this thread, replacing any unfinished one."""
+    _local.trace = Trace(label)
+    return _local.trace
+
+
+def end():
+    """Close this thread's trace and return it (None if no trace was open)."""
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    return trace.finish() if trace is not None else None
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def span(name, cache=None):
+    """
+    Record a nested span in this thread's trace.
+
+    Yields the span record (None without an open trace), so callers can set
+    fields such as "cache" on it.
+    """
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        yield None
+        return
+    record = trace.open(name, cache=cache)
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        trace.close(record)
+
+
+def traced(name=None, cached=False):
+    """
+    Decorator running the function inside a span named after it.
+
+    With cached=True the span starts as a cache hit; put @cache_miss under the
+    caching decorator so the span flips to a miss when the body actually runs:
+
+        @traced(cached=True)
+        @st.cache_data(ttl=3600)
+        @cache_miss
+        def load_history(ticker): ...
+    """
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "trace", None) is None:
+                return fn(*args, **kwargs)
+            with span(span_name, cache="hit" if cached else None):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def cache_miss(fn):
+    """Mark the enclosing @traced(cached=True) span as a miss whenever fn's body runs."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = getattr(_local, "trace", None)
+        record = trace.current() if trace is not None else None
+        if record is not None and record["cache"] is not None:
+            record["cache"] = "miss"
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def add_bytes(n):
+    """Count n bytes fetched against every open span of this thread's trace (or its count_bytes())."""
+    if not n:
+        return
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.add_bytes(int(n))
+        return
+    counter = getattr(_local, "byte_counter", None)
+    if counter is not None:
+        counter[0] += int(n)
+
+
+@contextmanager
+def count_bytes():
+    """
+    Collect the bytes add_bytes() counts on this thread, which has no trace open.
+
+    Traces are per thread, so pool workers wrap each call in this and hand the
+    total back to the thread that owns the trace (see fetch_pool.fetch_many).
+    Yields a one-element list holding the running total.
+    """
+    counter = [0]
+    previous = getattr(_local, "byte_counter", None)
+    _local.byte_counter = counter
+    try:
+        yield counter
+    finally:
+        _local.byte_counter = previous
+
+
+def summarize(trace):
+    """
+    Per-name totals of a finished trace, slowest first.
+
+    Returns:
+        List of dicts with name, calls, total_ms, self_ms (total minus direct
+        children), hits, misses and bytes (outermost spans only, so nested
+        spans of the same name are not counted twice)
+    """
+    child_ms = [0.0] * len(trace.spans)
+    for record in trace.spans:
+        if record["parent"] is not None and record["ms"] is not None:
+            child_ms[record["parent"]] += record["ms"]
+
+    rows = {}
+    for index, record in enumerate(trace.spans):
+        row = rows.setdefault(record["name"], {
+            "name": record["name"], "calls": 0, "total_ms": 0.0, "self_ms": 0.0,
+            "hits": 0, "misses": 0, "bytes": 0,
+        })
+        ms = record["ms"] or 0.0
+        row["calls"] += 1
+        row["self_ms"] += ms - child_ms[index]
+        row["hits"] += record["cache"] == "hit"
+        row["misses"] += record["cache"] == "miss"
+        # Recursive calls: only the outermost span of a name adds time and bytes
+        parent = record["parent"]
+        while parent is not None and trace.spans[parent]["name"] != record["name"]:
+            parent = trace.spans[parent]["parent"]
+        if parent is None:
+            row["total_ms"] += ms
+            row["bytes"] += record["bytes"]
+    return sorted(rows.values(), key=lambda r: r["total_ms"], reverse=True)
+
+
+def to_jsonl(traces):
+    """JSON lines, one span record per line, for a list of finished traces."""
+    return "".join(json.dumps(record, default=str) + "\n" for trace in traces for record in trace.to_records())
+
+
+def append_jsonl(path, trace):
+    """Append a finished trace's span records to a JSON-lines file."""
+    with open(path, "a") as fh:
+        fh.write(to_jsonl([trace]))
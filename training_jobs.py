@@ -0,0 +1,148 @@
+# =============================================================================
+# TRAINING_JOBS.PY - Background PPO training with a job table
+# =============================================================================
+# Training runs on worker threads, so a cache miss no longer blocks a
+# Streamlit rerun. Finished models land in the rl_agent model registry, where
+# the next rerun picks them up with rl_agent.load_cached_policy().
+# =============================================================================
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import rl_agent
+
+MAX_TRAINING_WORKERS = 1
+
+# Finished jobs kept in the table for display
+MAX_FINISHED_JOBS = 50
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def _load_training_frame(ticker):
+    """Indicator frame for ticker, built the way the app builds price_data."""
+    from indicators import compute_indicators
+    from price_store import load_prices
+
+    prices = load_prices(ticker)
+    if prices.empty:
+        raise ValueError(f"No price data for {ticker}")
+    return compute_indicators(prices)
+
+
+class TrainingJobManager:
+    """
+    Thread pool running get_ppo_agent() jobs, one active job per ticker.
+
+    Job dicts carry job_id, ticker, status (queued/running/done/failed),
+    force_retrain, submitted_at, started_at, finished_at and error.
+    """
+
+    def __init__(self, max_workers=MAX_TRAINING_WORKERS, loader=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ppo-train")
+        self._loader = loader or _load_training_frame
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active = {}
+
+    def submit(self, ticker, df=None, force_retrain=False):
+        """
+        Queue a training job for ticker unless one is already queued or running.
+
+        Args:
+            ticker: Ticker symbol
+            df: Indicator frame to train on; loaded from the price store when None
+            force_retrain: Train even if the registry already has a usable model
+
+        Returns:
+            Snapshot of the (new or existing) job dict
+        """
+        with self._lock:
+            job_id = self._active.get(ticker)
+            if job_id is not None:
+                return dict(self._jobs[job_id])
+            job = {
+                "job_id": uuid.uuid4().hex[:8],
+                "ticker": ticker,
+                "status": QUEUED,
+                "force_retrain": force_retrain,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+            }
+            self._jobs[job["job_id"]] = job
+            self._active[ticker] = job["job_id"]
+            self._prune()
+        self._pool.submit(self._run, job["job_id"], df)
+        return dict(job)
+
+    def submit_many(self, tickers, force_retrain=False):
+        """Queue training for a watchlist; prices are loaded by the workers."""
+        return [self.submit(t, force_retrain=force_retrain) for t in dict.fromkeys(tickers)]
+
+    def status(self, ticker):
+        """Latest job for ticker, or None."""
+        with self._lock:
+            for job in reversed(list(self._jobs.values())):
+                if job["ticker"] == ticker:
+                    return dict(job)
+        return None
+
+    def status_by_id(self, job_id):
+        """Snapshot of one job."""
+        with self._lock:
+            return dict(self._jobs[job_id])
+
+    def jobs(self):
+        """Snapshot of every job, newest first."""
+        with self._lock:
+            return [dict(job) for job in reversed(list(self._jobs.values()))]
+
+    def has_active(self):
+        with self._lock:
+            return bool(self._active)
+
+    def _run(self, job_id, df):
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        job = self.status_by_id(job_id)
+        try:
+            if df is None:
+                df = self._loader(job["ticker"])
+            model = rl_agent.get_ppo_agent(df, ticker=job["ticker"], force_retrain=job["force_retrain"])
+            if model is None:
+                raise ValueError("Not enough data to train")
+            self._update(job_id, status=DONE, finished_at=time.time())
+        except Exception as e:
+            self._update(job_id, status=FAILED, finished_at=time.time(), error=str(e))
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            if job["status"] not in ACTIVE_STATUSES and self._active.get(job["ticker"]) == job_id:
+                del self._active[job["ticker"]]
+
+    def _prune(self):
+        finished = [jid for jid, job in self._jobs.items() if job["status"] not in ACTIVE_STATUSES]
+        for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[jid]
+
+
+_default_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager():
+    """Process-wide TrainingJobManager shared by every session."""
+    global _default_manager
+    with _manager_lock:
+        if _default_manager is None:
+            _default_manager = TrainingJobManager()
+        return _default_manager
@@ -0,0 +1,88 @@
+# =============================================================================
+# UNIVERSE.PY - Index constituent lists (S&P 500, NASDAQ-100) from Wikipedia
+# =============================================================================
+# Plain functions with no Streamlit dependency so the app (which wraps them in
+# st.cache_data), the backtest CLI and batch jobs share one implementation.
+# =============================================================================
+
+from io import StringIO
+
+import pandas as pd
+import requests
+
+import tracing
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+UNIVERSE_COLUMNS = ["ticker", "name", "sector", "industry", "is_sp500"]
+
+
+def fetch_sp500_tickers():
+    """Fetch S&P 500 tickers from Wikipedia."""
+    try:
+        url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+        response = requests.get(url, headers=HEADERS)
+        tracing.add_bytes(len(response.content))
+        tables = pd.read_html(StringIO(response.text))
+        df = tables[0][["Symbol", "Security", "GICS Sector", "GICS Sub-Industry"]].copy()
+        df.columns = ["ticker", "name", "sector", "industry"]
+        df["ticker"] = df["ticker"].str.replace(".", "-", regex=False)
+        df["is_sp500"] = True
+        return df
+    except Exception:
+        return pd.DataFrame(columns=UNIVERSE_COLUMNS)
+
+
+def fetch_nasdaq100_tickers():
+    """Fetch NASDAQ-100 tickers from Wikipedia."""
+    try:
+        url = "https://en.wikipedia.org/wiki/Nasdaq-100"
+        response = requests.get(url, headers=HEADERS)
+        tracing.add_bytes(len(response.content))
+        tables = pd.read_html(StringIO(response.text))
+
+        for table in tables:
+            str_cols = [str(c).lower() for c in table.columns]
+            if any("ticker" in c or "symbol" in c for c in str_cols):
+                ticker_col = None
+                name_col = None
+                for col in table.columns:
+                    col_lower = str(col).lower()
+                    if "ticker" in col_lower or "symbol" in col_lower:
+                        ticker_col = col
+                    if "company" in col_lower or "security" in col_lower:
+                        name_col = col
+
+                if ticker_col:
+                    df = pd.DataFrame()
+                    df["ticker"] = table[ticker_col].astype(str).str.replace(".", "-", regex=False)
+                    df["name"] = table[name_col] if name_col else df["ticker"]
+                    df["sector"] = "Technology"
+                    df["industry"] = "Technology"
+                    df["is_sp500"] = False
+                    return df
+
+        return pd.DataFrame(columns=UNIVERSE_COLUMNS)
+    except Exception:
+        return pd.DataFrame(columns=UNIVERSE_COLUMNS)
+
+
+def combine_universes(sp500, nasdaq):
+    """Merge S&P 500 and NASDAQ-100 lists, keeping the S&P 500 row for overlaps."""
+    combined = pd.concat([sp500, nasdaq], ignore_index=True)
+    combined = combined.drop_duplicates(subset=["ticker"], keep="first")
+    return combined.sort_values("ticker").reset_index(drop=True)
+
+
+def fetch_all_us_stocks():
+    """Load combined list of S&P 500 and NASDAQ-100 stocks."""
+    return combine_universes(fetch_sp500_tickers(), fetch_nasdaq100_tickers())
+
+
+def fetch_universe(name):
+    """Universe by CLI name: "sp500", "nasdaq100" or "all"."""
+    if name == "sp500":
+        return fetch_sp500_tickers()
+    if name == "nasdaq100":
+        return fetch_nasdaq100_tickers()
+    return fetch_all_us_stocks()